@@ -1,13 +1,36 @@
-from fastapi import FastAPI
-from fastapi.responses import HTMLResponse
-from fastapi.staticfiles import StaticFiles
+import asyncio
+import inspect
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
 from logic import *
+from search_index import (
+    INDEX_VERSION,
+    connect_index_readonly,
+    find_all_ssns_in_date_range_indexed,
+    find_member_id_all_dates_indexed,
+    find_member_ids_all_dates_indexed,
+    find_member_name_all_dates_indexed,
+    find_ssn_all_dates_indexed,
+    find_ssns_all_dates_indexed,
+    iter_all_dates_indexed,
+    iter_ssns_in_date_range_indexed,
+    order_records,
+)
+from search_profile import PROFILE_TOP, profile_search
 
 app = FastAPI(title="834 Eligibility Search System")
 
-# Serve static files (index.html)
-app.mount("/static", StaticFiles(directory="."), name="static")
+# one JSON line per search (company, file counts, I/O vs regex time)
+enable_search_log()
 
 
 # ----------------------------
@@ -22,33 +45,469 @@ class SubfolderRequest(BaseModel):
     subfolder_name: str | None = None
 
 
-class SSNRequest(BaseModel):
+# optional on every search: search this company / subfolder instead of
+# the selection stored in the caller's session, timings=true adds the
+# search metrics to the response
+class SearchContext(BaseModel):
+    company_name: str | None = None
+    subfolder_name: str | None = None
+    timings: bool = False
+
+
+class SSNRequest(SearchContext):
     ssn: str
 
 
-class MemberIdRequest(BaseModel):
+class SSNBatchRequest(SearchContext):
+    ssns: list[str] | str
+
+
+class MemberIdRequest(SearchContext):
     member_id: str
 
 
-class MemberNameRequest(BaseModel):
+class MemberIdBatchRequest(SearchContext):
+    member_ids: list[str] | str
+
+
+class MemberNameRequest(SearchContext):
     member_name: str
 
 
-class DateRangeRequest(BaseModel):
+class DateRangeRequest(SearchContext):
     start_date: str
     end_date: str
 
 
+# search -> ssn / member_id / member_name (key) or date_range (start / end date)
+class ProfileRequest(SearchContext):
+    search: str
+    key: str | None = None
+    start_date: str | None = None
+    end_date: str | None = None
+    mode: str = "index"
+    top: int = PROFILE_TOP
+    save: bool = True
+
+
+# ----------------------------
+# SESSION STATE (one API class state per browser)
+# ----------------------------
+# session id (cookie) -> {"company", "subfolder", "config", "last_used"}
+# only touched on the event loop, so no lock is needed
+SESSION_COOKIE = "session_id"
+SESSION_TTL = 8 * 60 * 60   # seconds without a request
+
+sessions = {}
+
+
+def get_session(request):
+    session = sessions.get(request.cookies.get(SESSION_COOKIE))
+
+    if session:
+        session["last_used"] = time.monotonic()
+
+    return session
+
+
+def open_session(request, response):
+    """
+    Session of the caller, a new one (and its cookie) on first use.
+    """
+
+    session = get_session(request)
+    if session:
+        return session
+
+    now = time.monotonic()
+
+    for session_id in [k for k, v in sessions.items() if now - v["last_used"] > SESSION_TTL]:
+        del sessions[session_id]
+
+    session_id = secrets.token_urlsafe(24)
+    session = {"company": None, "subfolder": None, "config": None, "last_used": now}
+    sessions[session_id] = session
+
+    response.set_cookie(SESSION_COOKIE, session_id, httponly=True, samesite="lax")
+
+    return session
+
+
+def request_config(request, req):
+    """
+    Company config of one search: company_name / subfolder_name of the
+    request body when given, otherwise the selection of the caller's session.
+    Raises ValueError for an unknown company.
+    """
+
+    if req.company_name:
+        return get_company_config(req.company_name, req.subfolder_name or None)
+
+    session = get_session(request)
+    return session["config"] if session else None
+
+
 # ----------------------------
-# GLOBAL STATE (same as your API class)
+# Search Executor
 # ----------------------------
-api_state = {
-    "company": None,
-    "subfolder": None,
-    "config": None
+# Scans run on their own bounded pool (not on the event loop and not on the
+# default threadpool), so a burst of searches cannot starve light requests.
+# Searches above SEARCH_WORKERS wait in the queue, above the queue limit
+# the server answers 503 straight away.
+SEARCH_WORKERS = int(os.environ.get("SEARCH_WORKERS", 4))
+SEARCH_QUEUE_LIMIT = int(os.environ.get("SEARCH_QUEUE_LIMIT", 16))
+
+search_executor = ThreadPoolExecutor(
+    max_workers=SEARCH_WORKERS,
+    thread_name_prefix="search"
+)
+
+# running + queued searches (only touched on the event loop)
+search_load = {"active": 0}
+
+BUSY_ERROR = "Server busy, too many searches running. Please retry."
+
+
+def search_slot_free():
+    return search_load["active"] < SEARCH_WORKERS + SEARCH_QUEUE_LIMIT
+
+
+# ----------------------------
+# Service Metrics (GET /metrics, Prometheus text format)
+# ----------------------------
+# updated from the event loop and the job / search threads, so under a lock
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+service_metrics_lock = threading.Lock()
+
+service_metrics = {
+    "latency": {},          # (endpoint, company) -> {"buckets", "sum", "count"}
+    "cache": {"hit": 0, "miss": 0},
+    "files_scanned": {},    # company -> files opened by scans
+    "bytes_scanned": {},    # company -> bytes read by scans
+    "index_refreshed": {},  # company -> unix time of the last index refresh
 }
 
 
+def observe_search_latency(endpoint, company, seconds):
+
+    with service_metrics_lock:
+        latency = service_metrics["latency"].setdefault(
+            (endpoint, company or "none"),
+            {"buckets": [0] * len(LATENCY_BUCKETS), "sum": 0.0, "count": 0}
+        )
+
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                latency["buckets"][i] += 1
+
+        latency["sum"] += seconds
+        latency["count"] += 1
+
+
+def observe_search_metrics(key_type, config, metrics):
+    """
+    search_metrics_observers hook: cache, scan volume and index refresh
+    counters of every finished search.
+    """
+
+    company = config["selected_company"]
+
+    with service_metrics_lock:
+        service_metrics["cache"]["hit" if metrics.get("cache_hit") else "miss"] += 1
+
+        files = service_metrics["files_scanned"]
+        files[company] = files.get(company, 0) + metrics["files_opened"]
+
+        size = service_metrics["bytes_scanned"]
+        size[company] = size.get(company, 0) + metrics["bytes_read"]
+
+        if "refresh_s" in metrics:
+            service_metrics["index_refreshed"][company] = time.time()
+
+
+search_metrics_observers.append(observe_search_metrics)
+
+
+def metric_labels(**labels):
+    pairs = []
+
+    for name, value in labels.items():
+        value = str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+        pairs.append(f'{name}="{value}"')
+
+    return "{" + ",".join(pairs) + "}"
+
+
+def index_stats():
+    """
+    company -> (indexed files, newest indexed file mtime in seconds).
+    Read only, empty while there is no (current) index.
+    """
+
+    conn = connect_index_readonly()
+    if conn is None:
+        return {}
+
+    try:
+        if conn.execute("PRAGMA user_version").fetchone()[0] != INDEX_VERSION:
+            return {}
+        rows = conn.execute(
+            "SELECT company, COUNT(*), MAX(mtime_ns) FROM files GROUP BY company"
+        ).fetchall()
+    except sqlite3.Error:
+        return {}
+    finally:
+        conn.close()
+
+    return {company: (count, (newest or 0) / 1e9) for company, count, newest in rows}
+
+
+def render_service_metrics():
+
+    lines = []
+
+    def metric(name, kind, help_text):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+
+    with service_metrics_lock:
+        latency = {key: dict(value, buckets=list(value["buckets"])) for key, value in service_metrics["latency"].items()}
+        cache = dict(service_metrics["cache"])
+        files_scanned = dict(service_metrics["files_scanned"])
+        bytes_scanned = dict(service_metrics["bytes_scanned"])
+        index_refreshed = dict(service_metrics["index_refreshed"])
+
+    metric("ssn_search_latency_seconds", "histogram", "Search request latency per endpoint and company.")
+    for (endpoint, company), value in sorted(latency.items()):
+        for bound, count in zip(LATENCY_BUCKETS, value["buckets"]):
+            labels = metric_labels(endpoint=endpoint, company=company, le=bound)
+            lines.append(f"ssn_search_latency_seconds_bucket{labels} {count}")
+        labels = metric_labels(endpoint=endpoint, company=company, le="+Inf")
+        lines.append(f"ssn_search_latency_seconds_bucket{labels} {value['count']}")
+        labels = metric_labels(endpoint=endpoint, company=company)
+        lines.append(f"ssn_search_latency_seconds_sum{labels} {value['sum']}")
+        lines.append(f"ssn_search_latency_seconds_count{labels} {value['count']}")
+
+    metric("ssn_search_in_flight", "gauge", "Searches running or queued (search executor) and unfinished jobs.")
+    lines.append(f'ssn_search_in_flight{{kind="search"}} {search_load["active"]}')
+    lines.append(f'ssn_search_in_flight{{kind="job"}} {unfinished_jobs()}')
+
+    metric("ssn_search_cache_requests_total", "counter", "Result cache lookups of finished searches.")
+    for result, count in cache.items():
+        lines.append(f"ssn_search_cache_requests_total{metric_labels(result=result)} {count}")
+
+    total = cache["hit"] + cache["miss"]
+    metric("ssn_search_cache_hit_ratio", "gauge", "Share of searches answered from the result cache.")
+    lines.append(f"ssn_search_cache_hit_ratio {cache['hit'] / total if total else 0}")
+
+    metric("ssn_search_files_scanned_total", "counter", "Backup files opened by searches (rate = files per second).")
+    for company, count in sorted(files_scanned.items()):
+        lines.append(f"ssn_search_files_scanned_total{metric_labels(company=company)} {count}")
+
+    metric("ssn_search_bytes_scanned_total", "counter", "Bytes read by searches (rate = bytes per second).")
+    for company, count in sorted(bytes_scanned.items()):
+        lines.append(f"ssn_search_bytes_scanned_total{metric_labels(company=company)} {count}")
+
+    metric("ssn_search_index_last_refresh_timestamp_seconds", "gauge", "Unix time of the last index refresh per company.")
+    for company, refreshed in sorted(index_refreshed.items()):
+        lines.append(f"ssn_search_index_last_refresh_timestamp_seconds{metric_labels(company=company)} {refreshed}")
+
+    stats = index_stats()
+
+    metric("ssn_search_index_files", "gauge", "Backup files in the search index per company.")
+    for company, (count, _) in sorted(stats.items()):
+        lines.append(f"ssn_search_index_files{metric_labels(company=company)} {count}")
+
+    metric("ssn_search_index_newest_file_timestamp_seconds", "gauge", "Modification time of the newest indexed backup file per company.")
+    for company, (_, newest) in sorted(stats.items()):
+        lines.append(f"ssn_search_index_newest_file_timestamp_seconds{metric_labels(company=company)} {newest}")
+
+    return "\n".join(lines) + "\n"
+
+
+# ----------------------------
+# Running Searches
+# ----------------------------
+# search = {"cancel": token, "waiters": callers still waiting for it}
+# Every caller of a search holds a waiter = {"search", "released"}, released
+# once: when the caller returns or disconnects, or when its session starts
+# another search. A search nobody waits for any more is cancelled (stops
+# at its next file).
+
+def new_search():
+    return {"cancel": new_cancel_token(), "waiters": 0}
+
+
+def join_search(search):
+    search["waiters"] += 1
+    return {"search": search, "released": False}
+
+
+def release_waiter(waiter):
+    if waiter["released"]:
+        return
+
+    waiter["released"] = True
+
+    search = waiter["search"]
+    search["waiters"] -= 1
+    if search["waiters"] <= 0:
+        search["cancel"].set()
+
+
+def supersede_search(request, waiter):
+    """
+    Makes waiter the running search of the caller's session and releases
+    the waiter it replaces (also when both wait for the same search,
+    a re-submitted search counts its session once).
+    """
+
+    session = get_session(request)
+    if not session:
+        return
+
+    previous = session.get("search")
+    session["search"] = waiter
+
+    if previous and previous is not waiter:
+        release_waiter(previous)
+
+
+# identical searches running right now (single flight):
+# (company, active folders, search, request fields) -> search + future of the
+# running scan, or for a streamed search (search = its path) the events so far
+inflight_searches = {}
+
+
+def search_flight_key(config, search, req):
+    return (
+        config["selected_company"] if config else None,
+        tuple(config["active_folders"]) if config else (),
+        search,
+        json.dumps(
+            req.model_dump(exclude={"company_name", "subfolder_name"}),
+            sort_keys=True
+        )
+    )
+
+
+async def run_search(func, request, req):
+
+    started = time.perf_counter()
+
+    try:
+        config = request_config(request, req)
+    except ValueError as e:
+        return {"success": False, "error": str(e)}
+
+    flight_key = search_flight_key(config, func.__name__, req)
+
+    # same search already running: wait for its result instead of scanning again
+    flight = inflight_searches.get(flight_key)
+
+    if not flight or flight["cancel"].is_set():
+        if not search_slot_free():
+            return JSONResponse(
+                status_code=503,
+                content={"success": False, "error": BUSY_ERROR}
+            )
+
+        search_load["active"] += 1
+
+        loop = asyncio.get_running_loop()
+        flight = new_search()
+        flight["future"] = loop.run_in_executor(
+            search_executor, func, config, req, flight["cancel"]
+        )
+        inflight_searches[flight_key] = flight
+
+        def flight_done(_, flight=flight):
+            search_load["active"] -= 1
+            if inflight_searches.get(flight_key) is flight:
+                del inflight_searches[flight_key]
+
+        flight["future"].add_done_callback(flight_done)
+
+    waiter = join_search(flight)
+    supersede_search(request, waiter)
+
+    # shielded: a caller that disconnects does not cancel the others
+    try:
+        return await asyncio.shield(flight["future"])
+    except SearchCancelled:
+        return cancelled_response()
+    finally:
+        release_waiter(waiter)
+        observe_search_latency(
+            request.url.path,
+            config["selected_company"] if config else None,
+            time.perf_counter() - started
+        )
+
+
+async def run_stream_flight(flight, events, flight_key=None):
+    """
+    Runs a streamed search: every step of the blocking event generator runs
+    on the search executor (other searches can run between two chunks),
+    each event is kept in flight["events"] for the callers following it.
+    """
+
+    search_load["active"] += 1
+    loop = asyncio.get_running_loop()
+
+    def notify():
+        updated, flight["updated"] = flight["updated"], asyncio.Event()
+        updated.set()
+
+    try:
+        while True:
+            event = await loop.run_in_executor(search_executor, next, events, None)
+            if event is None:
+                break
+            flight["events"].append(event)
+            notify()
+    except Exception as e:
+        flight["events"].append(ndjson_event("done", success=False, error=str(e)))
+    finally:
+        search_load["active"] -= 1
+        flight["finished"] = True
+        notify()
+
+        if inflight_searches.get(flight_key) is flight:
+            del inflight_searches[flight_key]
+
+        # task cancelled: stop the generator unless a step is still running
+        if inspect.getgeneratorstate(events) != inspect.GEN_RUNNING:
+            events.close()
+
+
+async def follow_stream(flight, waiter, endpoint=None, company=None):
+    """
+    Events of a streamed search for one caller: what was sent so far,
+    then every new event. The search is cancelled once no caller is left.
+    """
+
+    started = time.perf_counter()
+    sent = 0
+
+    try:
+        while True:
+            while sent < len(flight["events"]):
+                yield flight["events"][sent]
+                sent += 1
+
+            if flight["finished"]:
+                break
+
+            await flight["updated"].wait()
+    finally:
+        release_waiter(waiter)
+
+        if endpoint:
+            observe_search_latency(endpoint, company, time.perf_counter() - started)
+
+
 # ----------------------------
 # Serve Frontend
 # ----------------------------
@@ -62,15 +521,17 @@ def home():
 # API: Select Company
 # ----------------------------
 @app.post("/select_company")
-def select_company(req: CompanyRequest):
+async def select_company(req: CompanyRequest, request: Request, response: Response):
     try:
-        api_state["company"] = req.company_name
-        api_state["subfolder"] = None
-        api_state["config"] = get_company_config(req.company_name)
+        session = open_session(request, response)
+
+        session["config"] = get_company_config(req.company_name)
+        session["company"] = req.company_name
+        session["subfolder"] = None
 
         return {
             "success": True,
-            "subfolders": api_state["config"]["active_folders"]
+            "subfolders": session["config"]["active_folders"]
         }
 
     except Exception as e:
@@ -81,14 +542,16 @@ def select_company(req: CompanyRequest):
 # API: Select Subfolder
 # ----------------------------
 @app.post("/select_subfolder")
-def select_subfolder(req: SubfolderRequest):
+async def select_subfolder(req: SubfolderRequest, request: Request):
 
-    if not api_state["company"]:
+    session = get_session(request)
+
+    if not session or not session["company"]:
         return {"success": False, "error": "Select company first."}
 
     try:
-        api_state["subfolder"] = req.subfolder_name if req.subfolder_name else None
-        api_state["config"] = get_company_config(api_state["company"], api_state["subfolder"])
+        session["subfolder"] = req.subfolder_name if req.subfolder_name else None
+        session["config"] = get_company_config(session["company"], session["subfolder"])
 
         return {"success": True}
 
@@ -99,35 +562,23 @@ def select_subfolder(req: SubfolderRequest):
 # ----------------------------
 # API: Search SSN
 # ----------------------------
-@app.post("/search_by_ssn")
-def search_by_ssn(req: SSNRequest):
+def ssn_search(config, req, cancel=None):
 
-    if not api_state["config"]:
+    if not config:
         return {"success": False, "error": "Please select company first."}
 
     ssn = req.ssn.strip().rstrip("~")
+    metrics = new_search_metrics()
 
-    BASE_PATH = api_state["config"]["base_path"]
-    ACTIVE_FOLDERS = api_state["config"]["active_folders"]
-    IS_AHH_AMO = api_state["config"]["is_ahh_amo"]
-    IS_TELADOC = api_state["config"]["is_teladoc"]
-    IS_SAVRX = api_state["config"]["is_savrx"]
-
-    if IS_AHH_AMO:
-        present, absent = find_ssn_all_dates_ahh_amo(BASE_PATH, ssn)
-    elif IS_TELADOC:
-        present, absent = find_ssn_all_dates_teladoc(BASE_PATH, ACTIVE_FOLDERS, ssn)
-    elif IS_SAVRX:
-        present, absent = find_ssn_all_dates_savrx(BASE_PATH, ACTIVE_FOLDERS, ssn)
-    else:
-        present, absent = find_ssn_all_dates(BASE_PATH, ACTIVE_FOLDERS, ssn)
+    # answered from the search index (repeat searches from the result cache)
+    present, absent = cached_search(config, "ssn", ssn, find_ssn_all_dates_indexed, cancel, metrics)
 
     if not present:
-        return {"success": False, "error": "SSN not found."}
+        return with_timings({"success": False, "error": "SSN not found."}, metrics, req.timings)
 
     summary = generate_ssn_timeline_summary(present, absent)
 
-    return {
+    return with_timings({
         "success": True,
         "ssn": ssn,
         "present_records": present,
@@ -135,41 +586,59 @@ def search_by_ssn(req: SSNRequest):
         "from": present[0]["date"],
         "to": present[-1]["date"],
         "summary": summary
-    }
+    }, metrics, req.timings)
+
+
+@app.post("/search_by_ssn")
+async def search_by_ssn(req: SSNRequest, request: Request):
+    return await run_search(ssn_search, request, req)
+
+
+# ----------------------------
+# API: Batch SSN Search
+# ----------------------------
+def ssns_search(config, req, cancel=None):
+
+    if not config:
+        return {"success": False, "error": "Please select company first."}
+
+    ssns = clean_key_list(req.ssns)
+    if not ssns:
+        return {"success": False, "error": "No SSNs given."}
+
+    metrics = new_search_metrics()
+
+    # every file answered once for all SSNs
+    results = cached_search(config, "ssns", ssns, find_ssns_all_dates_indexed, cancel, metrics)
+
+    return with_timings(build_ssn_batch_response(results), metrics, req.timings)
+
+
+@app.post("/search_by_ssns")
+async def search_by_ssns(req: SSNBatchRequest, request: Request):
+    return await run_search(ssns_search, request, req)
 
 
 # ----------------------------
 # API: Search Member ID
 # ----------------------------
-@app.post("/search_by_member_id")
-def search_by_member_id(req: MemberIdRequest):
+def member_id_search(config, req, cancel=None):
 
-    if not api_state["config"]:
+    if not config:
         return {"success": False, "error": "Please select company first."}
 
     member_id = req.member_id.strip().rstrip("~")
+    metrics = new_search_metrics()
 
-    BASE_PATH = api_state["config"]["base_path"]
-    ACTIVE_FOLDERS = api_state["config"]["active_folders"]
-    IS_AHH_AMO = api_state["config"]["is_ahh_amo"]
-    IS_TELADOC = api_state["config"]["is_teladoc"]
-    IS_SAVRX = api_state["config"]["is_savrx"]
-
-    if IS_AHH_AMO:
-        present, absent = find_member_id_all_dates_ahh_amo(BASE_PATH, member_id)
-    elif IS_TELADOC:
-        present, absent = find_member_id_all_dates_teladoc(BASE_PATH, ACTIVE_FOLDERS, member_id)
-    elif IS_SAVRX:
-        present, absent = find_member_id_all_dates_savrx(BASE_PATH, ACTIVE_FOLDERS, member_id)
-    else:
-        present, absent = find_member_id_all_dates(BASE_PATH, ACTIVE_FOLDERS, member_id)
+    # answered from the search index (repeat searches from the result cache)
+    present, absent = cached_search(config, "member_id", member_id, find_member_id_all_dates_indexed, cancel, metrics)
 
     if not present:
-        return {"success": False, "error": "Member ID not found."}
+        return with_timings({"success": False, "error": "Member ID not found."}, metrics, req.timings)
 
     summary = generate_member_id_timeline_summary(present, absent)
 
-    return {
+    return with_timings({
         "success": True,
         "member_id": member_id,
         "present_records": present,
@@ -177,78 +646,673 @@ def search_by_member_id(req: MemberIdRequest):
         "from": present[0]["date"],
         "to": present[-1]["date"],
         "summary": summary
-    }
+    }, metrics, req.timings)
+
+
+@app.post("/search_by_member_id")
+async def search_by_member_id(req: MemberIdRequest, request: Request):
+    return await run_search(member_id_search, request, req)
+
+
+# ----------------------------
+# API: Batch Member ID Search
+# ----------------------------
+def member_ids_search(config, req, cancel=None):
+
+    if not config:
+        return {"success": False, "error": "Please select company first."}
+
+    member_ids = clean_key_list(req.member_ids)
+    if not member_ids:
+        return {"success": False, "error": "No Member IDs given."}
+
+    metrics = new_search_metrics()
+
+    # every file answered once for all member ids
+    results = cached_search(config, "member_ids", member_ids, find_member_ids_all_dates_indexed, cancel, metrics)
+
+    return with_timings(build_member_id_batch_response(results), metrics, req.timings)
+
+
+@app.post("/search_by_member_ids")
+async def search_by_member_ids(req: MemberIdBatchRequest, request: Request):
+    return await run_search(member_ids_search, request, req)
 
 
 # ----------------------------
 # API: Search Member Name
 # ----------------------------
-@app.post("/search_by_member_name")
-def search_by_member_name(req: MemberNameRequest):
+def member_name_search(config, req, cancel=None):
 
-    if not api_state["config"]:
+    if not config:
         return {"success": False, "error": "Please select company first."}
 
     member_name = req.member_name.strip()
+    metrics = new_search_metrics()
 
-    BASE_PATH = api_state["config"]["base_path"]
-    ACTIVE_FOLDERS = api_state["config"]["active_folders"]
-    IS_AHH_AMO = api_state["config"]["is_ahh_amo"]
-    IS_TELADOC = api_state["config"]["is_teladoc"]
-    IS_SAVRX = api_state["config"]["is_savrx"]
-
-    if IS_AHH_AMO:
-        present, absent = find_member_name_all_dates_ahh_amo(BASE_PATH, member_name)
-    elif IS_TELADOC:
-        present, absent = find_member_name_all_dates_teladoc(BASE_PATH, ACTIVE_FOLDERS, member_name)
-    elif IS_SAVRX:
-        present, absent = find_member_name_all_dates_savrx(BASE_PATH, ACTIVE_FOLDERS, member_name)
-    else:
-        present, absent = find_member_name_all_dates(BASE_PATH, ACTIVE_FOLDERS, member_name)
+    # answered from the search index (repeat searches from the result cache)
+    present, absent = cached_search(config, "member_name", member_name, find_member_name_all_dates_indexed, cancel, metrics)
 
     if not present:
-        return {"success": False, "error": "Member Name not found."}
+        return with_timings({"success": False, "error": "Member Name not found."}, metrics, req.timings)
 
-    return {
+    return with_timings({
         "success": True,
         "member_name": member_name,
         "present_records": present,
         "absent_records": absent,
         "from": present[0]["date"],
         "to": present[-1]["date"]
-    }
+    }, metrics, req.timings)
+
+
+@app.post("/search_by_member_name")
+async def search_by_member_name(req: MemberNameRequest, request: Request):
+    return await run_search(member_name_search, request, req)
 
 
 # ----------------------------
 # API: Date Range Search
 # ----------------------------
-@app.post("/search_ssns_by_date_range")
-def search_ssns_by_date_range(req: DateRangeRequest):
+def date_range_search(config, req, cancel=None):
 
-    if not api_state["config"]:
+    if not config:
         return {"success": False, "error": "Please select company first."}
 
-    BASE_PATH = api_state["config"]["base_path"]
-    ACTIVE_FOLDERS = api_state["config"]["active_folders"]
-    IS_AHH_AMO = api_state["config"]["is_ahh_amo"]
-    IS_TELADOC = api_state["config"]["is_teladoc"]
-    IS_SAVRX = api_state["config"]["is_savrx"]
+    metrics = new_search_metrics()
 
     try:
-        if IS_AHH_AMO:
-            ssns = find_all_ssns_in_date_range_ahh_amo(BASE_PATH, req.start_date, req.end_date)
-        elif IS_TELADOC:
-            ssns = find_all_ssns_in_date_range_teladoc(BASE_PATH, ACTIVE_FOLDERS, req.start_date, req.end_date)
-        elif IS_SAVRX:
-            ssns = find_all_ssns_in_date_range_savrx(BASE_PATH, ACTIVE_FOLDERS, req.start_date, req.end_date)
-        else:
-            ssns = find_all_ssns_in_date_range(BASE_PATH, ACTIVE_FOLDERS, req.start_date, req.end_date)
+        ssns = cached_search(
+            config, "date_range", (req.start_date, req.end_date),
+            lambda config, key, cancel, metrics: find_all_ssns_in_date_range_indexed(
+                config, *key, cancel=cancel, metrics=metrics
+            ),
+            cancel,
+            metrics
+        )
 
-        return {
+        return with_timings({
             "success": True,
             "total_ssns": len(set(ssns)),
             "ssns": sorted(set(ssns))
+        }, metrics, req.timings)
+
+    except SearchCancelled:
+        return cancelled_response()
+
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+
+@app.post("/search_ssns_by_date_range")
+async def search_ssns_by_date_range(req: DateRangeRequest, request: Request):
+    return await run_search(date_range_search, request, req)
+
+
+# ----------------------------
+# Streaming (NDJSON) searches
+# ----------------------------
+# One JSON event per line, from the search index (only new or changed
+# files are scanned first), rows are sent in blocks of files:
+#   {"event": "records", "present": [...], "absent": [...]}  (per block of files, date order)
+#   {"event": "ssns", "ssns": [...]}                          (date range, per block of files)
+#   {"event": "done", ...}                                    (same fields as the plain endpoint, no records)
+
+def ndjson_event(event, **fields):
+    return json.dumps({"event": event, **fields}) + "\n"
+
+
+def stream_error(message):
+    yield ndjson_event("done", success=False, error=message)
+
+
+def stream_response(request, make_events, config=None, req=None):
+    """
+    make_events(cancel) -> blocking event generator of a new search,
+    which replaces the running search of the caller's session.
+
+    With req, identical streamed searches share one run (same flight key
+    as the plain endpoints, per streaming endpoint): a caller joining late
+    gets the events sent so far, then follows the running search.
+    """
+
+    flight_key = search_flight_key(config, request.url.path, req) if config and req else None
+
+    flight = inflight_searches.get(flight_key) if flight_key else None
+
+    if not flight or flight["cancel"].is_set():
+        if not search_slot_free():
+            return StreamingResponse(stream_error(BUSY_ERROR), media_type="application/x-ndjson")
+
+        flight = new_search()
+        flight.update(events=[], finished=False, updated=asyncio.Event())
+        flight["task"] = asyncio.create_task(
+            run_stream_flight(flight, make_events(flight["cancel"]), flight_key)
+        )
+
+        if flight_key:
+            inflight_searches[flight_key] = flight
+
+    waiter = join_search(flight)
+    supersede_search(request, waiter)
+
+    return StreamingResponse(
+        follow_stream(
+            flight, waiter,
+            request.url.path, config["selected_company"] if config else None
+        ),
+        media_type="application/x-ndjson"
+    )
+
+
+def stream_all_dates(config, search_type, key, build_done, cancel=None, timings=False):
+    """
+    Records of a single key search from the search index: files already
+    indexed first, then new or changed files as they are scanned, one
+    records event per block of files. A cached result is sent as one
+    records event, a finished search is cached (in scanner order) for the
+    plain endpoints.
+    """
+
+    if not config:
+        yield ndjson_event("done", success=False, error="Please select company first.")
+        return
+
+    started = time.perf_counter()
+    metrics = new_search_metrics()
+
+    cache_key = result_cache_key(config, search_type, key)
+    cached = get_cached_result(cache_key)
+    metrics["cache_hit"] = cached is not None
+
+    if cached is not None:
+        present, absent = cached
+        yield ndjson_event("records", present=present, absent=absent)
+
+    else:
+        present, absent = [], []
+
+        try:
+            for block_present, block_absent in iter_all_dates_indexed(config, search_type, key, cancel=cancel, metrics=metrics):
+                present.extend(block_present)
+                absent.extend(block_absent)
+                yield ndjson_event("records", present=block_present, absent=block_absent)
+
+        except SearchCancelled:
+            yield ndjson_event("done", **cancelled_response())
+            return
+
+        present = order_records(config, search_type, present)
+        absent = order_records(config, search_type, absent)
+        store_cached_result(cache_key, (present, absent))
+
+    metrics["total_s"] = time.perf_counter() - started
+    report_search_metrics(search_type, config, metrics, key)
+
+    yield ndjson_event("done", **with_timings(build_done(present, absent), metrics, timings))
+
+
+@app.post("/stream/search_by_ssn")
+async def stream_search_by_ssn(req: SSNRequest, request: Request):
+
+    ssn = req.ssn.strip().rstrip("~")
+
+    def build_done(present, absent):
+        if not present:
+            return {"success": False, "error": "SSN not found."}
+
+        return {
+            "success": True,
+            "ssn": ssn,
+            "from": present[0]["date"],
+            "to": present[-1]["date"],
+            "summary": generate_ssn_timeline_summary(present, absent)
+        }
+
+    try:
+        config = request_config(request, req)
+    except ValueError as e:
+        return stream_response(request, lambda cancel: stream_error(str(e)))
+
+    return stream_response(
+        request, lambda cancel: stream_all_dates(config, "ssn", ssn, build_done, cancel, req.timings),
+        config, req
+    )
+
+
+@app.post("/stream/search_by_member_id")
+async def stream_search_by_member_id(req: MemberIdRequest, request: Request):
+
+    member_id = req.member_id.strip().rstrip("~")
+
+    def build_done(present, absent):
+        if not present:
+            return {"success": False, "error": "Member ID not found."}
+
+        return {
+            "success": True,
+            "member_id": member_id,
+            "from": present[0]["date"],
+            "to": present[-1]["date"],
+            "summary": generate_member_id_timeline_summary(present, absent)
+        }
+
+    try:
+        config = request_config(request, req)
+    except ValueError as e:
+        return stream_response(request, lambda cancel: stream_error(str(e)))
+
+    return stream_response(
+        request, lambda cancel: stream_all_dates(config, "member_id", member_id, build_done, cancel, req.timings),
+        config, req
+    )
+
+
+@app.post("/stream/search_by_member_name")
+async def stream_search_by_member_name(req: MemberNameRequest, request: Request):
+
+    member_name = req.member_name.strip()
+
+    def build_done(present, absent):
+        if not present:
+            return {"success": False, "error": "Member Name not found."}
+
+        return {
+            "success": True,
+            "member_name": member_name,
+            "from": present[0]["date"],
+            "to": present[-1]["date"]
+        }
+
+    try:
+        config = request_config(request, req)
+    except ValueError as e:
+        return stream_response(request, lambda cancel: stream_error(str(e)))
+
+    return stream_response(
+        request, lambda cancel: stream_all_dates(config, "member_name", member_name, build_done, cancel, req.timings),
+        config, req
+    )
+
+
+def stream_date_range(config, start_date, end_date, cancel=None, timings=False):
+    """
+    SSNs of the files in the range from the search index, one ssns event
+    per block of files.
+    """
+
+    if not config:
+        yield ndjson_event("done", success=False, error="Please select company first.")
+        return
+
+    started = time.perf_counter()
+    metrics = new_search_metrics()
+
+    key = (start_date, end_date)
+    cache_key = result_cache_key(config, "date_range", key)
+    ssns = get_cached_result(cache_key)
+    metrics["cache_hit"] = ssns is not None
+
+    try:
+        if ssns is not None:
+            yield ndjson_event("ssns", ssns=sorted(set(ssns)))
+
+        else:
+            ssns = []
+
+            for block_ssns in iter_ssns_in_date_range_indexed(config, start_date, end_date, cancel=cancel, metrics=metrics):
+                if block_ssns:
+                    ssns.extend(block_ssns)
+                    yield ndjson_event("ssns", ssns=block_ssns)
+
+            ssns.sort()
+            store_cached_result(cache_key, ssns)
+
+    except SearchCancelled:
+        yield ndjson_event("done", **cancelled_response())
+        return
+
+    except Exception as e:
+        yield ndjson_event("done", success=False, error=str(e))
+        return
+
+    metrics["total_s"] = time.perf_counter() - started
+    report_search_metrics("date_range", config, metrics, (start_date, end_date))
+
+    done = {"success": True, "total_ssns": len(set(ssns))}
+    yield ndjson_event("done", **with_timings(done, metrics, timings))
+
+
+@app.post("/stream/search_ssns_by_date_range")
+async def stream_search_ssns_by_date_range(req: DateRangeRequest, request: Request):
+
+    try:
+        config = request_config(request, req)
+    except ValueError as e:
+        return stream_response(request, lambda cancel: stream_error(str(e)))
+
+    return stream_response(
+        request, lambda cancel: stream_date_range(config, req.start_date, req.end_date, cancel, req.timings),
+        config, req
+    )
+
+
+# ----------------------------
+# Background Jobs
+# ----------------------------
+# Long range / batch scans run as jobs: submitting returns a job id at once,
+# the scan runs on the job pool, progress is polled (GET /jobs/{id}) or
+# streamed (GET /jobs/{id}/events) and the result fetched when it is done.
+#
+# job = {"job_id", "search", "endpoint", "status", "progress", "result", "cancel", "finished"}
+# status -> "queued", "running", "done", "failed" or "cancelled"
+# Jobs above JOB_WORKERS wait in the queue, above the queue limit
+# submitting answers 503 (same as the search executor).
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", 2))
+JOB_QUEUE_LIMIT = int(os.environ.get("JOB_QUEUE_LIMIT", 8))
+JOB_TTL = 60 * 60   # seconds a finished job (and its result) is kept
+
+job_executor = ThreadPoolExecutor(
+    max_workers=JOB_WORKERS,
+    thread_name_prefix="job"
+)
+
+jobs = {}
+
+JOB_BUSY_ERROR = "Server busy, too many jobs queued. Please retry."
+
+
+def unfinished_jobs():
+    return sum(1 for job in list(jobs.values()) if job["status"] in ("queued", "running"))
+
+
+def job_status(job):
+    return {
+        "success": True,
+        "job_id": job["job_id"],
+        "search": job["search"],
+        "status": job["status"],
+        "progress": dict(job["progress"])
+    }
+
+
+def run_job(job, func, config, req):
+    """
+    Worker side of a job: func(config, req, cancel, progress) -> response dict.
+    """
+
+    if job["cancel"].is_set():
+        job["status"] = "cancelled"
+        job["finished"] = time.monotonic()
+        return
+
+    job["status"] = "running"
+    started = time.perf_counter()
+
+    try:
+        job["result"] = func(config, req, job["cancel"], job["progress"])
+        job["status"] = "done"
+
+    except SearchCancelled:
+        job["status"] = "cancelled"
+
+    except Exception as e:
+        job["result"] = {"success": False, "error": str(e)}
+        job["status"] = "failed"
+
+    job["finished"] = time.monotonic()
+    observe_search_latency(job["endpoint"], config["selected_company"], time.perf_counter() - started)
+
+
+async def submit_job(search, func, request, req):
+
+    try:
+        config = request_config(request, req)
+    except ValueError as e:
+        return {"success": False, "error": str(e)}
+
+    if not config:
+        return {"success": False, "error": "Please select company first."}
+
+    if unfinished_jobs() >= JOB_WORKERS + JOB_QUEUE_LIMIT:
+        return JSONResponse(
+            status_code=503,
+            content={"success": False, "error": JOB_BUSY_ERROR}
+        )
+
+    now = time.monotonic()
+
+    for job_id in [k for k, v in jobs.items() if v["finished"] and now - v["finished"] > JOB_TTL]:
+        del jobs[job_id]
+
+    job = {
+        "job_id": secrets.token_urlsafe(12),
+        "search": search,
+        "endpoint": request.url.path,
+        "status": "queued",
+        "progress": new_progress(),
+        "result": None,
+        "cancel": new_cancel_token(),
+        "finished": None
+    }
+    jobs[job["job_id"]] = job
+
+    job_executor.submit(run_job, job, func, config, req)
+
+    return job_status(job)
+
+
+def date_range_job(config, req, cancel, progress):
+
+    metrics = new_search_metrics()
+
+    # full scan over the process pool (progress per chunk), unchanged files
+    # answered from their membership sidecars, result cached for the plain
+    # endpoint
+    ssns = cached_search(
+        config, "date_range", (req.start_date, req.end_date),
+        lambda config, key, cancel, metrics: find_all_ssns_in_date_range_parallel(
+            config, *key, cancel=cancel, progress=progress, metrics=metrics
+        ),
+        cancel,
+        metrics
+    )
+
+    return with_timings({
+        "success": True,
+        "total_ssns": len(set(ssns)),
+        "ssns": sorted(set(ssns))
+    }, metrics, req.timings)
+
+
+def ssns_job(config, req, cancel, progress):
+
+    ssns = clean_key_list(req.ssns)
+    if not ssns:
+        return {"success": False, "error": "No SSNs given."}
+
+    metrics = new_search_metrics()
+
+    results = cached_search(
+        config, "ssns", ssns,
+        lambda config, key, cancel, metrics: find_ssns_all_dates(
+            config, key, cancel=cancel, progress=progress, metrics=metrics
+        ),
+        cancel,
+        metrics
+    )
+
+    return with_timings(build_ssn_batch_response(results), metrics, req.timings)
+
+
+def member_ids_job(config, req, cancel, progress):
+
+    member_ids = clean_key_list(req.member_ids)
+    if not member_ids:
+        return {"success": False, "error": "No Member IDs given."}
+
+    metrics = new_search_metrics()
+
+    results = cached_search(
+        config, "member_ids", member_ids,
+        lambda config, key, cancel, metrics: find_member_ids_all_dates(
+            config, key, cancel=cancel, progress=progress, metrics=metrics
+        ),
+        cancel,
+        metrics
+    )
+
+    return with_timings(build_member_id_batch_response(results), metrics, req.timings)
+
+
+@app.post("/jobs/search_ssns_by_date_range")
+async def job_search_ssns_by_date_range(req: DateRangeRequest, request: Request):
+    return await submit_job("date_range", date_range_job, request, req)
+
+
+@app.post("/jobs/search_by_ssns")
+async def job_search_by_ssns(req: SSNBatchRequest, request: Request):
+    return await submit_job("ssns", ssns_job, request, req)
+
+
+@app.post("/jobs/search_by_member_ids")
+async def job_search_by_member_ids(req: MemberIdBatchRequest, request: Request):
+    return await submit_job("member_ids", member_ids_job, request, req)
+
+
+# ----------------------------
+# API: Job Status / Result / Cancel
+# ----------------------------
+JOB_NOT_FOUND = {"success": False, "error": "Job not found."}
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+
+    job = jobs.get(job_id)
+    if not job:
+        return JSONResponse(status_code=404, content=JOB_NOT_FOUND)
+
+    return job_status(job)
+
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str):
+
+    job = jobs.get(job_id)
+    if not job:
+        return JSONResponse(status_code=404, content=JOB_NOT_FOUND)
+
+    # progress every half second until the job is finished
+    async def events():
+        while True:
+            finished = job["finished"] is not None
+            yield ndjson_event("progress", **job_status(job))
+            if finished:
+                return
+            await asyncio.sleep(0.5)
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+
+@app.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str):
+
+    job = jobs.get(job_id)
+    if not job:
+        return JSONResponse(status_code=404, content=JOB_NOT_FOUND)
+
+    if job["status"] == "cancelled":
+        return cancelled_response()
+
+    if job["status"] not in ("done", "failed"):
+        return {
+            "success": False,
+            "error": "Job not finished.",
+            "status": job["status"]
         }
 
+    return job["result"]
+
+
+@app.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str):
+
+    job = jobs.get(job_id)
+    if not job:
+        return JSONResponse(status_code=404, content=JOB_NOT_FOUND)
+
+    job["cancel"].set()
+
+    return job_status(job)
+
+
+# ----------------------------
+# API: Service Metrics
+# ----------------------------
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    return PlainTextResponse(
+        render_service_metrics(),
+        media_type="text/plain; version=0.0.4"
+    )
+
+
+# ----------------------------
+# Admin: Search Profiling
+# ----------------------------
+# Runs one search under cProfile (result cache skipped) and returns the
+# hot functions, the .prof file is kept in PROFILE_DIR (app data directory).
+# Disabled unless ADMIN_TOKEN is set, the caller sends it as X-Admin-Token.
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN")
+
+
+def admin_allowed(request):
+    token = request.headers.get("x-admin-token") or ""
+    return bool(ADMIN_TOKEN) and secrets.compare_digest(token, ADMIN_TOKEN)
+
+
+def run_profile(config, req):
+
+    if not config:
+        return {"success": False, "error": "Please select company first."}
+
+    if req.search == "date_range":
+        key = (req.start_date, req.end_date)
+        missing = not (req.start_date and req.end_date)
+    else:
+        key = req.key
+        missing = not req.key
+
+    if missing:
+        return {"success": False, "error": "Please give the search key."}
+
+    try:
+        return {"success": True, **profile_search(config, req.search, key, req.mode, req.top, req.save)}
     except Exception as e:
         return {"success": False, "error": str(e)}
+
+
+@app.post("/admin/profile")
+async def admin_profile(req: ProfileRequest, request: Request):
+
+    if not admin_allowed(request):
+        return JSONResponse(status_code=403, content={"success": False, "error": "Forbidden"})
+
+    try:
+        config = request_config(request, req)
+    except ValueError as e:
+        return {"success": False, "error": str(e)}
+
+    if not search_slot_free():
+        return JSONResponse(
+            status_code=503,
+            content={"success": False, "error": BUSY_ERROR}
+        )
+
+    search_load["active"] += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(search_executor, run_profile, config, req)
+    finally:
+        search_load["active"] -= 1
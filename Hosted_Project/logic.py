@@ -1,11 +1,35 @@
 import os
+import bisect
+import hashlib
+import heapq
+import json
+import locale
+import logging
+import mmap
+import multiprocessing
+import struct
+import sys
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from functools import lru_cache
 import re
 
 
 # Base Directory*************************************
 ROOT_PATH = r"D:\Transfers"
 
+# App Data*******************************************
+# search index, sidecars, slow search log and profiles hold member data:
+# kept out of the app directory (the hosted app serves files from it)
+APP_DATA_DIR = os.environ.get(
+    "APP_DATA_DIR",
+    os.path.join(os.path.expanduser("~"), ".ssn_extractor")
+)
+
 # company names**************************************
 COMPANIES = [
     "AHH_AMO",
@@ -14,6 +38,16 @@ COMPANIES = [
     "SAVRX"
 ]
 
+# Parallel scan settings******************************
+SCAN_WORKERS = int(os.environ.get("SCAN_WORKERS", os.cpu_count() or 1))
+SCAN_CHUNK_SIZE = int(os.environ.get("SCAN_CHUNK_SIZE", 16))    # files per worker task
+
+# workers are never forked from the (multi threaded) hosted app
+SCAN_START_METHOD = os.environ.get(
+    "SCAN_START_METHOD",
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
 # Default folders (used for ANTHEM)
 FOLDERS = [
     "152", "480", "521", "HWL", "IWU", "J84", "L82",
@@ -506,123 +540,364 @@ def extract_date_savrx(folder, filename):
 
 
 # 13-02-2026**********************************************************************
-def is_date_in_range(file_date, start_date, end_date):
+def range_ordinals(start_date, end_date):
     """
-    Strict Date Comparison
-    file_date  -> always MM-DD-YYYY (from filename)
-    start_date -> DD-MM-YYYY (from UI)
-    end_date   -> DD-MM-YYYY (from UI)
+    UI range (DD-MM-YYYY) -> (first, last) date ordinals for bisect
+    over the file manifest, None when a date is invalid.
+    Both bounds inclusive.
     """
 
     try:
-        file_dt = datetime.strptime(file_date, "%m-%d-%Y")
-        start_dt = datetime.strptime(start_date.strip(), "%d-%m-%Y")
-        end_dt = datetime.strptime(end_date.strip(), "%d-%m-%Y")
+        return (
+            datetime.strptime(start_date.strip(), "%d-%m-%Y").toordinal(),
+            datetime.strptime(end_date.strip(), "%d-%m-%Y").toordinal()
+        )
+    except Exception:
+        return None
 
-        return start_dt <= file_dt <= end_dt
 
-    except Exception:
-        return False
+# SEARCH CANCELLATION LOGIC***************************************************
+# cancel token = threading.Event, set when a newer search replaces this one
 
+class SearchCancelled(Exception):
+    pass
 
-# NEW LOGIC 14-02-2026*********************************************************
-def find_member_id_all_dates(base_path, folders, target_member_id, debug=False):
-    present_records = []
-    absent_records = []
 
-    for folder in folders:
-        if debug:
-            print("Searching Folder :", folder)
+def new_cancel_token():
+    return threading.Event()
 
-        backup_path = os.path.join(base_path, folder, "backups")
-        if not os.path.exists(backup_path):
-            continue
 
-        for file in os.listdir(backup_path):
+def check_cancelled(cancel):
+    if cancel is not None and cancel.is_set():
+        raise SearchCancelled("Search cancelled.")
 
-            if not file.endswith(".834"):
-                continue
 
-            date = extract_date(file, folder)
-            if not date:
-                continue
+def cancelled_response():
+    # the UI ignores it, a newer search owns the result box
+    return {"success": False, "cancelled": True, "error": "Search cancelled."}
 
-            file_path = os.path.join(backup_path, file)
 
-            with open(file_path, "r", errors="ignore") as f:
-                content = f.read()
+# SCAN PROGRESS LOGIC*********************************************************
+# progress dict filled by the scans (background jobs report it)
 
-           
-            if (
-                f"REF*OF*{target_member_id}~" in content
-                or f"REF*ABB*{target_member_id}~" in content
-            ):
-                present_records.append({
-                    "date": date,
-                    "filename": file
-                })
-            else:
-                absent_records.append({
-                    "date": date,
-                    "filename": file
-                })
+def new_progress():
+    return {"files_done": 0, "files_total": 0, "bytes_read": 0}
 
-            if debug:
-                print("---------------------------------------------------")
 
-    return (
-        sorted(
-            present_records,
-            key=lambda x: datetime.strptime(x["date"], "%m-%d-%Y")
-        ),
-        sorted(
-            absent_records,
-            key=lambda x: datetime.strptime(x["date"], "%m-%d-%Y")
-        )
+def progress_files_total(progress, count):
+    if progress is not None:
+        progress["files_total"] += count
+
+
+def progress_files_done(progress, file_paths):
+    if progress is None:
+        return
+
+    for file_path in file_paths:
+        try:
+            progress["bytes_read"] += os.path.getsize(file_path)
+        except OSError:
+            pass
+
+    progress["files_done"] += len(file_paths)
+
+
+# SEARCH METRICS LOGIC********************************************************
+# metrics dict filled along one search (instead of the debug prints),
+# returned as "timings" and written to the search log
+
+SLOWEST_FILES = 5       # slowest files kept per search
+
+search_logger = logging.getLogger("ssn_extractor.search")
+
+
+def new_search_metrics():
+    """
+    files_listed            -> manifest entries looked at
+    files_skipped_extension -> not a file type the company scanner reads
+    files_skipped_date      -> no date / outside the date range
+    files_opened, bytes_read
+    sidecar_hits / sidecars_written -> membership sidecars (file_membership)
+    list_s  -> directory listing + file selection
+    io_s    -> open + map + literal prefilter pass (touches every page)
+    regex_s -> member segment regex (page faults included when no prefilter)
+    per_folder -> backups folder -> {files, bytes, list_s, scan_s}
+    """
+
+    return {
+        "files_listed": 0,
+        "files_skipped_extension": 0,
+        "files_skipped_date": 0,
+        "files_opened": 0,
+        "bytes_read": 0,
+        "list_s": 0.0,
+        "io_s": 0.0,
+        "regex_s": 0.0,
+        "sidecar_hits": 0,
+        "sidecars_written": 0,
+        "slowest_files": [],
+        "per_folder": {},
+    }
+
+
+def metrics_add(metrics, name, value=1):
+    if metrics is not None:
+        metrics[name] = metrics.get(name, 0) + value
+
+
+def backups_folder_name(backup_path):
+    """
+    Name of the folder holding a backups directory (the SAVRX / ANTHEM
+    subfolder, "MEI" for TELADOC, "AHH_AMO" for AHH_AMO).
+    """
+
+    return os.path.basename(os.path.dirname(backup_path))
+
+
+def metrics_folder(metrics, folder, name, value=1):
+    """
+    Per folder counter of a search: files / bytes read, list_s / scan_s time.
+    """
+
+    if metrics is None:
+        return
+
+    stats = metrics.setdefault("per_folder", {}).setdefault(
+        folder, {"files": 0, "bytes": 0, "list_s": 0.0, "scan_s": 0.0}
     )
+    stats[name] += value
 
 
-# new logic 14-02-2026******************************************************
-def find_member_id_all_dates_ahh_amo(base_path, target_member_id, debug=False):
+def metrics_file_read(metrics, file_path, size, io_s, regex_s):
+    if metrics is None:
+        return
+
+    folder = backups_folder_name(os.path.dirname(file_path))
+    metrics_folder(metrics, folder, "files")
+    metrics_folder(metrics, folder, "bytes", size)
+    metrics_folder(metrics, folder, "scan_s", io_s + regex_s)
+
+    metrics["files_opened"] += 1
+    metrics["bytes_read"] += size
+    metrics["io_s"] += io_s
+    metrics["regex_s"] += regex_s
+
+    slowest = metrics["slowest_files"]
+    slowest.append({
+        "file": os.path.basename(file_path),
+        "seconds": io_s + regex_s,
+        "bytes": size
+    })
+    slowest.sort(key=lambda item: item["seconds"], reverse=True)
+    del slowest[SLOWEST_FILES:]
+
+
+def merge_search_metrics(metrics, other):
+    """
+    Adds the metrics of a worker chunk to the search metrics.
+    """
+
+    if metrics is None:
+        return
+
+    for name, value in other.items():
+        if name == "slowest_files":
+            metrics[name] = sorted(
+                metrics[name] + value,
+                key=lambda item: item["seconds"],
+                reverse=True
+            )[:SLOWEST_FILES]
+        elif name == "per_folder":
+            for folder, stats in value.items():
+                for stat, amount in stats.items():
+                    metrics_folder(metrics, folder, stat, amount)
+        else:
+            metrics[name] = metrics.get(name, 0) + value
+
+
+def search_timings(metrics):
+    """
+    metrics -> "timings" block of an API response (seconds rounded to 0.1 ms).
+    """
+
+    timings = {}
+
+    for name, value in metrics.items():
+        if isinstance(value, float):
+            value = round(value, 4)
+        elif name == "slowest_files":
+            value = [dict(item, seconds=round(item["seconds"], 4)) for item in value]
+        elif name == "per_folder":
+            value = {
+                folder: {stat: round(amount, 4) for stat, amount in stats.items()}
+                for folder, stats in value.items()
+            }
+        timings[name] = value
+
+    return timings
+
+
+def with_timings(response, metrics, timings=False):
+    """
+    Adds the optional "timings" block to an API response.
+    """
+
+    if timings:
+        response["timings"] = search_timings(metrics)
+
+    return response
+
+
+def enable_search_log(level=logging.INFO):
+    """
+    Writes the search log lines to stderr (once, the apps call it at start).
+    """
+
+    if not search_logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(asctime)s %(name)s %(message)s"))
+        search_logger.addHandler(handler)
+
+    search_logger.setLevel(level)
+
+
+# SLOW SEARCH LOG*************************************************************
+# searches slower than SLOW_SEARCH_SECONDS are appended (one JSON line each)
+# to SLOW_SEARCH_LOG with the per folder breakdown, SSN / member ID masked
+
+SLOW_SEARCH_SECONDS = float(os.environ.get("SLOW_SEARCH_SECONDS", 5))
+
+SLOW_SEARCH_LOG = os.environ.get(
+    "SLOW_SEARCH_LOG",
+    os.path.join(APP_DATA_DIR, "slow_searches.log")
+)
+
+_slow_search_lock = threading.Lock()
+
+
+def mask_identifier(value):
+    value = str(value)
+    return "*" * max(len(value) - 4, 0) + value[-4:]
+
+
+def masked_search_key(key_type, key):
+    """
+    What the slow search log keeps of the key: last 4 characters of an
+    SSN / member ID, the count of a batch, the dates of a range, no names.
+    """
+
+    if key is None or key_type == "member_name":
+        return None
+    if key_type == "date_range":
+        return list(key)
+    if key_type in ("ssns", "member_ids"):
+        return f"{len(key)} keys"
+    return mask_identifier(key)
+
+
+def write_slow_search(key_type, config, metrics, key=None):
+
+    entry = {
+        "time": datetime.now().isoformat(timespec="seconds"),
+        "company": config["selected_company"],
+        "subfolder": config.get("selected_subfolder"),
+        "folders": config["active_folders"],
+        "key_type": key_type,
+        "key": masked_search_key(key_type, key),
+        **search_timings(metrics)
+    }
+
+    try:
+        with _slow_search_lock:
+            os.makedirs(os.path.dirname(os.path.abspath(SLOW_SEARCH_LOG)), exist_ok=True)
+            with open(SLOW_SEARCH_LOG, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+    except OSError as e:
+        search_logger.warning("slow search log not written: %s", e)
+
+
+# observer(key_type, config, metrics) called for every finished search
+# (e.g. the hosted app's /metrics counters)
+search_metrics_observers = []
+
+
+def report_search_metrics(key_type, config, metrics, key=None):
+    """
+    Finished search: one structured (JSON) log line without the searched
+    key, the slow search log when above SLOW_SEARCH_SECONDS, then the
+    registered observers.
+    """
+
+    if search_logger.isEnabledFor(logging.INFO):
+        search_logger.info(json.dumps({
+            "event": "search",
+            "key_type": key_type,
+            "company": config["selected_company"],
+            "folders": config["active_folders"],
+            **search_timings(metrics)
+        }))
+
+    if metrics.get("total_s", 0) >= SLOW_SEARCH_SECONDS:
+        write_slow_search(key_type, config, metrics, key)
+
+    for observer in search_metrics_observers:
+        observer(key_type, config, metrics)
+
+
+# NEW LOGIC 14-02-2026*********************************************************
+def find_member_id_all_dates(base_path, folders, target_member_id, debug=False, cancel=None, metrics=None):
     present_records = []
     absent_records = []
 
-    backup_path = os.path.join(base_path, "backups")
+    # literal check first, most files only prove absence
+    prefilter = member_id_prefilter(target_member_id, "anthem")
 
-    if debug:
-        print("Backup Path :", backup_path)
+    # files come from the cached manifest, already in date order
+    for folder, file_path, file, date in iter_folder_files(
+        "anthem", base_path, folders, "member_id", debug, cancel=cancel, metrics=metrics
+    ):
 
-    if not os.path.exists(backup_path):
-        return [], []
+        members = read_file_members(file_path, prefilter, metrics)
 
-    member_id_pattern = re.compile(
-        rf"REF\*(0F|ABB)\*{re.escape(target_member_id)}(\*|~|\b)",
-        re.IGNORECASE
-    )
+        if count_member_id_matches(members, target_member_id, "anthem") > 0:
+            present_records.append({
+                "date": date,
+                "filename": file
+            })
+        else:
+            absent_records.append({
+                "date": date,
+                "filename": file
+            })
 
-    for file in os.listdir(backup_path):
+    return present_records, absent_records
 
-        if debug:
-            print("Checking file for Member ID:", file)
 
-        if not file.lower().endswith((".txt", ".834")):
-            continue
+# new logic 14-02-2026******************************************************
+def find_member_id_all_dates_ahh_amo(base_path, target_member_id, debug=False, cancel=None, metrics=None):
+    present_records = []
+    absent_records = []
+
+    # literal check first, most files only prove absence
+    prefilter = member_id_prefilter(target_member_id, "ahh_amo")
+
+    if debug:
+        search_logger.debug("Backup Path : %s", os.path.join(base_path, "backups"))
 
-        # SAME DATE EXTRACTION *********************************
-        date = extract_date_ahh_amo(file)
+    for folder, file_path, file, date in iter_folder_files(
+        "ahh_amo", base_path, [""], "member_id", cancel=cancel, metrics=metrics
+    ):
 
-        file_path = os.path.join(backup_path, file)
+        if debug:
+            search_logger.debug("Checking file for Member ID : %s", file)
 
-        with open(file_path, "r", errors="ignore") as f:
-            content = f.read()
+        members = read_file_members(file_path, prefilter, metrics)
 
         found = False
 
-        if member_id_pattern.search(content):
+        if count_member_id_matches(members, target_member_id, "ahh_amo") > 0:
             if debug:
-                print("Member ID match found:", target_member_id)
-                print("File:", file)
-                print("Extracted date:", date)
+                search_logger.debug("Member ID match found in file : %s (date %s)", file, date)
 
             found = True
 
@@ -636,20 +911,8 @@ def find_member_id_all_dates_ahh_amo(base_path, target_member_id, debug=False):
         else:
             absent_records.append(record)
 
-        if debug:
-            print("-------------------------------------")
-
-    # Safe date sorting (no skip if date is None)
-    def safe_sort(records):
-        return sorted(
-            records,
-            key=lambda x: datetime.strptime(x["date"], "%m-%d-%Y") if x["date"] else datetime.min
-        )
-
-    return (
-        safe_sort(present_records),
-        safe_sort(absent_records)
-    )
+    # manifest order already puts files without date first
+    return present_records, absent_records
 
 
 # new logic 14-02-2026******************************************************
@@ -659,67 +922,39 @@ def find_member_id_all_dates_teladoc(
     base_path,
     folders,
     target_member_id,
-    debug=False
+    debug=False,
+    cancel=None,
+    metrics=None
 ):
     present_records = []
     absent_records = []
 
-    # Exact same regex (unchanged)
-    member_id_pattern = re.compile(
-        rf"REF\*(0F|OF|ABB)\*{re.escape(target_member_id)}~",
-        re.IGNORECASE
-    )
+    # literal check first, most files only prove absence
+    prefilter = member_id_prefilter(target_member_id, "teladoc")
 
-    for folder in folders:
+    for folder, file_path, file, date in iter_folder_files(
+        "teladoc", base_path, folders, "member_id", debug, cancel=cancel, metrics=metrics
+    ):
 
         if debug:
-            print(f"Searching in Folder : {folder}")
-
-        backup_path = os.path.join(base_path, folder, "backups")
-        if not os.path.exists(backup_path):
-            continue
-
-        for file in os.listdir(backup_path):
-
-            if debug:
-                print(f"Searching in File : {file}")
-                print("-" * 95)
-
-            if not file.endswith(".834"):
-                continue
+            search_logger.debug("Searching in File : %s", file)
 
-            # ---- DATE EXTRACTION **************************
-            date = extract_date_teladoc(file)
+        members = read_file_members(file_path, prefilter, metrics)
 
-            file_path = os.path.join(backup_path, file)
+        # ---- COUNT MATCHES (unchanged behaviour) ----
+        match_count = count_member_id_matches(members, target_member_id, "teladoc")
 
-            with open(file_path, "r", errors="ignore") as f:
-                content = f.read()
-
-            # ---- COUNT MATCHES (unchanged behaviour) ----
-            matches = member_id_pattern.findall(content)
-            match_count = len(matches)
-
-            record = {
-                "date": date,
-                "filename": file
-            }
+        record = {
+            "date": date,
+            "filename": file
+        }
 
-            if match_count > 0:
-                present_records.append(record)
-            else:
-                absent_records.append(record)
+        if match_count > 0:
+            present_records.append(record)
+        else:
+            absent_records.append(record)
 
-    return (
-        sorted(
-            present_records,
-            key=lambda x: datetime.strptime(x["date"], "%m-%d-%Y") if x["date"] else datetime.min
-        ),
-        sorted(
-            absent_records,
-            key=lambda x: datetime.strptime(x["date"], "%m-%d-%Y") if x["date"] else datetime.min
-        )
-    )
+    return present_records, absent_records
 
 
 # new logic : 14-02-2026********************************************************
@@ -728,78 +963,47 @@ def find_member_id_all_dates_savrx(
     base_path,
     folders,
     target_member_id,
-    debug=False
+    debug=False,
+    cancel=None,
+    metrics=None
 ):
     present_records = []
     absent_records = []
 
-    # Exact flexible REF logic (unchanged)
-    member_id_pattern = re.compile(
-        rf"REF\*(0F|OF|ABB)\*{re.escape(target_member_id)}(\*|~|\b)",
-        re.IGNORECASE
-    )
+    # literal check first, most files only prove absence
+    prefilter = member_id_prefilter(target_member_id, "savrx")
 
-    for folder in folders:
+    # every file type, folder-wise date (unchanged)
+    for folder, file_path, file, date in iter_folder_files(
+        "savrx", base_path, folders, "member_id", debug, cancel=cancel, metrics=metrics
+    ):
 
         if debug:
-            print(f"\nSearching in Folder : {folder}")
+            search_logger.debug("Searching in file : %s", file)
 
-        backup_path = os.path.join(base_path, folder, "backups")
+        members = read_file_members(file_path, prefilter, metrics)
 
-        if debug:
-            print(backup_path)
+        # ---- MEMBER ID MATCH COUNT (unchanged behaviour) ----
+        match_count = count_member_id_matches(members, target_member_id, "savrx")
 
-        if not os.path.exists(backup_path):
-            continue
+        record = {
+            "date": date,
+            "filename": file
+        }
 
-        for file in os.listdir(backup_path):
+        if match_count > 0:
 
             if debug:
-                print(f"Searching in file : {file}")
-                print("-" * 72)
-
-            file_path = os.path.join(backup_path, file)
-
-            with open(file_path, "r", errors="ignore") as f:
-                content = f.read()
-
-            # ---- DATE EXTRACTION (unchanged) ----
-            date = extract_date_savrx(folder, file)
-
-            # ---- MEMBER ID MATCH COUNT (unchanged behaviour) ----
-            matches = member_id_pattern.findall(content)
-            match_count = len(matches)
-
-            record = {
-                "date": date,
-                "filename": file
-            }
-
-            if match_count > 0:
-
-                if debug:
-                    print(
-                        f"Member ID {target_member_id} found "
-                        f"{match_count} times in file : {file}"
-                    )
-
-                present_records.append(record)
-            else:
-                absent_records.append(record)
+                search_logger.debug(
+                    "Member ID found %s times in file : %s",
+                    match_count, file
+                )
 
-            if debug:
-                print("------------------------------------------------")
+            present_records.append(record)
+        else:
+            absent_records.append(record)
 
-    return (
-        sorted(
-            present_records,
-            key=lambda x: datetime.strptime(x["date"], "%m-%d-%Y") if x["date"] else datetime.min
-        ),
-        sorted(
-            absent_records,
-            key=lambda x: datetime.strptime(x["date"], "%m-%d-%Y") if x["date"] else datetime.min
-        )
-    )
+    return present_records, absent_records
 
 
 # MEMBER NAME SEARCH LOGIC**************************************************
@@ -812,72 +1016,38 @@ def find_member_name_all_dates(
     base_path,
     folders,
     target_member_name,
-    debug=False
+    debug=False,
+    cancel=None,
+    metrics=None
 ):
     present_records = []
     absent_records = []
 
     target_name = target_member_name.upper().strip()
+    prefilter = member_name_prefilter(target_name)
 
-    for folder in folders:
-
-        if debug:
-            print(f"Searching in Folder : {folder}")
-
-        backup_path = os.path.join(base_path, folder, "backups")
-        if not os.path.exists(backup_path):
-            continue
-
-        for file in os.listdir(backup_path):
-
-            if not file.endswith(".834"):
-                continue
-
-            date = extract_date(file, folder)
-            if not date:
-                continue
+    # files come from the cached manifest, already in date order
+    for folder, file_path, file, date in iter_folder_files(
+        "anthem", base_path, folders, "member_name", debug, cancel=cancel, metrics=metrics
+    ):
 
-            file_path = os.path.join(backup_path, file)
+        members = read_file_members(file_path, prefilter, metrics)
 
-            with open(file_path, "r", errors="ignore") as f:
-                content = f.read()
+        # names come back cleaned + upper case
+        found = target_name in member_names(members)
 
-            matches = MEMBER_NAME_PATTERN.findall(content)
-
-            found = False
-
-            # Original matching behaviour preserved
-            for name in matches:
-                clean_name = name.replace("*", " ").strip()
-
-                if clean_name.upper() == target_name:
-                    found = True
-                    break
-
-            if found:
-                present_records.append({
-                    "date": date,
-                    "filename": file
-                })
-            else:
-                absent_records.append({
-                    "date": date,
-                    "filename": file
-                })
-
-            if debug:
-                print("---------------------------------------------------")
+        if found:
+            present_records.append({
+                "date": date,
+                "filename": file
+            })
+        else:
+            absent_records.append({
+                "date": date,
+                "filename": file
+            })
 
-    return (
-        sorted(
-            present_records,
-            key=lambda x: datetime.strptime(x["date"], "%m-%d-%Y")
-        ),
-        sorted(
-            absent_records,
-            key=lambda x: datetime.strptime(x["date"], "%m-%d-%Y")
-        )
-    )
+    return present_records, absent_records
 
 
 # new logic 14-02-2026******************************************************
@@ -885,46 +1055,29 @@ def find_member_name_all_dates(
 def find_member_name_all_dates_ahh_amo(
     base_path,
     target_member_name,
-    debug=False
+    debug=False,
+    cancel=None,
+    metrics=None
 ):
     present_records = []
     absent_records = []
 
     target_name = target_member_name.upper().strip()
-
-    backup_path = os.path.join(base_path, "backups")
+    prefilter = member_name_prefilter(target_name)
 
     if debug:
-        print("Backup Path :", backup_path)
-
-    if not os.path.exists(backup_path):
-        return [], []
+        search_logger.debug("Backup Path : %s", os.path.join(base_path, "backups"))
 
-    for file in os.listdir(backup_path):
+    for folder, file_path, file, date in iter_folder_files(
+        "ahh_amo", base_path, [""], "member_name", cancel=cancel, metrics=metrics
+    ):
 
         if debug:
-            print("Checking file for Member Name:", file)
-
-        if not file.lower().endswith((".txt", ".834")):
-            continue
-
-        date = extract_date_ahh_amo(file)
-
-        file_path = os.path.join(backup_path, file)
-
-        with open(file_path, "r", errors="ignore") as f:
-            content = f.read()
-
-        matches = MEMBER_NAME_PATTERN.findall(content)
-
-        found = False
+            search_logger.debug("Checking file for Member Name : %s", file)
 
-        for raw_name in matches:
-            clean_name = raw_name.replace("*", " ").strip()
+        members = read_file_members(file_path, prefilter, metrics)
 
-            if clean_name.upper() == target_name:
-                found = True
-                break
+        found = target_name in member_names(members)
 
         if found:
             present_records.append({
@@ -937,19 +1090,7 @@ def find_member_name_all_dates_ahh_amo(
                 "filename": file
             })
 
-        if debug:
-            print("-------------------------------------")
-
-    return (
-        sorted(
-            present_records,
-            key=lambda x: datetime.strptime(x["date"], "%m-%d-%Y") if x["date"] else datetime.min
-        ),
-        sorted(
-            absent_records,
-            key=lambda x: datetime.strptime(x["date"], "%m-%d-%Y") if x["date"] else datetime.min
-        )
-    )
+    return present_records, absent_records
 
 
 
@@ -959,62 +1100,35 @@ def find_member_name_all_dates_teladoc(
     base_path,
     folders,
     target_member_name,
-    debug=False
+    debug=False,
+    cancel=None,
+    metrics=None
 ):
     present_records = []
     absent_records = []
 
     target_name = target_member_name.upper().strip()
+    prefilter = member_name_prefilter(target_name)
 
-    for folder in folders:
-
-        backup_path = os.path.join(base_path, folder, "backups")
-        if not os.path.exists(backup_path):
-            continue
-
-        for file in os.listdir(backup_path):
+    for folder, file_path, file, date in iter_folder_files(
+        "teladoc", base_path, folders, "member_name", cancel=cancel, metrics=metrics
+    ):
 
-            if not file.endswith(".834"):
-                continue
+        members = read_file_members(file_path, prefilter, metrics)
 
-            date = extract_date_teladoc(file)
+        found = target_name in member_names(members)
 
-            file_path = os.path.join(backup_path, file)
-
-            with open(file_path, "r", errors="ignore") as f:
-                content = f.read()
+        record = {
+            "date": date,
+            "filename": file
+        }
 
-            matches = MEMBER_NAME_PATTERN.findall(content)
+        if found:
+            present_records.append(record)
+        else:
+            absent_records.append(record)
 
-            found = False
-
-            for raw_name in matches:
-                clean_name = raw_name.replace("*", " ").strip()
-
-                if clean_name.upper() == target_name:
-                    found = True
-                    break
-
-            record = {
-                "date": date,
-                "filename": file
-            }
-
-            if found:
-                present_records.append(record)
-            else:
-                absent_records.append(record)
-
-    return (
-        sorted(
-            present_records,
-            key=lambda x: datetime.strptime(x["date"], "%m-%d-%Y") if x["date"] else datetime.min
-        ),
-        sorted(
-            absent_records,
-            key=lambda x: datetime.strptime(x["date"], "%m-%d-%Y") if x["date"] else datetime.min
-        )
-    )
+    return present_records, absent_records
 
 
 
@@ -1023,624 +1137,1463 @@ def find_member_name_all_dates_savrx(
     base_path,
     folders,
     target_member_name,
-    debug=False
+    debug=False,
+    cancel=None,
+    metrics=None
 ):
     present_records = []
     absent_records = []
 
     # normalize input (unchanged behaviour)
     target_name = target_member_name.upper().strip()
+    prefilter = member_name_prefilter(target_name)
 
-    for folder in folders:
+    # every file type, folder-wise date (unchanged)
+    for folder, file_path, file, date in iter_folder_files(
+        "savrx", base_path, folders, "member_name", debug, cancel=cancel, metrics=metrics
+    ):
 
         if debug:
-            print(f"\nSearching in Folder : {folder}")
+            search_logger.debug("Searching in file : %s", file)
 
-        backup_path = os.path.join(base_path, folder, "backups")
+        members = read_file_members(file_path, prefilter, metrics)
 
-        if not os.path.exists(backup_path):
-            continue
+        # ---- MEMBER NAME MATCH COUNT (unchanged) ----
+        match_count = member_names(members).count(target_name)
+
+        record = {
+            "date": date,
+            "filename": file
+        }
 
-        for file in os.listdir(backup_path):
+        if match_count > 0:
 
             if debug:
-                print(f"Searching in file : {file}")
-                print("-" * 72)
+                search_logger.debug(
+                    "Member Name found %s times in file : %s",
+                    match_count, file
+                )
 
-            file_path = os.path.join(backup_path, file)
+            present_records.append(record)
+        else:
+            absent_records.append(record)
 
-            # read ALL file types (unchanged behaviour)
-            with open(file_path, "r", errors="ignore") as f:
-                content = f.read()
+    return present_records, absent_records
 
-            # ---- DATE EXTRACTION (unchanged) ----
-            date = extract_date_savrx(folder, file)
 
-            # ---- MEMBER NAME MATCH COUNT (unchanged) ----
-            matches = MEMBER_NAME_PATTERN.findall(content)
-            match_count = 0
+# SSN SEARCH LOGIC*****************************************************
+# *********************************************************************
 
-            for raw_name in matches:
-                clean_name = raw_name.replace("*", " ").strip()
 
-                if clean_name.upper() == target_name:
-                    match_count += 1
+# Exact same SSN pattern*********************
+SSN_PATTERN = re.compile(
+    r"NM1\*IL\*1\*.*?\*+34\*(\d{9})~"
+)
 
-            record = {
-                "date": date,
-                "filename": file
-            }
 
-            if match_count > 0:
+# SINGLE PASS MEMBER EXTRACTION******************************************
+# **********************************************************************
 
-                if debug:
-                    print(
-                        f"Member Name '{target_member_name}' found "
-                        f"{match_count} times in file : {file}"
-                    )
+# One walk over the member segments of a file:
+# INS starts a member loop, REF*0F/OF/ABB is the member id,
+# NM1*IL*1 holds member name and SSN (same fields as the old patterns)
+# Bytes pattern: runs directly on the mmap of the file, no decode / copy
+MEMBER_SEGMENT_PATTERN = re.compile(
+    rb"(INS)\*"
+    rb"|(?i:REF)\*((?i:0F|OF|ABB))\*([^~]*)~"
+    rb"|NM1\*IL\*1\*([^~]*)~"
+)
 
-                present_records.append(record)
-            else:
-                absent_records.append(record)
+# captured fields are decoded like open(file, "r", errors="ignore") did
+FILE_ENCODING = locale.getpreferredencoding(False)
 
-            if debug:
-                print("------------------------------------------------")
+NM1_NAME_PATTERN = re.compile(r"(.+?)\*{3,}")
+NM1_SSN_PATTERN = re.compile(r"\*34\*(\d{9})$")
 
-    return (
-        sorted(
-            present_records,
-            key=lambda x: datetime.strptime(x["date"], "%m-%d-%Y") if x["date"] else datetime.min
-        ),
-        sorted(
-            absent_records,
-            key=lambda x: datetime.strptime(x["date"], "%m-%d-%Y") if x["date"] else datetime.min
-        )
-    )
+# (qualifiers, ignore case, id must end the segment) per scanner family
+MEMBER_ID_RULES = {
+    "anthem":  (("OF", "ABB"), False, True),
+    "ahh_amo": (("0F", "ABB"), True, False),
+    "teladoc": (("0F", "OF", "ABB"), True, True),
+    "savrx":   (("0F", "OF", "ABB"), True, False),
+}
 
 
-# SSN SEARCH LOGIC*****************************************************
-# *********************************************************************
+def extract_members(content):
+    """
+    Walks the member segments of one 834 file once.
+    content -> bytes / mmap buffer (str is encoded first)
 
+    Returns one tuple per member loop:
+    (ssn, member_ids, name)
 
-# Exact same SSN pattern*********************
-SSN_PATTERN = re.compile(
-    r"NM1\*IL\*1\*.*?\*+34\*(\d{9})~"
-)
+    ssn        -> 9 digit SSN from NM1*IL*1 (qualifier 34) or None
+    member_ids -> tuple of (qualifier, value) from REF*0F / REF*OF / REF*ABB
+    name       -> cleaned upper case member name or None
+    """
 
+    if isinstance(content, str):
+        content = content.encode(FILE_ENCODING, errors="ignore")
 
-# new logic 14-02-2026***********************************************************************
-# *******************************************************************************************
+    members = []
+    current = None
 
-def find_ssn_all_dates(
-    base_path,
-    folders,
-    target_ssn,
-    debug=False
-):
-    present_records = []
-    absent_records = []
+    def flush():
+        if current and (current["ssn"] or current["member_ids"] or current["name"]):
+            members.append((current["ssn"], tuple(current["member_ids"]), current["name"]))
 
-    for folder in folders:
+    for match in MEMBER_SEGMENT_PATTERN.finditer(content):
+        is_ins, qualifier, ref_value, nm1 = match.groups()
 
-        if debug:
-            print("Searching in folder:", folder)
+        # new loop on INS (or a second NM1*IL without INS in between)
+        if is_ins or current is None or (nm1 is not None and current["has_nm1"]):
+            flush()
+            current = {"ssn": None, "member_ids": [], "name": None, "has_nm1": False}
 
-        backup_path = os.path.join(base_path, folder, "backups")
-        if not os.path.exists(backup_path):
-            continue
+        if qualifier:
+            current["member_ids"].append((
+                qualifier.decode(FILE_ENCODING, errors="ignore"),
+                ref_value.decode(FILE_ENCODING, errors="ignore")
+            ))
+
+        elif nm1 is not None:
+            current["has_nm1"] = True
+            nm1 = nm1.decode(FILE_ENCODING, errors="ignore")
+
+            name_match = NM1_NAME_PATTERN.match(nm1)
+            if name_match:
+                current["name"] = name_match.group(1).replace("*", " ").strip().upper()
+
+            ssn_match = NM1_SSN_PATTERN.search(nm1)
+            if ssn_match:
+                current["ssn"] = ssn_match.group(1)
+
+    flush()
 
-        for file in os.listdir(backup_path):
+    return members
 
-            if not file.endswith(".834"):
-                continue
 
-            date = extract_date(file, folder)
-            if not date:
-                continue
+def read_file_members(file_path, prefilter=None, metrics=None):
+    """
+    One extraction pass per file, shared by every search type.
+
+    The file is memory mapped and searched as bytes, so a multi-megabyte
+    834 is never decoded or copied into a Python string.
+
+    prefilter -> optional bytes literal / compiled bytes pattern that must
+    appear in the file (see *_prefilter below). Files without it return []
+    right away, so proving absence costs one literal search.
+
+    metrics -> optional search metrics, gets the file's I/O and regex time.
+    """
 
-            file_path = os.path.join(backup_path, file)
+    started = time.perf_counter()
 
-            with open(file_path, "r", errors="ignore") as f:
-                content = f.read()
+    with open(file_path, "rb") as f:
+        try:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # empty file cannot be mapped
+            metrics_file_read(metrics, file_path, 0, time.perf_counter() - started, 0.0)
+            return []
 
-            matches = SSN_PATTERN.findall(content)
+        with buffer:
+            members = []
 
-            # If SSN present
-            if target_ssn in matches:
-                present_records.append({
-                    "date": date,
-                    "filename": file
-                })
+            if prefilter is None:
+                found = True
+            elif isinstance(prefilter, bytes):
+                found = buffer.find(prefilter) != -1
             else:
-                absent_records.append({
-                    "date": date,
-                    "filename": file
-                })
+                found = prefilter.search(buffer) is not None
 
-            if debug:
-                print("---------------------------------------------------")
+            io_done = time.perf_counter()
 
-    return (
-        sorted(
-            present_records,
-            key=lambda x: datetime.strptime(x["date"], "%m-%d-%Y")
-        ),
-        sorted(
-            absent_records,
-            key=lambda x: datetime.strptime(x["date"], "%m-%d-%Y")
-        )
-    )
+            if found:
+                members = extract_members(buffer)
 
+            metrics_file_read(
+                metrics, file_path, len(buffer),
+                io_done - started, time.perf_counter() - io_done
+            )
 
-# new logic 14-02-2026******************************************************
-def find_ssn_all_dates_ahh_amo(
-    base_path,
-    target_ssn,
-    debug=False
-):
-    present_records = []
-    absent_records = []
+            return members
 
-    backup_path = os.path.join(base_path, "backups")
 
-    if not os.path.exists(backup_path):
-        return [], []
+# LITERAL PREFILTERS (single key lookups)******************************
+# Each needle is a literal every matching file must contain.
 
-    for file in os.listdir(backup_path):
+def ssn_prefilter(target_ssn):
+    """
+    NM1*IL*1*...*34*<ssn>~
+    """
 
-        if debug:
-            print("Checking file for SSN:", file)
+    return f"*34*{target_ssn}~".encode(FILE_ENCODING, errors="ignore")
 
-        # Same behaviour: no extension restriction
 
-        date = extract_date_ahh_amo(file)
+def member_id_prefilter(target_member_id, kind):
+    """
+    Member id literal, case insensitive where the company rule is.
+    """
 
-        file_path = os.path.join(backup_path, file)
+    if not target_member_id or not target_member_id.isascii():
+        return None
 
-        with open(file_path, "r", errors="ignore") as f:
-            content = f.read()
+    needle = target_member_id.encode("ascii")
 
-        matches = SSN_PATTERN.findall(content)
+    if MEMBER_ID_RULES[kind][1]:
+        return re.compile(re.escape(needle), re.IGNORECASE)
 
-        found = False
+    return needle
 
-        if target_ssn in matches:
 
-            if debug:
-                print("SSN match found:", target_ssn)
-                print("File:", file)
-                print("Extracted date:", date)
+def member_name_prefilter(target_name):
+    """
+    Longest word of the (upper case) name, case insensitive.
+    """
 
-            found = True
+    words = target_name.split()
+    if not words:
+        return None
 
-        record = {
-            "date": date,
-            "filename": file
-        }
+    word = max(words, key=len)
+    if not word.isascii():
+        return None
 
-        if found:
-            present_records.append(record)
-        else:
-            absent_records.append(record)
+    return re.compile(re.escape(word.encode("ascii")), re.IGNORECASE)
 
-        if debug:
-            print("-------------------------------------")
 
-    return (
-        sorted(
-            present_records,
-            key=lambda x: datetime.strptime(x["date"], "%m-%d-%Y") if x["date"] else datetime.min
-        ),
-        sorted(
-            absent_records,
-            key=lambda x: datetime.strptime(x["date"], "%m-%d-%Y") if x["date"] else datetime.min
-        )
-    )
+def member_ssns(members):
+    return [ssn for ssn, _, _ in members if ssn]
 
 
-#  new logic 14-02-2026******************************************************
-def find_ssn_all_dates_teladoc(
-    base_path,
-    folders,
-    target_ssn,
-    debug=False
-):
-    present_records = []
-    absent_records = []
+def member_names(members):
+    return [name for _, _, name in members if name]
 
-    for folder in folders:
 
-        if debug:
-            print(f"Searching in Folder : {folder}")
+def member_id_matches(qualifier, value, target_member_id, kind):
+    """
+    Same result as the REF*(0F|OF|ABB)*<id> patterns of each scanner:
+    - ANTHEM  : REF*OF / REF*ABB, exact case, id ends the segment
+    - TELADOC : any qualifier, ignore case, id ends the segment
+    - AHH/SAVRX : ignore case, id followed by *, ~ or a word boundary
+    """
 
-        backup_path = os.path.join(base_path, folder, "backups")
-        if not os.path.exists(backup_path):
-            continue
+    qualifiers, ignore_case, exact_end = MEMBER_ID_RULES[kind]
 
-        for file in os.listdir(backup_path):
+    if ignore_case:
+        qualifier = qualifier.upper()
+        value = value.upper()
+        target_member_id = target_member_id.upper()
 
-            if debug:
-                print(f"Checking file : {file}")
+    if qualifier not in qualifiers:
+        return False
 
-            if not file.endswith(".834"):
-                continue
+    if value == target_member_id:
+        return True
 
-            date = extract_date_teladoc(file)
+    if exact_end or not value.startswith(target_member_id):
+        return False
 
-            file_path = os.path.join(backup_path, file)
+    # (\*|~|\b) after the id
+    next_char = value[len(target_member_id)]
+    prev_char = target_member_id[-1:] or "*"
 
-            with open(file_path, "r", errors="ignore") as f:
-                content = f.read()
+    if next_char == "*":
+        return True
 
-            matches = SSN_PATTERN.findall(content)
+    return _is_word_char(prev_char) != _is_word_char(next_char)
 
-            record = {
-                "date": date,
-                "filename": file
-            }
 
-            if target_ssn in matches:
-                present_records.append(record)
-            else:
-                absent_records.append(record)
+def _is_word_char(char):
+    return char.isalnum() or char == "_"
 
-    return (
-        sorted(
-            present_records,
-            key=lambda x: datetime.strptime(x["date"], "%m-%d-%Y") if x["date"] else datetime.min
-        ),
-        sorted(
-            absent_records,
-            key=lambda x: datetime.strptime(x["date"], "%m-%d-%Y") if x["date"] else datetime.min
-        )
+
+def count_member_id_matches(members, target_member_id, kind):
+    return sum(
+        1
+        for _, member_ids, _ in members
+        for qualifier, value in member_ids
+        if member_id_matches(qualifier, value, target_member_id, kind)
     )
 
 
-# new logic : 14-02-2026************************************************
+# MEMBERSHIP SIDECAR LOGIC*****************************************************
+# *****************************************************************************
+
+# Compact binary summary of one backup file, written after its first full
+# parse. Later scans of the unchanged file read a few KB instead of running
+# the member regex over MBs, and answer with a binary search:
+#   header -> magic, version, member / SSN / member id / name counts
+#   ssns   -> sorted SSNs as little endian uint32 (duplicates kept)
+#   ids    -> string table of "<qualifier>*<value>", sorted by upper case value
+#   names  -> string table of the unique names, sorted
+# string table = count + 1 uint32 offsets, then the UTF-8 bytes
+# One sidecar per file path, the header keeps the size + mtime of the file
+# it was built from: a changed file rewrites its sidecar in place, a deleted
+# file's sidecar is removed by refresh_index (remove_sidecar).
+# Written by the scans that read them again (date range jobs, batch
+# scanners), not by the index build: the index already answers those files.
+
+SIDECAR_DIR = os.environ.get(
+    "SIDECAR_DIR",
+    os.path.join(APP_DATA_DIR, "sidecars")
+)
 
-def find_ssn_all_dates_savrx(
-    base_path,
-    folders,
-    target_ssn,
-    debug=False
-):
-    present_records = []
-    absent_records = []
+SIDECARS_ENABLED = os.environ.get("SIDECARS_ENABLED", "1") != "0"
 
-    for folder in folders:
+SIDECAR_MAGIC = b"S834"
+SIDECAR_VERSION = 2
+SIDECAR_HEADER = struct.Struct("<4sHQqIIII")
 
-        if debug:
-            print(f"\nSearching in Folder : {folder}")
+UINT32 = "I" if array("I").itemsize == 4 else "L"
 
-        backup_path = os.path.join(base_path, folder, "backups")
 
-        if debug:
-            print(backup_path)
+def sidecar_path(file_path):
+    digest = hashlib.sha1(
+        os.path.abspath(file_path).encode("utf-8", errors="surrogateescape")
+    ).hexdigest()
 
-        if not os.path.exists(backup_path):
-            continue
+    return os.path.join(SIDECAR_DIR, digest[:2], digest + ".bin")
 
-        for file in os.listdir(backup_path):
 
-            if debug:
-                print(f"Searching in file : {file}")
-                print("-" * 72)
+def membership_from_members(members):
+    """
+    Membership of one file (what its sidecar holds), from extract_members:
+    members    -> member loops in the file
+    ssns       -> sorted uint32 array of the SSNs (duplicates kept)
+    member_ids -> unique (qualifier, value) sorted by upper case value
+    names      -> unique member names, sorted
+    """
 
-            # ---- DATE EXTRACTION (unchanged) ----
-            date = extract_date_savrx(folder, file)
+    return {
+        "members": len(members),
+        "ssns": array(UINT32, sorted(int(ssn) for ssn in member_ssns(members))),
+        "member_ids": sorted(
+            {ref for _, refs, _ in members for ref in refs},
+            key=lambda ref: (ref[1].upper(), ref)
+        ),
+        "names": sorted(set(member_names(members)))
+    }
 
-            file_path = os.path.join(backup_path, file)
 
-            with open(file_path, "r", errors="ignore") as f:
-                content = f.read()
+def _uint32_bytes(values):
+    values = array(UINT32, values)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values.tobytes()
 
-            matches = SSN_PATTERN.findall(content)
 
-            file_match_count = 0
-            date_added = False
+def _read_uint32(data, pos, count):
+    end = pos + 4 * count
+    if end > len(data):
+        raise ValueError("sidecar truncated")
 
-            for ssn in matches:
-                if ssn == target_ssn:
-                    file_match_count += 1
+    values = array(UINT32)
+    values.frombytes(data[pos:end])
+    if sys.byteorder == "big":
+        values.byteswap()
 
-                    if not date_added:
-                        date_added = True
+    return values, end
 
-            record = {
-                "date": date,
-                "filename": file
-            }
 
-            if file_match_count > 0:
-                if debug:
-                    print(
-                        f"SSN {target_ssn} found "
-                        f"{file_match_count} times in file : {file}"
-                    )
-                present_records.append(record)
-            else:
-                absent_records.append(record)
+def _string_table(strings):
+    blobs = [string.encode("utf-8") for string in strings]
 
-    return (
-        sorted(
-            present_records,
-            key=lambda x: datetime.strptime(x["date"], "%m-%d-%Y") if x["date"] else datetime.min
+    offsets = [0]
+    for blob in blobs:
+        offsets.append(offsets[-1] + len(blob))
+
+    return _uint32_bytes(offsets) + b"".join(blobs)
+
+
+def _read_string_table(data, pos, count):
+    offsets, pos = _read_uint32(data, pos, count + 1)
+
+    end = pos + offsets[-1]
+    if end > len(data):
+        raise ValueError("sidecar truncated")
+
+    blob = data[pos:end]
+    strings = [blob[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(count)]
+
+    return strings, end
+
+
+def encode_sidecar(membership, size, mtime_ns):
+
+    member_ids = [f"{qualifier}*{value}" for qualifier, value in membership["member_ids"]]
+
+    return b"".join([
+        SIDECAR_HEADER.pack(
+            SIDECAR_MAGIC, SIDECAR_VERSION, size, mtime_ns, membership["members"],
+            len(membership["ssns"]), len(member_ids), len(membership["names"])
         ),
-        sorted(
-            absent_records,
-            key=lambda x: datetime.strptime(x["date"], "%m-%d-%Y") if x["date"] else datetime.min
+        _uint32_bytes(membership["ssns"]),
+        _string_table(member_ids),
+        _string_table(membership["names"])
+    ])
+
+
+def decode_sidecar(data, size, mtime_ns):
+    """
+    Membership from sidecar bytes, None when not a valid sidecar
+    (other version, truncated or damaged file) or when it was built
+    from another size / mtime of the file.
+    """
+
+    try:
+        magic, version, built_size, built_mtime_ns, members, ssn_count, id_count, name_count = (
+            SIDECAR_HEADER.unpack_from(data)
         )
-    )
+        if magic != SIDECAR_MAGIC or version != SIDECAR_VERSION:
+            return None
+        if built_size != size or built_mtime_ns != mtime_ns:
+            return None
 
+        pos = SIDECAR_HEADER.size
+        ssns, pos = _read_uint32(data, pos, ssn_count)
+        member_ids, pos = _read_string_table(data, pos, id_count)
+        names, pos = _read_string_table(data, pos, name_count)
 
-# DATE RANGE SSN FETCH LOGIC*******************************************************
-# *********************************************************************************
+    except (struct.error, ValueError):
+        return None
 
+    if pos != len(data):
+        return None
 
-# ---------------------------------
-# Company 1: ANTHEM_ABC_MUSGROW
-# ---------------------------------
+    return {
+        "members": members,
+        "ssns": ssns,
+        "member_ids": [tuple(ref.split("*", 1)) for ref in member_ids],
+        "names": names
+    }
 
-def find_all_ssns_in_date_range(
-    base_path,
-    folders,
-    start_date,
-    end_date,
-    debug=False
-):
-    ssns_found = []
 
-    for folder in folders:
+def write_sidecar(path, membership, size, mtime_ns):
+    """
+    Writes a sidecar (temp file + rename, scan workers may race on it),
+    replacing the one of an older version of the file.
+    """
 
-        backup_path = os.path.join(base_path, folder, "backups")
-        if not os.path.exists(backup_path):
-            continue
+    os.makedirs(os.path.dirname(path), exist_ok=True)
 
-        for file in os.listdir(backup_path):
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(encode_sidecar(membership, size, mtime_ns))
 
-            if not file.endswith(".834"):
-                continue
+    os.replace(temp_path, path)
 
-            file_date = extract_date(file, folder)
-            if not file_date:
-                continue
 
-            if not is_date_in_range(file_date, start_date, end_date):
-                continue
+def remove_sidecar(file_path):
+    """
+    Drops the sidecar of a deleted backup file (if it has one).
+    """
 
-            file_path = os.path.join(backup_path, file)
+    try:
+        os.remove(sidecar_path(file_path))
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        search_logger.warning("sidecar not removed for %s: %s", file_path, e)
 
-            with open(file_path, "r", errors="ignore") as f:
-                content = f.read()
 
-            matches = SSN_PATTERN.findall(content)
+def file_membership(file_path, prefilter=None, metrics=None, store=True):
+    """
+    Membership of one backup file (see membership_from_members).
 
-            for ssn in matches:
-                ssns_found.append(ssn)
+    Unchanged file with a sidecar -> read from the sidecar.
+    Otherwise read_file_members, and with store the sidecar is written after
+    a full parse (a file the prefilter ruled out was not parsed, nothing is
+    stored).
 
-    return sorted(ssns_found)
+    metrics -> sidecar_hits / sidecars_written, a sidecar read counts as
+    the file's I/O with the sidecar size as bytes.
+    """
 
+    if not SIDECARS_ENABLED:
+        return membership_from_members(read_file_members(file_path, prefilter, metrics))
 
-# ---------------------------------
-# Company 2: AHH_AMO
-# ---------------------------------
+    started = time.perf_counter()
 
-def find_all_ssns_in_date_range_ahh_amo(
-    base_path,
-    start_date,
-    end_date,
-    debug=False
-):
-    ssns_found = []
+    stat = os.stat(file_path)
+    path = sidecar_path(file_path)
 
-    backup_path = os.path.join(base_path, "backups")
-    if not os.path.exists(backup_path):
-        return []
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        data = None
 
-    for file in os.listdir(backup_path):
+    membership = decode_sidecar(data, stat.st_size, stat.st_mtime_ns) if data is not None else None
 
-        if not file.lower().endswith((".txt", ".834")):
-            continue
+    if membership is not None:
+        metrics_add(metrics, "sidecar_hits")
+        metrics_file_read(metrics, file_path, len(data), time.perf_counter() - started, 0.0)
+        return membership
 
-        file_date = extract_date_ahh_amo(file)
-        if not file_date:
-            continue
+    members = read_file_members(file_path, prefilter, metrics)
+    membership = membership_from_members(members)
 
-        if not is_date_in_range(file_date, start_date, end_date):
-            continue
+    if store and (members or prefilter is None):
+        try:
+            write_sidecar(path, membership, stat.st_size, stat.st_mtime_ns)
+            metrics_add(metrics, "sidecars_written")
+        except OSError as e:
+            search_logger.warning("sidecar not written for %s: %s", file_path, e)
 
-        file_path = os.path.join(backup_path, file)
+    return membership
 
-        with open(file_path, "r", errors="ignore") as f:
-            content = f.read()
 
-            if debug:
-                print("Checking file for date range SSN search:", file)
+def membership_has_ssn(membership, ssn):
 
-        matches = SSN_PATTERN.findall(content)
+    if len(ssn) != 9 or not ssn.isdigit():
+        return False
 
-        for ssn in matches:
-            ssns_found.append(ssn)
+    target = int(ssn)
+    ssns = membership["ssns"]
+    i = bisect.bisect_left(ssns, target)
 
-    return sorted(ssns_found)
+    return i < len(ssns) and ssns[i] == target
 
 
-# ---------------------------------
-# Company 3: TELADOC
-# ---------------------------------
+def membership_ssns(membership):
+    """
+    SSNs of the file as 9 digit strings (sorted, duplicates kept).
+    """
 
-def find_all_ssns_in_date_range_teladoc(
-    base_path,
-    folders,
-    start_date,
-    end_date,
-    debug=False
-):
-    ssns_found = []
+    return [f"{ssn:09d}" for ssn in membership["ssns"]]
+
+
+def membership_has_member_id(membership, target_member_id, kind):
+    """
+    Same answer as count_member_id_matches(...) > 0: every REF value the
+    company rule accepts starts with the id (case ignored), so only that
+    slice of the sorted ids goes through member_id_matches.
+    """
+
+    member_ids = membership["member_ids"]
+    prefix = target_member_id.upper()
+
+    i = bisect.bisect_left(member_ids, prefix, key=lambda ref: ref[1].upper())
+
+    while i < len(member_ids) and member_ids[i][1].upper().startswith(prefix):
+        qualifier, value = member_ids[i]
+        if member_id_matches(qualifier, value, target_member_id, kind):
+            return True
+        i += 1
+
+    return False
+
+
+def membership_has_name(membership, name):
+
+    names = membership["names"]
+    i = bisect.bisect_left(names, name)
+
+    return i < len(names) and names[i] == name
+
+
+def membership_members(membership):
+    """
+    extract_members shaped tuples of a membership (SSN, member id and name
+    each on its own tuple), enough for the search index.
+    """
+
+    return (
+        [(ssn, (), None) for ssn in membership_ssns(membership)]
+        + [(None, (ref,), None) for ref in membership["member_ids"]]
+        + [(None, (), name) for name in membership["names"]]
+    )
+
+
+# new logic 14-02-2026***********************************************************************
+# *******************************************************************************************
+
+def find_ssn_all_dates(
+    base_path,
+    folders,
+    target_ssn,
+    debug=False,
+    cancel=None,
+    metrics=None
+):
+    present_records = []
+    absent_records = []
+
+    # literal check first, most files only prove absence
+    prefilter = ssn_prefilter(target_ssn)
+
+    # files come from the cached manifest, already in date order
+    for folder, file_path, file, date in iter_folder_files(
+        "anthem", base_path, folders, "ssn", debug, cancel=cancel, metrics=metrics
+    ):
+
+        members = read_file_members(file_path, prefilter, metrics)
+
+        matches = member_ssns(members)
+
+        # If SSN present
+        if target_ssn in matches:
+            present_records.append({
+                "date": date,
+                "filename": file
+            })
+        else:
+            absent_records.append({
+                "date": date,
+                "filename": file
+            })
+
+    return present_records, absent_records
+
+
+# new logic 14-02-2026******************************************************
+def find_ssn_all_dates_ahh_amo(
+    base_path,
+    target_ssn,
+    debug=False,
+    cancel=None,
+    metrics=None
+):
+    present_records = []
+    absent_records = []
+
+    # literal check first, most files only prove absence
+    prefilter = ssn_prefilter(target_ssn)
+
+    # Same behaviour: no extension restriction
+    for folder, file_path, file, date in iter_folder_files(
+        "ahh_amo", base_path, [""], "ssn", cancel=cancel, metrics=metrics
+    ):
+
+        if debug:
+            search_logger.debug("Checking file for SSN : %s", file)
+
+        members = read_file_members(file_path, prefilter, metrics)
+
+        matches = member_ssns(members)
+
+        found = False
+
+        if target_ssn in matches:
+
+            if debug:
+                search_logger.debug("SSN match found in file : %s (date %s)", file, date)
+
+            found = True
+
+        record = {
+            "date": date,
+            "filename": file
+        }
+
+        if found:
+            present_records.append(record)
+        else:
+            absent_records.append(record)
+
+    return present_records, absent_records
+
+
+#  new logic 14-02-2026******************************************************
+def find_ssn_all_dates_teladoc(
+    base_path,
+    folders,
+    target_ssn,
+    debug=False,
+    cancel=None,
+    metrics=None
+):
+    present_records = []
+    absent_records = []
+
+    # literal check first, most files only prove absence
+    prefilter = ssn_prefilter(target_ssn)
+
+    for folder, file_path, file, date in iter_folder_files(
+        "teladoc", base_path, folders, "ssn", debug, cancel=cancel, metrics=metrics
+    ):
+
+        if debug:
+            search_logger.debug("Checking file : %s", file)
+
+        members = read_file_members(file_path, prefilter, metrics)
+
+        matches = member_ssns(members)
+
+        record = {
+            "date": date,
+            "filename": file
+        }
+
+        if target_ssn in matches:
+            present_records.append(record)
+        else:
+            absent_records.append(record)
+
+    return present_records, absent_records
+
+
+# new logic : 14-02-2026************************************************
+
+def find_ssn_all_dates_savrx(
+    base_path,
+    folders,
+    target_ssn,
+    debug=False,
+    cancel=None,
+    metrics=None
+):
+    present_records = []
+    absent_records = []
+
+    # literal check first, most files only prove absence
+    prefilter = ssn_prefilter(target_ssn)
+
+    # every file type, folder-wise date (unchanged)
+    for folder, file_path, file, date in iter_folder_files(
+        "savrx", base_path, folders, "ssn", debug, cancel=cancel, metrics=metrics
+    ):
+
+        if debug:
+            search_logger.debug("Searching in file : %s", file)
+
+        members = read_file_members(file_path, prefilter, metrics)
+
+        matches = member_ssns(members)
+
+        file_match_count = matches.count(target_ssn)
+
+        record = {
+            "date": date,
+            "filename": file
+        }
+
+        if file_match_count > 0:
+            if debug:
+                search_logger.debug(
+                    "SSN found %s times in file : %s",
+                    file_match_count, file
+                )
+            present_records.append(record)
+        else:
+            absent_records.append(record)
+
+    return present_records, absent_records
+
+
+# DATE RANGE SSN FETCH LOGIC*******************************************************
+# *********************************************************************************
+
+
+# ---------------------------------
+# Company 1: ANTHEM_ABC_MUSGROW
+# ---------------------------------
+
+def find_all_ssns_in_date_range(
+    base_path,
+    folders,
+    start_date,
+    end_date,
+    debug=False,
+    cancel=None,
+    metrics=None
+):
+    ssns_found = []
+
+    for folder, file_path, file, file_date in iter_date_range_files(
+        "anthem", base_path, folders, start_date, end_date, cancel=cancel, metrics=metrics
+    ):
+
+        members = read_file_members(file_path, metrics=metrics)
+
+        matches = member_ssns(members)
+
+        for ssn in matches:
+            ssns_found.append(ssn)
+
+    return sorted(ssns_found)
+
+
+# ---------------------------------
+# Company 2: AHH_AMO
+# ---------------------------------
+
+def find_all_ssns_in_date_range_ahh_amo(
+    base_path,
+    start_date,
+    end_date,
+    debug=False,
+    cancel=None,
+    metrics=None
+):
+    ssns_found = []
+
+    for folder, file_path, file, file_date in iter_date_range_files(
+        "ahh_amo", base_path, [""], start_date, end_date, cancel=cancel, metrics=metrics
+    ):
+
+        members = read_file_members(file_path, metrics=metrics)
+
+        if debug:
+            search_logger.debug("Checking file for date range SSN search : %s", file)
+
+        matches = member_ssns(members)
+
+        for ssn in matches:
+            ssns_found.append(ssn)
+
+    return sorted(ssns_found)
+
+
+# ---------------------------------
+# Company 3: TELADOC
+# ---------------------------------
+
+def find_all_ssns_in_date_range_teladoc(
+    base_path,
+    folders,
+    start_date,
+    end_date,
+    debug=False,
+    cancel=None,
+    metrics=None
+):
+    ssns_found = []
+
+    for folder, file_path, file, file_date in iter_date_range_files(
+        "teladoc", base_path, folders, start_date, end_date, cancel=cancel, metrics=metrics
+    ):
+
+        members = read_file_members(file_path, metrics=metrics)
+
+        matches = member_ssns(members)
+
+        for ssn in matches:
+            ssns_found.append(ssn)
+
+    return sorted(ssns_found)
+
+
+# ---------------------------------
+# Company 4: SAVRX
+# ---------------------------------
+
+def find_all_ssns_in_date_range_savrx(
+    base_path,
+    folders,
+    start_date,
+    end_date,
+    debug=False,
+    cancel=None,
+    metrics=None
+):
+    ssns_found = []
+
+    # only files inside the range are selected (bisect over the manifest)
+    for folder, file_path, file, file_date in iter_date_range_files(
+        "savrx", base_path, folders, start_date, end_date, debug, cancel=cancel, metrics=metrics
+    ):
+
+        if debug:
+            search_logger.debug("Checking file : %s", file)
+
+        members = read_file_members(file_path, metrics=metrics)
+
+        matches = member_ssns(members)
+
+        for ssn in matches:
+            ssns_found.append(ssn)
+
+        if debug:
+            search_logger.debug(
+                "File Date %s in range → SSNs found: %s",
+                file_date, len(matches)
+            )
+
+    return sorted(ssns_found)
+
+
+# SCANNER DISPATCH LOGIC**********************************************************
+# per company scanner of every search type (sequential, in this process)
+
+ALL_DATES_SCANNERS = {
+    "ssn": {
+        "anthem": find_ssn_all_dates,
+        "ahh_amo": find_ssn_all_dates_ahh_amo,
+        "teladoc": find_ssn_all_dates_teladoc,
+        "savrx": find_ssn_all_dates_savrx,
+    },
+    "member_id": {
+        "anthem": find_member_id_all_dates,
+        "ahh_amo": find_member_id_all_dates_ahh_amo,
+        "teladoc": find_member_id_all_dates_teladoc,
+        "savrx": find_member_id_all_dates_savrx,
+    },
+    "member_name": {
+        "anthem": find_member_name_all_dates,
+        "ahh_amo": find_member_name_all_dates_ahh_amo,
+        "teladoc": find_member_name_all_dates_teladoc,
+        "savrx": find_member_name_all_dates_savrx,
+    },
+}
+
+DATE_RANGE_SCANNERS = {
+    "anthem": find_all_ssns_in_date_range,
+    "ahh_amo": find_all_ssns_in_date_range_ahh_amo,
+    "teladoc": find_all_ssns_in_date_range_teladoc,
+    "savrx": find_all_ssns_in_date_range_savrx,
+}
+
+
+def scan_all_dates(config, search_type, key, cancel=None, metrics=None):
+    """
+    find_ssn_all_dates* / find_member_id_all_dates* / find_member_name_all_dates*
+    of the company in config. Returns (present_records, absent_records).
+
+    These scanners bypass the membership sidecars: every file is read and
+    parsed, the baseline benchmark.py and the "scan" profile mode measure.
+    """
+
+    kind = company_kind(config)
+    scanner = ALL_DATES_SCANNERS[search_type][kind]
+
+    if kind == "ahh_amo":
+        return scanner(config["base_path"], key, cancel=cancel, metrics=metrics)
+
+    return scanner(config["base_path"], config["active_folders"], key, cancel=cancel, metrics=metrics)
+
+
+def scan_date_range(config, start_date, end_date, cancel=None, metrics=None):
+    """
+    find_all_ssns_in_date_range* of the company in config.
+    Bypasses the membership sidecars, like scan_all_dates.
+    """
+
+    kind = company_kind(config)
+    scanner = DATE_RANGE_SCANNERS[kind]
+
+    if kind == "ahh_amo":
+        return scanner(config["base_path"], start_date, end_date, cancel=cancel, metrics=metrics)
+
+    return scanner(
+        config["base_path"], config["active_folders"], start_date, end_date,
+        cancel=cancel, metrics=metrics
+    )
+
+
+# new logic 14-02-2026 for the subfolders dropdown*****************************************************
+# *****************************************************************************************************
+
+
+def get_company_config(selected_company: str, selected_subfolder: str | None = None):
+
+    if selected_company not in COMPANIES:
+        raise ValueError(
+            "Invalid company selection. "
+            "Available companies: " + ", ".join(COMPANIES)
+        )
+
+    # 1️.ANTHEM
+    if selected_company == "ANTHEM_ABC_MUSGROW":
+        base_path = os.path.join(ROOT_PATH, "ANTHEM_ABC_MUSGROW", "834s")
+
+        all_folders = FOLDERS.copy()
+        active_folders = all_folders
+
+        if selected_subfolder and selected_subfolder in all_folders:
+            active_folders = [selected_subfolder]
+
+    # 2️.AHH_AMO  FIXED
+    elif selected_company == "AHH_AMO":
+        base_path = os.path.join(ROOT_PATH, "AHH_AMO")
+
+        # DEFINE SUBFOLDERS MANUALLY HERE
+        all_folders = [" "]   # <-- yahi show hoga dropdown me isme folders hi nhi hai
+
+        active_folders = all_folders
+        if selected_subfolder and selected_subfolder in all_folders:
+            active_folders = [selected_subfolder]
+
+    # 3️.TELADOC  
+    elif selected_company == "TELADOC":
+        base_path = os.path.join(ROOT_PATH, "TELADOC")
+
+        # Already predefined
+        all_folders = ["MEI"]
+
+        active_folders = all_folders
+        if selected_subfolder and selected_subfolder in all_folders:
+            active_folders = [selected_subfolder]
+
+    # 4️.SAVRX
+    elif selected_company == "SAVRX":
+        base_path = os.path.join(ROOT_PATH, "SAVRX")
+
+        all_folders = [
+            "480", "521", "J84", "L82",
+            "MEI", "OEW", "TRI", "TRI_NONMEDICARE"
+        ]
+
+        active_folders = all_folders
+
+        if selected_subfolder and selected_subfolder in all_folders:
+            active_folders = [selected_subfolder]
+
+    else:
+        raise ValueError("Invalid company.")
+
+    # FLAGS (IMPORTANT)
+    is_ahh_amo = selected_company == "AHH_AMO"
+    is_teladoc = selected_company == "TELADOC"
+    is_savrx = selected_company == "SAVRX"
+
+    return {
+        "selected_company": selected_company,
+        "selected_subfolder": selected_subfolder if active_folders == [selected_subfolder] else None,
+        "base_path": base_path,
+        "active_folders": active_folders,
+        "is_ahh_amo": is_ahh_amo,
+        "is_teladoc": is_teladoc,
+        "is_savrx": is_savrx
+    }
+
+
+# SHARED FILE SELECTION LOGIC*****************************************************
+# ********************************************************************************
+
+def company_kind(config):
+    """
+    Short name of the scanner family used for a company config:
+    "ahh_amo", "teladoc", "savrx" or "anthem" (default folders).
+    """
+
+    if config["is_ahh_amo"]:
+        return "ahh_amo"
+    if config["is_teladoc"]:
+        return "teladoc"
+    if config["is_savrx"]:
+        return "savrx"
+    return "anthem"
+
+
+def _backup_folders(kind, base_path, folders):
+    """
+    Yields (folder, backup_path) for every existing backups directory
+    (AHH_AMO has one, folder is "").
+    """
+
+    if kind == "ahh_amo":
+        folders = [""]
+
+    for folder in folders:
+        backup_path = backup_dir(kind, base_path, folder)
+        if os.path.exists(backup_path):
+            yield folder, backup_path
+
+
+def backup_dir(kind, base_path, folder):
+
+    if kind == "ahh_amo":
+        return os.path.join(base_path, "backups")
+
+    return os.path.join(base_path, folder, "backups")
+
+
+def iter_backup_folders(config):
+    """
+    Yields (folder, backup_path) for every existing backups directory
+    of a company config.
+    """
+
+    return _backup_folders(
+        company_kind(config), config["base_path"], config["active_folders"]
+    )
+
+
+# scanner family -> date of (folder, file name)
+DATE_EXTRACTORS = {
+    "anthem":  lambda folder, file: extract_date(file, folder),
+    "ahh_amo": lambda folder, file: extract_date_ahh_amo(file),
+    "teladoc": lambda folder, file: extract_date_teladoc(file),
+    "savrx":   extract_date_savrx,
+}
+
+FILE_DATE_CACHE_SIZE = 65536    # file names remembered (backup history)
+
+
+@lru_cache(maxsize=FILE_DATE_CACHE_SIZE)
+def file_date(kind, folder, file):
+    """
+    Date of one backup file name (MM-DD-YYYY or None) for a scanner family.
+
+    A name always gives the same date, so results are memoized; a new
+    manifest or listing only pays for names not seen before.
+    """
+
+    return DATE_EXTRACTORS[kind](folder, file)
+
+
+def date_ordinal(date):
+    """
+    MM-DD-YYYY -> proleptic ordinal (0 for None, so undated files sort first).
+    """
+
+    if not date:
+        return 0
+
+    try:
+        return datetime.strptime(date, "%m-%d-%Y").toordinal()
+    except ValueError:
+        return 0
+
+
+def file_skip_reason(kind, file, date, search_type="ssn"):
+    """
+    Same rules as the scanners, None when the file is searched:
+    - ANTHEM  : only .834 files with an extracted date
+    - AHH_AMO : .txt/.834 files except for SSN search (every file)
+    - TELADOC : only .834 files, date can be None
+    - SAVRX   : every file, date can be None
+    - date range search always skips files without a date
+
+    Otherwise "extension" or "date".
+    """
+
+    if kind == "anthem":
+        if not file.endswith(".834"):
+            return "extension"
+        if not date:
+            return "date"
+
+    elif kind == "ahh_amo":
+        if search_type != "ssn" and not file.lower().endswith((".txt", ".834")):
+            return "extension"
+
+    elif kind == "teladoc":
+        if not file.endswith(".834"):
+            return "extension"
+
+    if search_type == "date_range" and not date:
+        return "date"
+
+    return None
+
+
+def search_file_allowed(kind, file, date, search_type="ssn"):
+    return file_skip_reason(kind, file, date, search_type) is None
+
+
+# FILE MANIFEST LOGIC*************************************************************
+# ********************************************************************************
+
+# (kind, folder, backup_path) -> (directory mtime_ns, entries)
+_folder_manifests = {}
+
+
+def get_folder_manifest(kind, folder, backup_path):
+    """
+    Entries (ordinal, filename, date) of one backups directory sorted by date
+    (listdir order kept for equal dates).
+
+    Dates are extracted once and reused until the directory mtime changes
+    (a file added, removed or renamed).
+    """
+
+    return folder_manifest(kind, folder, backup_path)[1]
+
+
+def folder_manifest(kind, folder, backup_path):
+    """
+    (directory mtime_ns, entries) of one backups directory, see get_folder_manifest.
+    """
+
+    cache_key = (kind, folder, backup_path)
+    mtime_ns = os.stat(backup_path).st_mtime_ns
+
+    cached = _folder_manifests.get(cache_key)
+    if cached and cached[0] == mtime_ns:
+        return cached
+
+    entries = []
+    for file in os.listdir(backup_path):
+        date = file_date(kind, folder, file)
+        entries.append((date_ordinal(date), file, date))
+
+    entries.sort(key=lambda entry: entry[0])
+
+    _folder_manifests[cache_key] = (mtime_ns, entries)
+
+    return mtime_ns, entries
+
+
+def clear_folder_manifests():
+    _folder_manifests.clear()
+
+
+def iter_folder_files(kind, base_path, folders, search_type="ssn", debug=False, ordinal_range=None, cancel=None, metrics=None):
+    """
+    Yields (folder, file_path, filename, date) for every backup file the
+    scanner of this family opens, in date order across all folders
+    (files without date first, earlier folders first on equal dates).
+
+    ordinal_range -> (first, last) date ordinals, only that slice of each
+    manifest is selected (bisect, files outside are never looked at).
+
+    cancel -> cancel token, checked before every file (SearchCancelled).
+    metrics -> optional search metrics, gets the listing counts and time.
+    """
+
+    started = time.perf_counter()
+    per_folder = []
+
+    for folder, backup_path in _backup_folders(kind, base_path, folders):
+
+        folder_started = time.perf_counter()
+
+        if debug and folder:
+            search_logger.debug("Searching in folder : %s", folder)
+
+        entries = get_folder_manifest(kind, folder, backup_path)
+        metrics_add(metrics, "files_listed", len(entries))
+
+        if ordinal_range:
+            first, last = ordinal_range
+            in_range = entries[
+                bisect.bisect_left(entries, first, key=lambda entry: entry[0]):
+                bisect.bisect_right(entries, last, key=lambda entry: entry[0])
+            ]
+            metrics_add(metrics, "files_skipped_date", len(entries) - len(in_range))
+            entries = in_range
+
+        selected = []
+
+        for ordinal, file, date in entries:
+            reason = file_skip_reason(kind, file, date, search_type)
+            if reason:
+                metrics_add(metrics, f"files_skipped_{reason}")
+            else:
+                selected.append((ordinal, folder, os.path.join(backup_path, file), file, date))
 
-    for folder in folders:
+        per_folder.append(selected)
 
-        backup_path = os.path.join(base_path, folder, "backups")
-        if not os.path.exists(backup_path):
-            continue
+        metrics_folder(
+            metrics, backups_folder_name(backup_path),
+            "list_s", time.perf_counter() - folder_started
+        )
 
-        for file in os.listdir(backup_path):
+    metrics_add(metrics, "list_s", time.perf_counter() - started)
 
-            if not file.endswith(".834"):
-                continue
+    for ordinal, folder, file_path, file, date in heapq.merge(
+        *per_folder, key=lambda entry: entry[0]
+    ):
+        check_cancelled(cancel)
+        yield folder, file_path, file, date
 
-            file_date = extract_date_teladoc(file)
-            if not file_date:
-                continue
 
-            if not is_date_in_range(file_date, start_date, end_date):
-                continue
+def iter_search_files(config, search_type="ssn", cancel=None, metrics=None):
+    """
+    iter_folder_files for a company config.
+    """
 
-            file_path = os.path.join(backup_path, file)
+    return iter_folder_files(
+        company_kind(config),
+        config["base_path"],
+        config["active_folders"],
+        search_type,
+        cancel=cancel,
+        metrics=metrics
+    )
 
-            with open(file_path, "r", errors="ignore") as f:
-                content = f.read()
 
-            matches = SSN_PATTERN.findall(content)
+def iter_date_range_files(kind, base_path, folders, start_date, end_date, debug=False, cancel=None, metrics=None):
+    """
+    Files of a date range search (start_date / end_date as DD-MM-YYYY from UI),
+    in date order. Nothing is selected for an invalid range.
+    """
 
-            for ssn in matches:
-                ssns_found.append(ssn)
+    ordinal_range = range_ordinals(start_date, end_date)
+    if not ordinal_range:
+        return iter(())
 
-    return sorted(ssns_found)
+    return iter_folder_files(
+        kind, base_path, folders, "date_range", debug, ordinal_range, cancel, metrics
+    )
 
 
-# ---------------------------------
-# Company 4: SAVRX
-# ---------------------------------
+# PARALLEL SCAN LOGIC*************************************************************
+# ********************************************************************************
 
-def find_all_ssns_in_date_range_savrx(
-    base_path,
-    folders,
-    start_date,
-    end_date,
-    debug=False
-):
-    ssns_found = []
+_scan_pools = {}
 
-    for folder in folders:
+# the hosted search threads ask for the pool at the same time
+_scan_pools_lock = threading.Lock()
 
-        if debug:
-            print(f"\nSearching in Folder (Date Range) : {folder}")
 
-        backup_path = os.path.join(base_path, folder, "backups")
+def get_scan_pool(max_workers=None):
+    """
+    Shared process pool (created once per worker count, reused by every search).
+    """
 
-        if debug:
-            print(backup_path)
+    max_workers = max_workers or SCAN_WORKERS
 
-        if not os.path.exists(backup_path):
-            continue
+    with _scan_pools_lock:
+        pool = _scan_pools.get(max_workers)
+        if pool is None:
+            pool = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context(SCAN_START_METHOD)
+            )
+            _scan_pools[max_workers] = pool
 
-        for file in os.listdir(backup_path):
+    return pool
 
-            if debug:
-                print(f"Checking file : {file}")
 
-            file_path = os.path.join(backup_path, file)
+def _scan_chunk(search_type, key, kind, file_paths):
+    """
+    Worker side: reads a chunk of files and returns one small result per file
+    (only booleans / SSN lists go back to the parent process), plus the
+    chunk's search metrics: (results, metrics).
 
-            # Folder-wise date extraction
-            file_date = extract_date_savrx(folder, file)
-            if not file_date:
-                continue
+    search_type "members" returns extract_members shaped tuples (index build).
 
-            if not is_date_in_range(file_date, start_date, end_date):
-                continue
+    Files are answered from their membership sidecar (file_membership),
+    binary search instead of the member regex on unchanged files. The index
+    build reads existing sidecars but does not write new ones.
+    """
 
-            with open(file_path, "r", errors="ignore") as f:
-                content = f.read()
+    results = []
+    metrics = new_search_metrics()
 
-            matches = SSN_PATTERN.findall(content)
+    if search_type == "ssn":
+        prefilter = ssn_prefilter(key)
+    elif search_type == "member_id":
+        prefilter = member_id_prefilter(key, kind)
+    elif search_type == "member_name":
+        prefilter = member_name_prefilter(key.upper().strip())
+    else:
+        prefilter = None
 
-            for ssn in matches:
-                ssns_found.append(ssn)
+    store = search_type != "members"
 
-            if debug:
-                print(
-                    f"File Date {file_date} in range → "
-                    f"SSNs found: {len(matches)}"
-                )
+    for file_path in file_paths:
+        membership = file_membership(file_path, prefilter, metrics, store)
 
-    return sorted(ssns_found)
+        if search_type == "ssn":
+            results.append(membership_has_ssn(membership, key))
+        elif search_type == "member_id":
+            results.append(membership_has_member_id(membership, key, kind))
+        elif search_type == "member_name":
+            results.append(membership_has_name(membership, key.upper().strip()))
+        elif search_type == "date_range":
+            results.append(membership_ssns(membership))
+        else:
+            results.append(membership_members(membership))
 
+    return results, metrics
 
-# new logic 14-02-2026 for the subfolders dropdown*****************************************************
-# *****************************************************************************************************
 
+def iter_scan_chunks(search_type, key, kind, file_paths, max_workers=None, chunk_size=None, cancel=None, progress=None, metrics=None):
+    """
+    Fans file_paths out over the process pool in chunks.
+    Yields (chunk_file_paths, results) per chunk in file_paths order,
+    as soon as that chunk is done.
 
-def get_company_config(selected_company: str, selected_subfolder: str | None = None):
+    The cancel token is checked between chunks, chunks not started yet
+    are dropped from the pool. progress and metrics are updated after
+    every chunk.
+    """
 
-    if selected_company not in COMPANIES:
-        raise ValueError(
-            "Invalid company selection. "
-            "Available companies: " + ", ".join(COMPANIES)
-        )
+    chunk_size = chunk_size or SCAN_CHUNK_SIZE
 
-    # 1️.ANTHEM
-    if selected_company == "ANTHEM_ABC_MUSGROW":
-        base_path = os.path.join(ROOT_PATH, "ANTHEM_ABC_MUSGROW", "834s")
+    progress_files_total(progress, len(file_paths))
 
-        all_folders = FOLDERS.copy()
-        active_folders = all_folders
+    chunks = [
+        file_paths[i:i + chunk_size]
+        for i in range(0, len(file_paths), chunk_size)
+    ]
 
-        if selected_subfolder and selected_subfolder in all_folders:
-            active_folders = [selected_subfolder]
+    if len(chunks) <= 1:
+        check_cancelled(cancel)
+        if file_paths:
+            results, chunk_metrics = _scan_chunk(search_type, key, kind, file_paths)
+            merge_search_metrics(metrics, chunk_metrics)
+            progress_files_done(progress, file_paths)
+            yield file_paths, results
+        return
 
-    # 2️.AHH_AMO  FIXED
-    elif selected_company == "AHH_AMO":
-        base_path = os.path.join(ROOT_PATH, "AHH_AMO")
+    pool = get_scan_pool(max_workers)
+    futures = [
+        pool.submit(_scan_chunk, search_type, key, kind, chunk)
+        for chunk in chunks
+    ]
 
-        # DEFINE SUBFOLDERS MANUALLY HERE
-        all_folders = [" "]   # <-- yahi show hoga dropdown me isme folders hi nhi hai
+    try:
+        for chunk, future in zip(chunks, futures):
+            check_cancelled(cancel)
+            results, chunk_metrics = future.result()
+            merge_search_metrics(metrics, chunk_metrics)
+            progress_files_done(progress, chunk)
+            yield chunk, results
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+def scan_files_parallel(search_type, key, kind, file_paths, max_workers=None, chunk_size=None, cancel=None, metrics=None):
+    """
+    Returns results in the same order as file_paths.
+    """
 
-        active_folders = all_folders
-        if selected_subfolder and selected_subfolder in all_folders:
-            active_folders = [selected_subfolder]
+    results = []
 
-    # 3️.TELADOC  
-    elif selected_company == "TELADOC":
-        base_path = os.path.join(ROOT_PATH, "TELADOC")
+    for _, chunk_results in iter_scan_chunks(
+        search_type, key, kind, file_paths, max_workers, chunk_size, cancel,
+        metrics=metrics
+    ):
+        results.extend(chunk_results)
 
-        # Already predefined
-        all_folders = ["MEI"]
+    return results
 
-        active_folders = all_folders
-        if selected_subfolder and selected_subfolder in all_folders:
-            active_folders = [selected_subfolder]
 
-    # 4️.SAVRX
-    elif selected_company == "SAVRX":
-        base_path = os.path.join(ROOT_PATH, "SAVRX")
+def iter_ssns_in_date_range_parallel(config, start_date, end_date, max_workers=None, debug=False, cancel=None, progress=None, metrics=None):
+    """
+    Streaming form of find_all_ssns_in_date_range_parallel.
+    Yields the SSN list of every file in the range, in date order.
+    """
 
-        all_folders = [
-            "480", "521", "J84", "L82",
-            "MEI", "OEW", "TRI", "TRI_NONMEDICARE"
-        ]
+    kind = company_kind(config)
 
-        active_folders = all_folders
+    file_paths = [
+        file_path
+        for _, file_path, _, _ in iter_date_range_files(
+            kind, config["base_path"], config["active_folders"], start_date, end_date,
+            cancel=cancel, metrics=metrics
+        )
+    ]
 
-        if selected_subfolder and selected_subfolder in all_folders:
-            active_folders = [selected_subfolder]
+    if debug:
+        search_logger.debug("Parallel date range scan : %s files", len(file_paths))
 
-    else:
-        raise ValueError("Invalid company.")
+    for _, results in iter_scan_chunks(
+        "date_range", None, kind, file_paths,
+        max_workers=max_workers, cancel=cancel, progress=progress, metrics=metrics
+    ):
+        yield from results
 
-    # FLAGS (IMPORTANT)
-    is_ahh_amo = selected_company == "AHH_AMO"
-    is_teladoc = selected_company == "TELADOC"
-    is_savrx = selected_company == "SAVRX"
 
-    return {
-        "selected_company": selected_company,
-        "base_path": base_path,
-        "active_folders": active_folders,
-        "is_ahh_amo": is_ahh_amo,
-        "is_teladoc": is_teladoc,
-        "is_savrx": is_savrx
-    }
+def find_all_ssns_in_date_range_parallel(config, start_date, end_date, max_workers=None, debug=False, cancel=None, progress=None, metrics=None):
+    """
+    Parallel version of find_all_ssns_in_date_range*.
+    """
+
+    ssns_found = []
+
+    for ssns in iter_ssns_in_date_range_parallel(config, start_date, end_date, max_workers, debug, cancel, progress, metrics):
+        ssns_found.extend(ssns)
+
+    return sorted(ssns_found)
 
 
 # new logic for conclusion 14-02-2026*********************************************
@@ -1668,7 +2621,7 @@ def generate_ssn_timeline_summary(present_records, absent_records):
     try:
         sorted_dates = sorted(
             all_dates.keys(),
-            key=lambda d: datetime.strptime(d, "%m-%d-%Y")
+            key=date_ordinal
         )
     except Exception:
         # Fallback if sorting fails (though extract_date should prevent this)
@@ -1753,7 +2706,7 @@ def generate_ssn_timeline_summary(present_records, absent_records):
             if valid_present_records:
                 last_present = max(
                     valid_present_records,
-                    key=lambda x: datetime.strptime(x["date"], "%m-%d-%Y")
+                    key=lambda x: date_ordinal(x["date"])
                 )["date"]
 
                 add_event(f"Last Present Date: <b>{last_present}</b>", "info")
@@ -1785,7 +2738,7 @@ def generate_member_id_timeline_summary(present_records, absent_records):
     try:
         sorted_dates = sorted(
             all_dates.keys(),
-            key=lambda d: datetime.strptime(d, "%m-%d-%Y")
+            key=date_ordinal
         )
     except Exception:
         sorted_dates = sorted(all_dates.keys())
@@ -1855,7 +2808,7 @@ def generate_member_id_timeline_summary(present_records, absent_records):
             if valid_present_records:
                 last_present = max(
                     valid_present_records,
-                    key=lambda x: datetime.strptime(x["date"], "%m-%d-%Y")
+                    key=lambda x: date_ordinal(x["date"])
                 )["date"]
 
                 add_event(f"Last Present Date: <b>{last_present}</b>", "info")
@@ -1866,3 +2819,339 @@ def generate_member_id_timeline_summary(present_records, absent_records):
 
     return f"<ul class='timeline-list'>{''.join(summary_parts)}</ul>"
 
+
+# BATCH SSN LOOKUP LOGIC*****************************************************************
+# **************************************************************************************
+
+def clean_key_list(keys):
+    """
+    Batch input for SSNs / member ids.
+
+    Accepts a list or pasted text (comma / newline / space separated).
+    Same cleanup as single search (strip + trailing "~"), duplicates dropped.
+    """
+
+    if isinstance(keys, str):
+        keys = re.split(r"[\s,;]+", keys)
+
+    cleaned = []
+    seen = set()
+
+    for key in keys:
+        key = str(key).strip().rstrip("~")
+        if key and key not in seen:
+            seen.add(key)
+            cleaned.append(key)
+
+    return cleaned
+
+
+def find_ssns_all_dates(config, target_ssns, debug=False, cancel=None, progress=None, metrics=None):
+    """
+    Batch version of find_ssn_all_dates* for any company config.
+
+    Every file is read once and its SSNs are tested against the whole
+    requested set, instead of one full scan per SSN.
+
+    Returns {ssn: (present_records, absent_records)}
+    """
+
+    targets = set(target_ssns)
+
+    present = {ssn: [] for ssn in target_ssns}
+    absent = {ssn: [] for ssn in target_ssns}
+
+    files = list(iter_search_files(config, "ssn", metrics=metrics))
+    progress_files_total(progress, len(files))
+
+    for folder, file_path, file, date in files:
+
+        check_cancelled(cancel)
+
+        if debug:
+            search_logger.debug("Batch SSN search in file : %s", file)
+
+        membership = file_membership(file_path, metrics=metrics)
+        hits = {ssn for ssn in targets if membership_has_ssn(membership, ssn)}
+
+        for ssn in target_ssns:
+            record = {
+                "date": date,
+                "filename": file
+            }
+
+            if ssn in hits:
+                present[ssn].append(record)
+            else:
+                absent[ssn].append(record)
+
+        progress_files_done(progress, [file_path])
+
+    return {
+        ssn: (present[ssn], absent[ssn])
+        for ssn in target_ssns
+    }
+
+
+def build_ssn_batch_response(results):
+    """
+    Response for search_by_ssns: one entry per SSN in request order,
+    same fields as the single SSN search.
+    """
+
+    entries = []
+
+    for ssn, (present, absent) in results.items():
+
+        entry = {
+            "ssn": ssn,
+            "found": bool(present),
+            "present_records": present,
+            "absent_records": absent,
+            "from": present[0]["date"] if present else None,
+            "to": present[-1]["date"] if present else None,
+            "summary": generate_ssn_timeline_summary(present, absent)
+        }
+        entries.append(entry)
+
+    return {
+        "success": True,
+        "total_ssns": len(entries),
+        "found_ssns": sum(1 for entry in entries if entry["found"]),
+        "results": entries
+    }
+
+
+# BATCH MEMBER ID LOOKUP LOGIC***********************************************************
+# **************************************************************************************
+
+def build_member_id_matcher(target_member_ids, kind):
+    """
+    Multi-id matcher for one company rule.
+
+    REF values always start with the id, so instead of an Aho-Corasick
+    automaton the ids are kept in a hash table and every REF value is
+    looked up once per distinct id length (value[:len] -> ids).
+    """
+
+    ignore_case = MEMBER_ID_RULES[kind][1]
+
+    table = {}
+    for member_id in target_member_ids:
+        key = member_id.upper() if ignore_case else member_id
+        table.setdefault(key, []).append(member_id)
+
+    lengths = sorted({len(key) for key in table})
+
+    return {
+        "kind": kind,
+        "ignore_case": ignore_case,
+        "table": table,
+        "lengths": lengths
+    }
+
+
+def match_member_ids(matcher, qualifier, value):
+    """
+    Every requested id matching one REF value (same rule as member_id_matches).
+    """
+
+    norm = value.upper() if matcher["ignore_case"] else value
+    hits = []
+
+    for length in matcher["lengths"]:
+        if length > len(norm):
+            break
+
+        for member_id in matcher["table"].get(norm[:length], ()):
+            if member_id_matches(qualifier, value, member_id, matcher["kind"]):
+                hits.append(member_id)
+
+    return hits
+
+
+def find_member_ids_all_dates(config, target_member_ids, debug=False, cancel=None, progress=None, metrics=None):
+    """
+    Batch version of find_member_id_all_dates* for any company config.
+
+    Every file is read once, each REF value goes through the matcher for
+    all requested ids (stays fast with thousands of ids).
+
+    Returns {member_id: (present_records, absent_records)}
+    """
+
+    kind = company_kind(config)
+    matcher = build_member_id_matcher(target_member_ids, kind)
+
+    present = {member_id: [] for member_id in target_member_ids}
+    absent = {member_id: [] for member_id in target_member_ids}
+
+    files = list(iter_search_files(config, "member_id", metrics=metrics))
+    progress_files_total(progress, len(files))
+
+    for folder, file_path, file, date in files:
+
+        check_cancelled(cancel)
+
+        if debug:
+            search_logger.debug("Batch Member ID search in file : %s", file)
+
+        hits = set()
+        for qualifier, value in file_membership(file_path, metrics=metrics)["member_ids"]:
+            hits.update(match_member_ids(matcher, qualifier, value))
+
+        for member_id in target_member_ids:
+            record = {
+                "date": date,
+                "filename": file
+            }
+
+            if member_id in hits:
+                present[member_id].append(record)
+            else:
+                absent[member_id].append(record)
+
+        progress_files_done(progress, [file_path])
+
+    return {
+        member_id: (present[member_id], absent[member_id])
+        for member_id in target_member_ids
+    }
+
+
+def build_member_id_batch_response(results):
+    """
+    Response for search_by_member_ids: one entry per id in request order,
+    same fields as the single member id search.
+    """
+
+    entries = []
+
+    for member_id, (present, absent) in results.items():
+
+        entry = {
+            "member_id": member_id,
+            "found": bool(present),
+            "present_records": present,
+            "absent_records": absent,
+            "from": present[0]["date"] if present else None,
+            "to": present[-1]["date"] if present else None,
+            "summary": generate_member_id_timeline_summary(present, absent)
+        }
+        entries.append(entry)
+
+    return {
+        "success": True,
+        "total_member_ids": len(entries),
+        "found_member_ids": sum(1 for entry in entries if entry["found"]),
+        "results": entries
+    }
+
+
+# RESULT CACHE LOGIC*********************************************************************
+# **************************************************************************************
+
+RESULT_CACHE_SIZE = 256     # entries kept (least recently used dropped first)
+RESULT_CACHE_TTL = 300      # seconds
+
+_result_cache = OrderedDict()
+_result_cache_lock = threading.Lock()
+
+
+def backup_fingerprint(config):
+    """
+    (folder, directory mtime, file count) per backups directory, taken from
+    the cached folder manifests (one stat per folder, no directory walk).
+
+    Changes as soon as a file arrives, is removed or renamed. A file
+    rewritten in place keeps the directory mtime, RESULT_CACHE_TTL bounds
+    how long such a result is reused.
+    """
+
+    kind = company_kind(config)
+    fingerprint = []
+
+    for folder, backup_path in iter_backup_folders(config):
+        mtime_ns, entries = folder_manifest(kind, folder, backup_path)
+        fingerprint.append((folder, mtime_ns, len(entries)))
+
+    return tuple(fingerprint)
+
+
+def result_cache_key(config, key_type, key):
+    """
+    (company, active folders, key type, key, backups fingerprint)
+
+    key_type -> "ssn", "ssns", "member_id", "member_ids", "member_name", "date_range"
+    """
+
+    return (
+        config["selected_company"],
+        tuple(config["active_folders"]),
+        key_type,
+        tuple(key) if isinstance(key, list) else key,
+        backup_fingerprint(config)
+    )
+
+
+def get_cached_result(cache_key):
+    """
+    Cached result for a result_cache_key, None when missing or expired.
+    """
+
+    with _result_cache_lock:
+        entry = _result_cache.get(cache_key)
+
+        if entry and time.monotonic() - entry[0] < RESULT_CACHE_TTL:
+            _result_cache.move_to_end(cache_key)
+            return entry[1]
+
+    return None
+
+
+def store_cached_result(cache_key, result):
+    now = time.monotonic()
+
+    with _result_cache_lock:
+        _result_cache[cache_key] = (now, result)
+        _result_cache.move_to_end(cache_key)
+
+        # expired entries first, then least recently used
+        for old_key in [k for k, (stored, _) in _result_cache.items() if now - stored >= RESULT_CACHE_TTL]:
+            del _result_cache[old_key]
+
+        while len(_result_cache) > RESULT_CACHE_SIZE:
+            _result_cache.popitem(last=False)
+
+
+def cached_search(config, key_type, key, search, cancel=None, metrics=None):
+    """
+    Returns search(config, key, cancel=cancel, metrics=metrics), reusing the
+    result of an identical search while the backups directories are
+    unchanged and the entry is younger than RESULT_CACHE_TTL.
+
+    metrics (new_search_metrics) gets cache_hit / total_s and the search
+    is written to the search log.
+    """
+
+    started = time.perf_counter()
+    metrics = metrics if metrics is not None else new_search_metrics()
+
+    cache_key = result_cache_key(config, key_type, key)
+
+    result = get_cached_result(cache_key)
+    metrics["cache_hit"] = result is not None
+
+    if result is None:
+        result = search(config, key, cancel=cancel, metrics=metrics)
+        store_cached_result(cache_key, result)
+
+    metrics["total_s"] = time.perf_counter() - started
+    report_search_metrics(key_type, config, metrics, key)
+
+    return result
+
+
+def clear_result_cache():
+    with _result_cache_lock:
+        _result_cache.clear()
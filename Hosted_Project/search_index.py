@@ -0,0 +1,850 @@
+import logging
+import os
+import pathlib
+import sqlite3
+import sys
+import threading
+import time
+
+from logic import (
+    APP_DATA_DIR,
+    COMPANIES,
+    backup_dir,
+    backups_folder_name,
+    check_cancelled,
+    company_kind,
+    file_skip_reason,
+    get_company_config,
+    get_folder_manifest,
+    iter_backup_folders,
+    iter_date_range_files,
+    iter_scan_chunks,
+    iter_search_files,
+    member_id_matches,
+    metrics_add,
+    metrics_folder,
+    remove_sidecar,
+    search_file_allowed,
+)
+
+
+# Index Database*************************************
+# SQLite file in the app data directory (D:\Transfers stays read only)
+INDEX_DB_PATH = os.environ.get(
+    "INDEX_DB_PATH",
+    os.path.join(APP_DATA_DIR, "search_index.db")
+)
+
+index_logger = logging.getLogger("ssn_extractor.index")
+
+# bump when the schema changes, old index is dropped and rebuilt
+INDEX_VERSION = 3
+
+INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id       INTEGER PRIMARY KEY,
+    company  TEXT NOT NULL,
+    folder   TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    size     INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    UNIQUE (company, folder, filename)
+);
+
+CREATE TABLE IF NOT EXISTS file_ssns (
+    ssn     TEXT NOT NULL,
+    file_id INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    PRIMARY KEY (ssn, file_id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS file_member_ids (
+    value     TEXT NOT NULL,
+    qualifier TEXT NOT NULL,
+    file_id   INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    PRIMARY KEY (value, qualifier, file_id)
+) WITHOUT ROWID;
+
+-- case insensitive prefix lookups (LIKE) for member ids
+CREATE INDEX IF NOT EXISTS file_member_ids_nocase
+    ON file_member_ids (value COLLATE NOCASE);
+
+CREATE TABLE IF NOT EXISTS file_names (
+    name    TEXT NOT NULL,
+    file_id INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    PRIMARY KEY (name, file_id)
+) WITHOUT ROWID;
+
+-- cascade deletes look rows up by file
+CREATE INDEX IF NOT EXISTS file_ssns_file ON file_ssns (file_id);
+CREATE INDEX IF NOT EXISTS file_member_ids_file ON file_member_ids (file_id);
+CREATE INDEX IF NOT EXISTS file_names_file ON file_names (file_id);
+"""
+
+
+def connect_index(db_path=None):
+    """
+    Opens (and creates if needed) the search index database.
+
+    WAL mode so the hosted app can read while another request is indexing.
+    A streamed search steps through its generator on different executor
+    threads (one step at a time), so the connection is not thread bound.
+    """
+
+    db_path = db_path or INDEX_DB_PATH
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+
+    conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA foreign_keys=ON")
+
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version != INDEX_VERSION:
+        conn.executescript("""
+            DROP TABLE IF EXISTS file_ssns;
+            DROP TABLE IF EXISTS file_member_ids;
+            DROP TABLE IF EXISTS file_names;
+            DROP TABLE IF EXISTS files;
+        """)
+        conn.execute(f"PRAGMA user_version = {INDEX_VERSION}")
+
+    conn.executescript(INDEX_SCHEMA)
+    return conn
+
+
+def connect_index_readonly(db_path=None):
+    """
+    Opens the index for reading only: no schema / version check, no WAL
+    switch, never creates the file. None when there is no index yet.
+    """
+
+    path = db_path or INDEX_DB_PATH
+    if not os.path.exists(path):
+        return None
+
+    uri = pathlib.Path(os.path.abspath(path)).as_uri() + "?mode=ro"
+    return sqlite3.connect(uri, uri=True, timeout=30)
+
+
+# INDEX WRITE LOGIC*****************************************************
+
+def index_file(conn, company, folder, filename, size, mtime_ns, members):
+    """
+    Stores SSNs, member ids and names of one backup file (output of
+    extract_members) and returns its file id.
+    A previous entry for the same file is replaced.
+    """
+
+    conn.execute(
+        "DELETE FROM files WHERE company = ? AND folder = ? AND filename = ?",
+        (company, folder, filename)
+    )
+
+    cur = conn.execute(
+        "INSERT INTO files (company, folder, filename, size, mtime_ns) "
+        "VALUES (?, ?, ?, ?, ?)",
+        (company, folder, filename, size, mtime_ns)
+    )
+    file_id = cur.lastrowid
+
+    ssns = {ssn for ssn, _, _ in members if ssn}
+    names = {name for _, _, name in members if name}
+    member_ids = {ref for _, refs, _ in members for ref in refs}
+
+    conn.executemany(
+        "INSERT INTO file_ssns (ssn, file_id) VALUES (?, ?)",
+        ((ssn, file_id) for ssn in ssns)
+    )
+    conn.executemany(
+        "INSERT INTO file_member_ids (value, qualifier, file_id) VALUES (?, ?, ?)",
+        ((value, qualifier, file_id) for qualifier, value in member_ids)
+    )
+    conn.executemany(
+        "INSERT INTO file_names (name, file_id) VALUES (?, ?)",
+        ((name, file_id) for name in names)
+    )
+
+    return file_id
+
+
+def load_folder_manifest(conn, company, folder):
+    """
+    {filename: (file_id, size, mtime_ns)} stored for one backups folder.
+    """
+
+    rows = conn.execute(
+        "SELECT filename, id, size, mtime_ns FROM files "
+        "WHERE company = ? AND folder = ?",
+        (company, folder)
+    )
+    return {filename: (file_id, size, mtime_ns) for filename, file_id, size, mtime_ns in rows}
+
+
+# INCREMENTAL REFRESH LOGIC*********************************************
+
+# one refresh per company at a time, a second caller waits for it and
+# then finds the files already indexed
+_refresh_locks = {}
+_refresh_locks_lock = threading.Lock()
+
+
+def company_refresh_lock(company):
+
+    with _refresh_locks_lock:
+        return _refresh_locks.setdefault(company, threading.Lock())
+
+
+def plan_refresh(conn, config, cancel=None, metrics=None):
+    """
+    Compares each backups directory with the stored (name, size, mtime)
+    manifest, read only. Returns a dict:
+        file_ids -> {(folder, filename): file_id} of unchanged files
+        pending  -> [(folder, filename, path, size, mtime_ns, date)] new /
+                    changed files, in date order
+        removed  -> [(file_id, path)] deleted files
+        removed_folders -> [(folder, [path])] backups directories gone
+        listed   -> files looked at
+
+    metrics -> optional search metrics, gets each folder's listing time
+    (scandir + stat per file) as its per folder list_s.
+    """
+
+    company = config["selected_company"]
+    kind = company_kind(config)
+
+    plan = {"file_ids": {}, "pending": [], "removed": [], "removed_folders": [], "listed": 0}
+    pending_order = {}
+
+    existing_folders = set()
+
+    for folder_pos, (folder, backup_path) in enumerate(iter_backup_folders(config)):
+
+        check_cancelled(cancel)
+
+        folder_started = time.perf_counter()
+
+        existing_folders.add(folder)
+        manifest = load_folder_manifest(conn, company, folder)
+        seen = set()
+
+        # SSN search selects the widest set of files per company
+        selected = {
+            file: (ordinal, folder_pos, pos, date)
+            for pos, (ordinal, file, date) in enumerate(get_folder_manifest(kind, folder, backup_path))
+            if search_file_allowed(kind, file, date, "ssn")
+        }
+
+        with os.scandir(backup_path) as entries:
+            for entry in entries:
+
+                if entry.name not in selected:
+                    continue
+
+                plan["listed"] += 1
+                seen.add(entry.name)
+
+                st = entry.stat()
+                stored = manifest.get(entry.name)
+
+                if stored and stored[1] == st.st_size and stored[2] == st.st_mtime_ns:
+                    plan["file_ids"][(folder, entry.name)] = stored[0]
+                else:
+                    order = selected[entry.name]
+                    pending_order[(folder, entry.name)] = order[:3]
+                    plan["pending"].append((
+                        folder, entry.name, entry.path,
+                        st.st_size, st.st_mtime_ns, order[3]
+                    ))
+
+        for filename in manifest.keys() - seen:
+            plan["removed"].append((manifest[filename][0], os.path.join(backup_path, filename)))
+
+        metrics_folder(
+            metrics, backups_folder_name(backup_path),
+            "list_s", time.perf_counter() - folder_started
+        )
+
+    # same order as the scanners (iter_folder_files)
+    plan["pending"].sort(key=lambda item: pending_order[(item[0], item[1])])
+
+    # backups directory itself removed**********************
+    folders = [""] if kind == "ahh_amo" else config["active_folders"]
+    for folder in folders:
+        if folder not in existing_folders:
+            backup_path = backup_dir(kind, config["base_path"], folder)
+            plan["removed_folders"].append((
+                folder,
+                [os.path.join(backup_path, filename) for filename in load_folder_manifest(conn, company, folder)]
+            ))
+
+    return plan
+
+
+def apply_removals(conn, company, plan):
+    """
+    Drops deleted files and folders (and their sidecars) in one short
+    transaction. Returns the number of removed files.
+    """
+
+    removed = 0
+
+    with conn:
+        for file_id, _ in plan["removed"]:
+            conn.execute("DELETE FROM files WHERE id = ?", (file_id,))
+            removed += 1
+
+        for folder, _ in plan["removed_folders"]:
+            cur = conn.execute(
+                "DELETE FROM files WHERE company = ? AND folder = ?",
+                (company, folder)
+            )
+            removed += cur.rowcount
+
+    for _, path in plan["removed"]:
+        remove_sidecar(path)
+    for _, paths in plan["removed_folders"]:
+        for path in paths:
+            remove_sidecar(path)
+
+    return removed
+
+
+def index_chunk(conn, company, plan, items, all_members):
+    """
+    Indexes one chunk of parsed pending files in one short transaction.
+    Returns [(folder, filename, date, file_id)] (file ids also go to
+    plan["file_ids"]).
+    """
+
+    indexed = []
+
+    with conn:
+        for (folder, filename, _, size, mtime_ns, date), members in zip(items, all_members):
+            file_id = index_file(conn, company, folder, filename, size, mtime_ns, members)
+            plan["file_ids"][(folder, filename)] = file_id
+            indexed.append((folder, filename, date, file_id))
+
+    return indexed
+
+
+def iter_refresh(conn, config, debug=False, cancel=None, metrics=None):
+    """
+    refresh_index step by step, for searches that stream their records.
+
+    Yields the plan first (unchanged files are in plan["file_ids"]), then
+    [(folder, filename, date, file_id)] per chunk of pending files once it
+    is parsed (across the scan process pool) and indexed.
+
+    Files are parsed outside any transaction, every chunk is written in its
+    own short one: other searches keep reading and refreshing while files
+    are parsed. A cancelled refresh keeps the chunks indexed so far.
+
+    Holds the company's refresh lock until the last chunk: a second
+    refresh of the company waits and then finds the files indexed. An
+    index already up to date releases it before the plan is yielded.
+    """
+
+    started = time.perf_counter()
+
+    company = config["selected_company"]
+    kind = company_kind(config)
+
+    lock = company_refresh_lock(company)
+    lock.acquire()
+
+    try:
+        plan = plan_refresh(conn, config, cancel, metrics)
+
+        if not (plan["pending"] or plan["removed"] or plan["removed_folders"]):
+            lock.release()
+            lock = None
+
+        yield plan
+
+        removed = 0
+        if plan["removed"] or plan["removed_folders"]:
+            removed = apply_removals(conn, company, plan)
+
+        # PARSE NEW / CHANGED FILES****************************
+        # one read per file for every search type
+        pending = plan["pending"]
+        if pending and debug:
+            index_logger.debug("Indexing %s files", len(pending))
+
+        pos = 0
+        for chunk, all_members in iter_scan_chunks(
+            "members", None, kind, [item[2] for item in pending],
+            cancel=cancel, metrics=metrics
+        ):
+            items = pending[pos:pos + len(chunk)]
+            pos += len(chunk)
+
+            yield index_chunk(conn, company, plan, items, all_members)
+
+    finally:
+        if lock is not None:
+            lock.release()
+
+    if debug:
+        index_logger.debug(
+            "Refresh %s : %s",
+            company, {"listed": plan["listed"], "indexed": len(pending), "removed": removed}
+        )
+
+    metrics_add(metrics, "files_indexed", len(pending))
+    metrics_add(metrics, "files_from_index", plan["listed"] - len(pending))
+    metrics_add(metrics, "refresh_s", time.perf_counter() - started)
+
+
+def refresh_index(conn, config, debug=False, cancel=None, metrics=None):
+    """
+    Brings the index up to date for the folders of a company config.
+
+    Each backups directory is listed once and every file is compared with
+    the stored (name, size, mtime) manifest:
+    - new or changed files are parsed (across the scan process pool)
+      and (re)indexed
+    - unchanged files are not opened
+    - entries (and membership sidecars) of deleted files are dropped
+
+    See iter_refresh for locking and transactions.
+
+    Returns [(folder, filename, date, file_id)] in date order (cached file
+    manifest), so the caller does not have to sort the records.
+
+    metrics -> optional search metrics (listing, parsed files, refresh_s).
+    """
+
+    steps = iter_refresh(conn, config, debug, cancel, metrics)
+    plan = next(steps)
+
+    for _ in steps:
+        pass
+
+    file_ids = plan["file_ids"]
+
+    return [
+        (folder, file, date, file_ids[(folder, file)])
+        for folder, _, file, date in iter_search_files(config, "ssn", metrics=metrics)
+        if (folder, file) in file_ids
+    ]
+
+
+def refresh_company(company, db_path=None, debug=False):
+    """
+    Daily refresh for every folder of one company.
+    Cost grows with the number of new/changed files only.
+    """
+
+    config = get_company_config(company)
+
+    conn = connect_index(db_path)
+    try:
+        with conn:
+            refresh_index(conn, config, debug=debug)
+    finally:
+        conn.close()
+
+
+# INDEX SEARCH LOGIC****************************************************
+
+# records per block of a streamed index search (date order)
+INDEX_STREAM_BLOCK = 100
+
+
+def ssn_hit_ids(conn, target_ssn):
+    rows = conn.execute(
+        "SELECT file_id FROM file_ssns WHERE ssn = ?",
+        (target_ssn,)
+    )
+    return {row[0] for row in rows}
+
+
+def member_name_hit_ids(conn, target_member_name):
+    rows = conn.execute(
+        "SELECT file_id FROM file_names WHERE name = ?",
+        (target_member_name.upper().strip(),)
+    )
+    return {row[0] for row in rows}
+
+
+def search_hit_ids(conn, search_type, key, kind):
+    """
+    File ids holding the key of a single key search.
+    """
+
+    if search_type == "ssn":
+        return ssn_hit_ids(conn, key)
+    if search_type == "member_id":
+        return member_id_hit_ids(conn, key, kind)
+    return member_name_hit_ids(conn, key)
+
+
+def split_records(files, hit_ids, kind, search_type, metrics=None):
+    """
+    (present_records, absent_records) of [(folder, filename, date, file_id)],
+    files the search type does not read are left out.
+    """
+
+    present_records = []
+    absent_records = []
+
+    for folder, file, date, file_id in files:
+
+        # listing holds SSN search files, narrow down for other types
+        if search_type != "ssn":
+            reason = file_skip_reason(kind, file, date, search_type)
+            if reason:
+                metrics_add(metrics, f"files_skipped_{reason}")
+                continue
+
+        record = {
+            "date": date,
+            "filename": file
+        }
+
+        if file_id in hit_ids:
+            present_records.append(record)
+        else:
+            absent_records.append(record)
+
+    return present_records, absent_records
+
+
+def iter_all_dates_indexed(config, search_type, key, db_path=None, debug=False, cancel=None, metrics=None, block_size=INDEX_STREAM_BLOCK):
+    """
+    Streamed single key search over the index.
+
+    search_type -> "ssn", "member_id" or "member_name"
+
+    Yields (present_records, absent_records): first the files the index
+    already holds (blocks of block_size files, date order), then each chunk
+    of new / changed files as soon as it is parsed and indexed. Blocks are
+    in date order each, together exactly the records of the scanners
+    (order_records puts them back in scanner order).
+    """
+
+    kind = company_kind(config)
+
+    conn = connect_index(db_path)
+    steps = iter_refresh(conn, config, debug, cancel, metrics)
+
+    try:
+        plan = next(steps)
+        file_ids = plan["file_ids"]
+
+        indexed = [
+            (folder, file, date, file_ids[(folder, file)])
+            for folder, _, file, date in iter_search_files(config, "ssn", metrics=metrics)
+            if (folder, file) in file_ids
+        ]
+
+        started = time.perf_counter()
+        hit_ids = search_hit_ids(conn, search_type, key, kind)
+        metrics_add(metrics, "lookup_s", time.perf_counter() - started)
+
+        for i in range(0, len(indexed), block_size):
+            check_cancelled(cancel)
+            yield split_records(indexed[i:i + block_size], hit_ids, kind, search_type, metrics)
+
+        for chunk in steps:
+            started = time.perf_counter()
+            hit_ids = search_hit_ids(conn, search_type, key, kind)
+            metrics_add(metrics, "lookup_s", time.perf_counter() - started)
+
+            present_records, absent_records = split_records(chunk, hit_ids, kind, search_type, metrics)
+            if present_records or absent_records:
+                yield present_records, absent_records
+
+    finally:
+        steps.close()
+        conn.close()
+
+
+def order_records(config, search_type, records):
+    """
+    Records of a streamed search back in scanner order (date order,
+    earlier folders first on equal dates).
+    """
+
+    position = {
+        file: pos
+        for pos, (_, _, file, _) in enumerate(iter_search_files(config, search_type))
+    }
+
+    return sorted(records, key=lambda record: position.get(record["filename"], -1))
+
+
+def _find_all_dates_indexed(config, search_type, key, db_path=None, debug=False, cancel=None, metrics=None):
+    """
+    Refreshes the active folders (only new or changed files are scanned),
+    then answers every file from the index.
+
+    Returns (present_records, absent_records) exactly like the scanners.
+    """
+
+    kind = company_kind(config)
+
+    conn = connect_index(db_path)
+
+    try:
+        with conn:
+            listing = refresh_index(conn, config, debug=debug, cancel=cancel, metrics=metrics)
+
+            started = time.perf_counter()
+            hit_ids = search_hit_ids(conn, search_type, key, kind)
+            metrics_add(metrics, "lookup_s", time.perf_counter() - started)
+    finally:
+        conn.close()
+
+    # listing is in date order, records are already sorted
+    return split_records(listing, hit_ids, kind, search_type, metrics)
+
+
+def find_ssn_all_dates_indexed(config, target_ssn, db_path=None, debug=False, cancel=None, metrics=None):
+    """
+    Index backed version of find_ssn_all_dates*.
+    """
+
+    return _find_all_dates_indexed(config, "ssn", target_ssn, db_path, debug, cancel, metrics)
+
+
+def find_ssns_all_dates_indexed(config, target_ssns, db_path=None, debug=False, cancel=None, metrics=None):
+    """
+    Index backed version of find_ssns_all_dates (batch SSN lookup).
+
+    Returns {ssn: (present_records, absent_records)}
+    """
+
+    present = {ssn: [] for ssn in target_ssns}
+    absent = {ssn: [] for ssn in target_ssns}
+
+    hits = {ssn: set() for ssn in target_ssns}
+
+    conn = connect_index(db_path)
+
+    try:
+        with conn:
+            listing = refresh_index(conn, config, debug=debug, cancel=cancel, metrics=metrics)
+
+            started = time.perf_counter()
+
+            # chunks stay below the SQLite host parameter limit
+            for i in range(0, len(target_ssns), 500):
+                chunk = target_ssns[i:i + 500]
+                rows = conn.execute(
+                    "SELECT ssn, file_id FROM file_ssns WHERE ssn IN "
+                    f"({', '.join('?' * len(chunk))})",
+                    chunk
+                )
+                for ssn, file_id in rows:
+                    hits[ssn].add(file_id)
+
+            metrics_add(metrics, "lookup_s", time.perf_counter() - started)
+    finally:
+        conn.close()
+
+    for folder, file, date, file_id in listing:
+        for ssn in target_ssns:
+
+            record = {
+                "date": date,
+                "filename": file
+            }
+
+            if file_id in hits[ssn]:
+                present[ssn].append(record)
+            else:
+                absent[ssn].append(record)
+
+    return {
+        ssn: (present[ssn], absent[ssn])
+        for ssn in target_ssns
+    }
+
+
+def member_id_hit_ids(conn, target_member_id, kind):
+    """
+    File ids holding a member id: candidates are fetched by id prefix,
+    then checked with the same per-company REF rules as the scanners.
+    """
+
+    prefix = (
+        target_member_id
+        .replace("\\", "\\\\")
+        .replace("%", "\\%")
+        .replace("_", "\\_")
+    )
+
+    rows = conn.execute(
+        "SELECT file_id, qualifier, value FROM file_member_ids "
+        "WHERE value LIKE ? ESCAPE '\\'",
+        (prefix + "%",)
+    )
+
+    return {
+        file_id
+        for file_id, qualifier, value in rows
+        if member_id_matches(qualifier, value, target_member_id, kind)
+    }
+
+
+def find_member_id_all_dates_indexed(config, target_member_id, db_path=None, debug=False, cancel=None, metrics=None):
+    """
+    Index backed version of find_member_id_all_dates*.
+    """
+
+    return _find_all_dates_indexed(config, "member_id", target_member_id, db_path, debug, cancel, metrics)
+
+
+def find_member_ids_all_dates_indexed(config, target_member_ids, db_path=None, debug=False, cancel=None, metrics=None):
+    """
+    Index backed version of find_member_ids_all_dates (batch member id lookup).
+
+    Returns {member_id: (present_records, absent_records)}
+    """
+
+    kind = company_kind(config)
+
+    present = {member_id: [] for member_id in target_member_ids}
+    absent = {member_id: [] for member_id in target_member_ids}
+
+    conn = connect_index(db_path)
+
+    try:
+        with conn:
+            listing = refresh_index(conn, config, debug=debug, cancel=cancel, metrics=metrics)
+
+            started = time.perf_counter()
+            hits = {
+                member_id: member_id_hit_ids(conn, member_id, kind)
+                for member_id in target_member_ids
+            }
+            metrics_add(metrics, "lookup_s", time.perf_counter() - started)
+    finally:
+        conn.close()
+
+    for folder, file, date, file_id in listing:
+
+        reason = file_skip_reason(kind, file, date, "member_id")
+        if reason:
+            metrics_add(metrics, f"files_skipped_{reason}")
+            continue
+
+        for member_id in target_member_ids:
+
+            record = {
+                "date": date,
+                "filename": file
+            }
+
+            if file_id in hits[member_id]:
+                present[member_id].append(record)
+            else:
+                absent[member_id].append(record)
+
+    return {
+        member_id: (present[member_id], absent[member_id])
+        for member_id in target_member_ids
+    }
+
+
+def find_member_name_all_dates_indexed(config, target_member_name, db_path=None, debug=False, cancel=None, metrics=None):
+    """
+    Index backed version of find_member_name_all_dates*.
+    """
+
+    return _find_all_dates_indexed(config, "member_name", target_member_name, db_path, debug, cancel, metrics)
+
+
+def file_ssn_lists(conn, file_ids):
+    """
+    SSNs of each file (each SSN once per file), one list per file id.
+    """
+
+    return [
+        [row[0] for row in conn.execute("SELECT ssn FROM file_ssns WHERE file_id = ?", (file_id,))]
+        for file_id in file_ids
+    ]
+
+
+def iter_ssns_in_date_range_indexed(config, start_date, end_date, db_path=None, debug=False, cancel=None, metrics=None, block_size=INDEX_STREAM_BLOCK):
+    """
+    Streamed date range search over the index: yields the SSNs of the files
+    in the range (each SSN once per file), first for the files the index
+    already holds (one list per block of block_size files), then per chunk
+    of new / changed files as soon as it is parsed and indexed.
+    """
+
+    kind = company_kind(config)
+
+    # only the manifest slice inside the range (bisect)
+    in_range = [
+        (folder, file)
+        for folder, _, file, _ in iter_date_range_files(
+            kind, config["base_path"], config["active_folders"], start_date, end_date,
+            cancel=cancel
+        )
+    ]
+    wanted = set(in_range)
+
+    conn = connect_index(db_path)
+    steps = iter_refresh(conn, config, debug, cancel, metrics)
+
+    try:
+        plan = next(steps)
+        file_ids = plan["file_ids"]
+
+        metrics_add(metrics, "files_skipped_date", plan["listed"] - len(in_range))
+
+        indexed = [file_ids[name] for name in in_range if name in file_ids]
+
+        for i in range(0, len(indexed), block_size):
+            check_cancelled(cancel)
+
+            started = time.perf_counter()
+            ssn_lists = file_ssn_lists(conn, indexed[i:i + block_size])
+            metrics_add(metrics, "lookup_s", time.perf_counter() - started)
+
+            yield [ssn for ssns in ssn_lists for ssn in ssns]
+
+        for chunk in steps:
+            chunk_ids = [file_id for folder, file, _, file_id in chunk if (folder, file) in wanted]
+            if not chunk_ids:
+                continue
+
+            started = time.perf_counter()
+            ssn_lists = file_ssn_lists(conn, chunk_ids)
+            metrics_add(metrics, "lookup_s", time.perf_counter() - started)
+
+            yield [ssn for ssns in ssn_lists for ssn in ssns]
+
+    finally:
+        steps.close()
+        conn.close()
+
+
+def find_all_ssns_in_date_range_indexed(config, start_date, end_date, db_path=None, debug=False, cancel=None, metrics=None):
+    """
+    Index backed version of find_all_ssns_in_date_range*.
+
+    Returns sorted SSNs, each SSN once per file in the range.
+    """
+
+    ssns_found = []
+
+    for ssns in iter_ssns_in_date_range_indexed(
+        config, start_date, end_date, db_path, debug, cancel, metrics
+    ):
+        ssns_found.extend(ssns)
+
+    return sorted(ssns_found)
+
+
+# DAILY REFRESH ENTRY POINT*********************************************
+# usage: python search_index.py [COMPANY ...]
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG, format="%(message)s")
+
+    for company in sys.argv[1:] or COMPANIES:
+        refresh_company(company, debug=True)
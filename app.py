@@ -1,5 +1,14 @@
 import webview
 from logic import *
+from search_index import (
+    find_all_ssns_in_date_range_indexed,
+    find_member_id_all_dates_indexed,
+    find_member_ids_all_dates_indexed,
+    find_member_name_all_dates_indexed,
+    find_ssn_all_dates_indexed,
+    find_ssns_all_dates_indexed,
+)
+from search_profile import PROFILE_TOP, profile_search
 
 
 class API:
@@ -8,6 +17,21 @@ class API:
         self.company = None
         self.subfolder = None  
         self.config = None
+        self.search_cancel = None   # cancel token of the running search
+
+
+    # ================================
+    # START SEARCH (cancels the previous one)
+    # ================================
+    def _start_search(self):
+
+        # pywebview runs every call in its own thread, a superseded scan
+        # stops at its next file instead of reading to the end
+        if self.search_cancel:
+            self.search_cancel.set()
+
+        self.search_cancel = new_cancel_token()
+        return self.search_cancel
 
 
     # ================================
@@ -53,35 +77,27 @@ class API:
 # ssn extraction new logic 14-02-2026****************
 # new logic 14-02-2026****************      
 
-    def search_by_ssn(self, ssn):
+    def search_by_ssn(self, ssn, timings=False):
 
         if not self.config:
             return {"success": False, "error": "Please select company first."}
 
         ssn = ssn.strip().rstrip("~")
+        metrics = new_search_metrics()
 
-        BASE_PATH = self.config["base_path"]
-        ACTIVE_FOLDERS = self.config["active_folders"]
-        IS_AHH_AMO = self.config["is_ahh_amo"]
-        IS_TELADOC = self.config["is_teladoc"]
-        IS_SAVRX = self.config["is_savrx"]
-
-        if IS_AHH_AMO:
-            present, absent = find_ssn_all_dates_ahh_amo(BASE_PATH, ssn)
-        elif IS_TELADOC:
-            present, absent = find_ssn_all_dates_teladoc(BASE_PATH, ACTIVE_FOLDERS, ssn)
-        elif IS_SAVRX:
-            present, absent = find_ssn_all_dates_savrx(BASE_PATH, ACTIVE_FOLDERS, ssn)
-        else:
-            present, absent = find_ssn_all_dates(BASE_PATH, ACTIVE_FOLDERS, ssn)
+        # answered from the search index (repeat searches from the result cache)
+        try:
+            present, absent = cached_search(self.config, "ssn", ssn, find_ssn_all_dates_indexed, self._start_search(), metrics)
+        except SearchCancelled:
+            return cancelled_response()
 
         if not present:
-            return {"success": False, "error": "SSN not found."}
+            return with_timings({"success": False, "error": "SSN not found."}, metrics, timings)
         
         summary = generate_ssn_timeline_summary(present, absent)
 
 
-        return {
+        return with_timings({
             "success": True,
             "ssn": ssn,
             "present_records": present,
@@ -89,39 +105,54 @@ class API:
             "from": present[0]["date"],
             "to": present[-1]["date"],
             "summary": summary 
-        }
+        }, metrics, timings)
+
+
+    # ================================
+    # BATCH SSN SEARCH
+    # ================================
+    def search_by_ssns(self, ssns, timings=False):
+
+        if not self.config:
+            return {"success": False, "error": "Please select company first."}
+
+        ssns = clean_key_list(ssns)
+        if not ssns:
+            return {"success": False, "error": "No SSNs given."}
+
+        metrics = new_search_metrics()
+
+        # every file answered once for all SSNs
+        try:
+            results = cached_search(self.config, "ssns", ssns, find_ssns_all_dates_indexed, self._start_search(), metrics)
+        except SearchCancelled:
+            return cancelled_response()
+
+        return with_timings(build_ssn_batch_response(results), metrics, timings)
 
 
 # member id search new logic 14-02-2026****************
 # new logic 14-02-2026****************
-    def search_by_member_id(self, member_id):
+    def search_by_member_id(self, member_id, timings=False):
 
         if not self.config:
             return {"success": False, "error": "Please select company first."}
 
         member_id = member_id.strip().rstrip("~")
+        metrics = new_search_metrics()
 
-        BASE_PATH = self.config["base_path"]
-        ACTIVE_FOLDERS = self.config["active_folders"]
-        IS_AHH_AMO = self.config["is_ahh_amo"]
-        IS_TELADOC = self.config["is_teladoc"]
-        IS_SAVRX = self.config["is_savrx"]
-
-        if IS_AHH_AMO:
-            present, absent = find_member_id_all_dates_ahh_amo(BASE_PATH, member_id)
-        elif IS_TELADOC:
-            present, absent = find_member_id_all_dates_teladoc(BASE_PATH, ACTIVE_FOLDERS, member_id)
-        elif IS_SAVRX:
-            present, absent = find_member_id_all_dates_savrx(BASE_PATH, ACTIVE_FOLDERS, member_id)
-        else:
-            present, absent = find_member_id_all_dates(BASE_PATH, ACTIVE_FOLDERS, member_id)
+        # answered from the search index (repeat searches from the result cache)
+        try:
+            present, absent = cached_search(self.config, "member_id", member_id, find_member_id_all_dates_indexed, self._start_search(), metrics)
+        except SearchCancelled:
+            return cancelled_response()
 
         if not present:
-            return {"success": False, "error": "Member ID not found."}
+            return with_timings({"success": False, "error": "Member ID not found."}, metrics, timings)
 
         summary = generate_member_id_timeline_summary(present, absent)
 
-        return {
+        return with_timings({
             "success": True,
             "member_id": member_id,
             "present_records": present,
@@ -130,82 +161,114 @@ class API:
             "to": present[-1]["date"],
             "summary": summary
 
-        }
+        }, metrics, timings)
+
+
+    # ================================
+    # BATCH MEMBER ID SEARCH
+    # ================================
+    def search_by_member_ids(self, member_ids, timings=False):
+
+        if not self.config:
+            return {"success": False, "error": "Please select company first."}
+
+        member_ids = clean_key_list(member_ids)
+        if not member_ids:
+            return {"success": False, "error": "No Member IDs given."}
+
+        metrics = new_search_metrics()
+
+        # every file answered once for all member ids
+        try:
+            results = cached_search(self.config, "member_ids", member_ids, find_member_ids_all_dates_indexed, self._start_search(), metrics)
+        except SearchCancelled:
+            return cancelled_response()
+
+        return with_timings(build_member_id_batch_response(results), metrics, timings)
 
 
 # member name search new logic 14-02-2026****************
     # member name search new logic 14-02-2026****************
-    def search_by_member_name(self, member_name):
+    def search_by_member_name(self, member_name, timings=False):
 
         if not self.config:
             return {"success": False, "error": "Please select company first."}
 
         member_name = member_name.strip()
+        metrics = new_search_metrics()
 
-        BASE_PATH = self.config["base_path"]
-        ACTIVE_FOLDERS = self.config["active_folders"]
-        IS_AHH_AMO = self.config["is_ahh_amo"]
-        IS_TELADOC = self.config["is_teladoc"]
-        IS_SAVRX = self.config["is_savrx"]
-
-        if IS_AHH_AMO:
-            present, absent = find_member_name_all_dates_ahh_amo(BASE_PATH, member_name)
-        elif IS_TELADOC:
-            present, absent = find_member_name_all_dates_teladoc(BASE_PATH, ACTIVE_FOLDERS, member_name)
-        elif IS_SAVRX:
-            present, absent = find_member_name_all_dates_savrx(BASE_PATH, ACTIVE_FOLDERS, member_name)
-        else:
-            present, absent = find_member_name_all_dates(BASE_PATH, ACTIVE_FOLDERS, member_name)
+        # answered from the search index (repeat searches from the result cache)
+        try:
+            present, absent = cached_search(self.config, "member_name", member_name, find_member_name_all_dates_indexed, self._start_search(), metrics)
+        except SearchCancelled:
+            return cancelled_response()
 
         if not present:
-            return {"success": False, "error": "Member Name not found."}
+            return with_timings({"success": False, "error": "Member Name not found."}, metrics, timings)
 
-        return {
+        return with_timings({
             "success": True,
             "member_name": member_name,
             "present_records": present,
             "absent_records": absent,
             "from": present[0]["date"],
             "to": present[-1]["date"]
-        }
+        }, metrics, timings)
 
 
 
     # ================================
     # DATE RANGE SSN SEARCH
     # ================================
-    def search_ssns_by_date_range(self, start_date, end_date):
+    def search_ssns_by_date_range(self, start_date, end_date, timings=False):
 
         if not self.config:
             return {"success": False, "error": "Please select company first."}
 
-        BASE_PATH = self.config["base_path"]
-        ACTIVE_FOLDERS = self.config["active_folders"]
-        IS_AHH_AMO = self.config["is_ahh_amo"]
-        IS_TELADOC = self.config["is_teladoc"]
-        IS_SAVRX = self.config["is_savrx"]
+        metrics = new_search_metrics()
 
         try:
-            if IS_AHH_AMO:
-                ssns = find_all_ssns_in_date_range_ahh_amo(BASE_PATH, start_date, end_date)
-            elif IS_TELADOC:
-                ssns = find_all_ssns_in_date_range_teladoc(BASE_PATH, ACTIVE_FOLDERS, start_date, end_date)
-            elif IS_SAVRX:
-                ssns = find_all_ssns_in_date_range_savrx(BASE_PATH, ACTIVE_FOLDERS, start_date, end_date)
-            else:
-                ssns = find_all_ssns_in_date_range(BASE_PATH, ACTIVE_FOLDERS, start_date, end_date)
-
-            return {
+            ssns = cached_search(
+                self.config, "date_range", (start_date, end_date),
+                lambda config, key, cancel, metrics: find_all_ssns_in_date_range_indexed(
+                    config, *key, cancel=cancel, metrics=metrics
+                ),
+                self._start_search(),
+                metrics
+            )
+
+            return with_timings({
                 "success": True,
                 "total_ssns": len(set(ssns)),
                 "ssns": sorted(set(ssns))
-            }
+            }, metrics, timings)
+
+        except SearchCancelled:
+            return cancelled_response()
 
         except Exception as e:
             return {"success": False, "error": str(e)}
 
 
+    # ================================
+    # PROFILE SEARCH (admin / support)
+    # ================================
+    def profile_search(self, search, key, mode="index", top=PROFILE_TOP):
+
+        # search -> ssn / member_id / member_name / date_range ([start, end] as key),
+        # the .prof file goes to PROFILE_DIR (app data directory)
+        if not self.config:
+            return {"success": False, "error": "Please select company first."}
+
+        try:
+            return {"success": True, **profile_search(self.config, search, key, mode, top)}
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
+
 if __name__ == "__main__":
+    enable_search_log()
+
     api = API()
     webview.create_window(
         "834 Eligibility Search System",
@@ -0,0 +1,384 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import logic
+from generate_corpus import generate_corpus
+
+
+# Benchmark suite for the scan functions*****************************
+# usage:
+#   python benchmark.py --scales 10x200 30x500 --output bench.json
+#   python benchmark.py --baseline bench_baseline.json      (compare)
+#   python benchmark.py --save-baseline bench_baseline.json
+#
+# Every scale (files per folder x members per file) gets its own
+# synthetic corpus (generate_corpus.py), then each company runs the
+# find_*_all_dates* / find_all_ssns_in_date_range* scanner it uses.
+
+COMPANY_KINDS = {
+    "ANTHEM_ABC_MUSGROW": "anthem",
+    "AHH_AMO": "ahh_amo",
+    "TELADOC": "teladoc",
+    "SAVRX": "savrx",
+}
+
+# search name -> search_type used for the file listing
+BENCH_SEARCHES = {
+    "ssn": "ssn",
+    "ssn_absent": "ssn",
+    "member_id": "member_id",
+    "member_name": "member_name",
+    "date_range": "date_range",
+}
+
+REGRESSION_THRESHOLD = 0.20     # 20% slower than the baseline
+
+
+# SCANNER DISPATCH***************************************************
+# same function per company the desktop app used before the index
+
+def run_scanner(config, search, key):
+
+    if search == "date_range":
+        return logic.scan_date_range(config, *key)
+
+    return logic.scan_all_dates(config, BENCH_SEARCHES[search], key)
+
+
+def search_key(keys, search):
+
+    if search == "ssn":
+        return keys["ssns"][0]
+    if search == "ssn_absent":
+        return keys["absent_ssn"]
+    if search == "member_id":
+        return keys["member_ids"][0]
+    if search == "member_name":
+        return keys["member_names"][0]
+    return (keys["first_date"], keys["last_date"])
+
+
+def scanned_files(config, search, key):
+    """
+    (file count, bytes) a search reads, from the same file selection.
+    """
+
+    if search == "date_range":
+        listing = logic.iter_date_range_files(
+            logic.company_kind(config), config["base_path"],
+            config["active_folders"], *key
+        )
+    else:
+        listing = logic.iter_search_files(config, BENCH_SEARCHES[search])
+
+    files = 0
+    size = 0
+
+    for _, file_path, _, _ in listing:
+        files += 1
+        size += os.path.getsize(file_path)
+
+    return files, size
+
+
+# MEASUREMENT********************************************************
+
+def measure(config, search, key, repeat):
+    """
+    Wall time of repeat runs (median / best), then one more run under
+    tracemalloc for the peak of Python allocations (mmap pages not included).
+    """
+
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run_scanner(config, search, key)
+        times.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    try:
+        run_scanner(config, search, key)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return statistics.median(times), min(times), peak
+
+
+# DATE EXTRACTION MICRO-BENCHMARK************************************
+
+def reference_file_date(kind, folder, file):
+    """
+    Date as the scanners took it before file_date: the extract_date*
+    function of the family, called directly (no DATE_EXTRACTORS, no memo).
+    """
+
+    if kind == "anthem":
+        return logic.extract_date(file, folder)
+    if kind == "ahh_amo":
+        return logic.extract_date_ahh_amo(file)
+    if kind == "teladoc":
+        return logic.extract_date_teladoc(file)
+    if kind == "savrx":
+        return logic.extract_date_savrx(folder, file)
+
+    raise ValueError(f"Unknown scanner family: {kind}")
+
+
+def corpus_file_names(root, kinds):
+
+    names = []
+
+    for company, kind in COMPANY_KINDS.items():
+        if kind not in kinds:
+            continue
+
+        config = logic.get_company_config(company)
+        for folder, backup_path in logic.iter_backup_folders(config):
+            names.extend((kind, folder, file) for file in os.listdir(backup_path))
+
+    return names
+
+
+def time_names(func, names, rounds):
+
+    best = None
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for kind, folder, file in names:
+            func(kind, folder, file)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+
+    return best
+
+
+def bench_date_extraction(names, scale, rounds=5):
+    """
+    Reference extract_date* vs file_date, per file name: cold (first pass,
+    empty memo) and memoized. Fails if any date differs.
+    """
+
+    # one pass with an empty memo: every name goes to extract_date*
+    logic.file_date.cache_clear()
+    started = time.perf_counter()
+    dates = [logic.file_date(*name) for name in names]
+    cold = time.perf_counter() - started
+
+    mismatches = [
+        name for name, date in zip(names, dates)
+        if date != reference_file_date(*name)
+    ]
+    if mismatches:
+        raise AssertionError(f"file_date differs from extract_date* for {mismatches[:5]}")
+
+    reference = time_names(reference_file_date, names, rounds)
+    warm = time_names(logic.file_date, names, rounds)
+
+    count = max(len(names), 1)
+    result = {
+        "scale": scale,
+        "names": len(names),
+        "reference_us": round(reference / count * 1e6, 3),
+        "cold_us": round(cold / count * 1e6, 3),
+        "memoized_us": round(warm / count * 1e6, 3),
+        "memoized_speedup": round(reference / warm, 1) if warm else None,
+    }
+
+    print(
+        f"{scale:<12} date extraction: {result['names']} names  "
+        f"reference {result['reference_us']} us  "
+        f"cold {result['cold_us']} us  "
+        f"memoized {result['memoized_us']} us ({result['memoized_speedup']}x)"
+    )
+
+    return result
+
+
+def bench_scale(root, files, members, repeat, kinds, churn, file_kb):
+
+    generate_corpus(
+        root, kinds=kinds, files=files, members=members,
+        churn=churn, file_kb=file_kb
+    )
+
+    with open(os.path.join(root, "corpus.json")) as f:
+        corpus = json.load(f)
+
+    logic.ROOT_PATH = root
+    logic.clear_folder_manifests()
+
+    results = []
+
+    for company, kind in COMPANY_KINDS.items():
+
+        if kind not in kinds:
+            continue
+
+        config = logic.get_company_config(company)
+        keys = corpus["keys"][kind]
+
+        for search in BENCH_SEARCHES:
+
+            key = search_key(keys, search)
+
+            file_count, size = scanned_files(config, search, key)
+
+            wall, best, peak = measure(config, search, key, repeat)
+
+            results.append({
+                "scale": f"{files}x{members}",
+                "company": company,
+                "search": search,
+                "files": file_count,
+                "bytes": size,
+                "wall_s": round(wall, 6),
+                "best_s": round(best, 6),
+                "files_per_s": round(file_count / wall, 1) if wall else None,
+                "mb_per_s": round(size / 1024 / 1024 / wall, 2) if wall else None,
+                "peak_mem_kb": round(peak / 1024, 1),
+            })
+
+            print(
+                f"{files}x{members:<6} {company:<20} {search:<12} "
+                f"{wall * 1000:9.1f} ms  {results[-1]['files_per_s']:>8} files/s  "
+                f"{results[-1]['mb_per_s']:>8} MB/s  {results[-1]['peak_mem_kb']:>9} KB"
+            )
+
+    return results
+
+
+def run_benchmarks(scales, repeat=3, kinds=None, churn=0.05, file_kb=None, corpus_dir=None):
+    """
+    scales -> list of (files per folder, members per file)
+    Returns the report dict written as JSON.
+    """
+
+    kinds = kinds or list(COMPANY_KINDS.values())
+    work_dir = corpus_dir or tempfile.mkdtemp(prefix="ssn_bench_")
+
+    results = []
+    date_results = []
+    try:
+        for files, members in scales:
+            root = os.path.join(work_dir, f"{files}x{members}")
+            if os.path.exists(root):
+                shutil.rmtree(root)
+            results.extend(
+                bench_scale(root, files, members, repeat, kinds, churn, file_kb)
+            )
+            date_results.append(
+                bench_date_extraction(corpus_file_names(root, kinds), f"{files}x{members}")
+            )
+    finally:
+        if not corpus_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    return {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "repeat": repeat,
+        "results": results,
+        "date_extraction": date_results
+    }
+
+
+# BASELINE COMPARISON************************************************
+
+def result_key(result):
+    return (result["scale"], result["company"], result["search"])
+
+
+def compare_with_baseline(report, baseline, threshold=REGRESSION_THRESHOLD):
+    """
+    Adds "baseline_s" / "change" to every result found in the baseline and
+    returns the results slower than the baseline by more than threshold.
+    """
+
+    previous = {result_key(result): result for result in baseline["results"]}
+    regressions = []
+
+    for result in report["results"]:
+
+        old = previous.get(result_key(result))
+        if not old or not old["wall_s"]:
+            continue
+
+        change = (result["wall_s"] - old["wall_s"]) / old["wall_s"]
+        result["baseline_s"] = old["wall_s"]
+        result["change"] = round(change, 4)
+
+        if change > threshold:
+            regressions.append(result)
+
+    return regressions
+
+
+def parse_scale(value):
+
+    try:
+        files, members = value.lower().split("x")
+        return int(files), int(members)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"scale must look like 30x500, got {value!r}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the SSN / member scanners")
+    parser.add_argument("--scales", nargs="+", type=parse_scale, default=[(10, 200), (30, 500)],
+                        help="files per folder x members per file (default 10x200 30x500)")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per search")
+    parser.add_argument("--kinds", nargs="+", choices=list(COMPANY_KINDS.values()), help="scanner families (default all)")
+    parser.add_argument("--churn", type=float, default=0.05)
+    parser.add_argument("--file-kb", type=int, help="approx size of every corpus file in KB")
+    parser.add_argument("--corpus-dir", help="keep the generated corpora here")
+    parser.add_argument("--output", help="write the JSON report here")
+    parser.add_argument("--baseline", help="JSON report to compare against")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                        help="allowed slowdown vs baseline (0.2 = 20%%)")
+    parser.add_argument("--save-baseline", help="also write the report as the new baseline")
+    args = parser.parse_args()
+
+    report = run_benchmarks(
+        args.scales,
+        repeat=args.repeat,
+        kinds=args.kinds,
+        churn=args.churn,
+        file_kb=args.file_kb,
+        corpus_dir=args.corpus_dir
+    )
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare_with_baseline(report, json.load(f), args.threshold)
+
+        report["baseline"] = args.baseline
+        report["regressions"] = [result_key(result) for result in regressions]
+
+        for result in regressions:
+            print(
+                f"REGRESSION {result['scale']} {result['company']} {result['search']}: "
+                f"{result['baseline_s'] * 1000:.1f} ms -> {result['wall_s'] * 1000:.1f} ms "
+                f"({result['change']:+.0%})"
+            )
+        if not regressions:
+            print("No regressions against", args.baseline)
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w") as f:
+                json.dump(report, f, indent=2)
+
+    sys.exit(1 if regressions else 0)
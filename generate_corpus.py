@@ -0,0 +1,332 @@
+import argparse
+import json
+import os
+import random
+import time
+from datetime import datetime, timedelta
+
+from logic import FOLDERS, MEMBER_ID_RULES
+
+
+# Synthetic 834 corpus (no PHI) for benchmarks**********************
+# usage: python generate_corpus.py ROOT [--files 60 --members 2000 ...]
+#
+# Writes the same tree get_company_config expects under ROOT_PATH:
+#   ROOT/ANTHEM_ABC_MUSGROW/834s/<folder>/backups
+#   ROOT/AHH_AMO/backups
+#   ROOT/TELADOC/MEI/backups
+#   ROOT/SAVRX/<folder>/backups
+# and ROOT/corpus.json with known keys for the benchmark searches.
+
+SAVRX_FOLDERS = [
+    "480", "521", "J84", "L82",
+    "MEI", "OEW", "TRI", "TRI_NONMEDICARE"
+]
+
+# scanner family -> (company dir parts, folders)
+CORPUS_LAYOUT = {
+    "anthem":  (("ANTHEM_ABC_MUSGROW", "834s"), FOLDERS),
+    "ahh_amo": (("AHH_AMO",), [""]),
+    "teladoc": (("TELADOC",), ["MEI"]),
+    "savrx":   (("SAVRX",), SAVRX_FOLDERS),
+}
+
+LAST_NAMES = [
+    "SMITH", "JOHNSON", "WILLIAMS", "BROWN", "JONES", "GARCIA", "MILLER",
+    "DAVIS", "RODRIGUEZ", "MARTINEZ", "HERNANDEZ", "LOPEZ", "WILSON",
+    "ANDERSON", "THOMAS", "TAYLOR", "MOORE", "JACKSON", "MARTIN", "LEE",
+    "PEREZ", "THOMPSON", "WHITE", "HARRIS", "CLARK", "LEWIS", "MASON"
+]
+
+FIRST_NAMES = [
+    "JAMES", "MARY", "ROBERT", "PATRICIA", "JOHN", "JENNIFER", "MICHAEL",
+    "LINDA", "DAVID", "ELIZABETH", "WILLIAM", "BARBARA", "RICHARD", "SUSAN",
+    "JOSEPH", "JESSICA", "THOMAS", "SARAH", "CHARLES", "KAREN", "DANIEL"
+]
+
+
+# FILE NAME CONVENTIONS*********************************************
+# one of the formats the extract_date* functions understand is picked
+# per file, day -> datetime of the file
+
+def _stamp12(day):
+    return day.strftime("%y%m%d%H%M%S")      # YYMMDDHHMMSS
+
+
+def _stamp14(day):
+    return day.strftime("%Y%m%d%H%M%S")      # YYYYMMDDHHMMSS
+
+
+def _ymd(day):
+    return day.strftime("%Y%m%d")            # YYYYMMDD
+
+
+def _mdy(day):
+    return day.strftime("%m%d%y")            # MMDDYY
+
+
+SAVRX_NAME_FORMATS = {
+    "480": [
+        lambda d: f"IBEW480_{_ymd(d)}.txt",
+        lambda d: f"IBEW480_{_stamp12(d)}.txt",
+    ],
+    "521": [
+        lambda d: f"PP521_{_ymd(d)}.txt",
+        lambda d: f"PP521_{_stamp12(d)}.txt",
+    ],
+    "J84": [
+        lambda d: f"J84_EDI{_mdy(d)}.txt",
+        lambda d: f"J84_EDI{_stamp12(d)}.txt",
+        lambda d: f"SAVRX_J84_{_mdy(d)}.txt",
+    ],
+    "L82": [
+        lambda d: f"L82EDI_{_ymd(d)}.txt",
+        lambda d: f"L82EDI_{_stamp12(d)}.txt",
+    ],
+    "MEI": [
+        lambda d: f"MEI_ELIG_{_mdy(d)}.txt",
+        lambda d: f"MEI_ELIG_{_stamp12(d)}.txt",
+    ],
+    "OEW": [
+        lambda d: f"OEW_ELIG_{_stamp12(d)}.txt",
+        lambda d: f"OEW_ELIG_{_ymd(d)}.txt",
+    ],
+    "TRI": [
+        lambda d: f"TRI_ELIG_{_mdy(d)}.txt",
+        lambda d: f"TRI_ELIG_{_stamp12(d)}.txt",
+    ],
+    "TRI_NONMEDICARE": [
+        lambda d: f"TRI_NONMED_{_mdy(d)}.txt",
+        lambda d: f"TRI_NONMED_{_stamp12(d)}.txt",
+    ],
+}
+
+
+def corpus_file_name(kind, folder, day, rng):
+
+    if kind == "ahh_amo":
+        return f"AHH_ABC_Elig_Full_{_stamp12(day)}.TXT"
+
+    if kind == "teladoc":
+        return f"MEITD_{_ymd(day)}.834"
+
+    if kind == "savrx":
+        return rng.choice(SAVRX_NAME_FORMATS[folder])(day)
+
+    # ANTHEM: folder prefix + YYMMDDHHMMSS or YYYYMMDDHHMMSS,
+    # TRI_MED also ships "TRI_MED_<plan>_<YYMMDD>" names (scanned part by part)
+    if folder == "TRI_MED" and rng.random() < 0.5:
+        return f"TRI_MED_ELIG_{day.strftime('%y%m%d')}.834"
+
+    if rng.random() < 0.3:
+        return f"{folder}{_stamp14(day)}.834"
+
+    return f"{folder}{_stamp12(day)}.834"
+
+
+# MEMBERS / 834 CONTENT*********************************************
+
+def new_member(rng, used_ssns):
+
+    while True:
+        ssn = f"{rng.randint(100000000, 899999999)}"
+        if ssn not in used_ssns:
+            used_ssns.add(ssn)
+            break
+
+    return {
+        "ssn": ssn,
+        "member_id": f"{rng.randint(0, 9999999):07d}{rng.choice('ABCDEFGHJK')}{rng.choice('RSTUVWXYZ')}",
+        "last": rng.choice(LAST_NAMES),
+        "first": rng.choice(FIRST_NAMES),
+        "middle": rng.choice("ABCDEFGHJKLMNPRSTW"),
+    }
+
+
+def member_loop(member, kind, rng, filler_segments):
+    """
+    One INS loop in the layout the scanners read (REF member id + NM1*IL*1).
+    """
+
+    qualifier = rng.choice(MEMBER_ID_RULES[kind][0])
+
+    segments = [
+        "INS*Y*18*030*XN*A*E**FT",
+        f"REF*{qualifier}*{member['member_id']}",
+        "REF*1L*GRP0001",
+        "DTP*356*D8*20200101",
+        f"NM1*IL*1*{member['last']}*{member['first']}*{member['middle']}***34*{member['ssn']}",
+        "N3*100 MAIN ST",
+        "N4*ANYTOWN*TX*75001",
+        "DMG*D8*19800101*U",
+        "HD*030**HLT*PLAN01*EMP",
+    ]
+
+    segments.extend(filler_segments)
+
+    return "~\n".join(segments) + "~\n"
+
+
+def file_content(members, kind, rng, day, filler_segments):
+
+    stamp = _stamp12(day)
+
+    header = (
+        f"ISA*00*          *00*          *ZZ*SENDER         *ZZ*RECEIVER       "
+        f"*{stamp[:6]}*{stamp[6:10]}*^*00501*000000001*0*P*:~\n"
+        f"GS*BE*SENDER*RECEIVER*{_ymd(day)}*{stamp[6:10]}*1*X*005010X220A1~\n"
+        "ST*834*0001*005010X220A1~\n"
+        f"BGN*00*{stamp}*{_ymd(day)}*{stamp[6:10]}****4~\n"
+    )
+
+    body = "".join(member_loop(member, kind, rng, filler_segments) for member in members)
+
+    trailer = "SE*1*0001~\nGE*1*1~\nIEA*1*000000001~\n"
+
+    return header + body + trailer
+
+
+def filler_for_size(members_per_file, file_kb):
+    """
+    Extra DTP segments per member so a file comes close to file_kb.
+    """
+
+    if not file_kb:
+        return []
+
+    base_loop = 200     # bytes of one member loop without filler
+    segment = "DTP*348*D8*20240101"
+    per_member = (file_kb * 1024) / max(members_per_file, 1)
+    count = max(round((per_member - base_loop) / (len(segment) + 2)), 0)
+
+    return [segment] * count
+
+
+# CORPUS GENERATION*************************************************
+
+def generate_corpus(
+    root,
+    kinds=None,
+    files=30,
+    members=500,
+    churn=0.05,
+    file_kb=None,
+    start_date="2023-01-01",
+    every_days=7,
+    folders_per_kind=None,
+    seed=834
+):
+    """
+    Writes one file per folder every every_days days (files per folder).
+
+    members   -> enrolled members per file
+    churn     -> share of members replaced (terminated / added) per file
+    file_kb   -> approx file size (filler segments), None = natural size
+    folders_per_kind -> only the first N folders of ANTHEM / SAVRX
+
+    Returns the corpus summary (also written to ROOT/corpus.json).
+    """
+
+    rng = random.Random(seed)
+    kinds = kinds or list(CORPUS_LAYOUT)
+    start = datetime.strptime(start_date, "%Y-%m-%d")
+
+    filler = filler_for_size(members, file_kb)
+
+    summary = {
+        "root": os.path.abspath(root),
+        "files": 0,
+        "bytes": 0,
+        "keys": {}
+    }
+
+    for kind in kinds:
+
+        dir_parts, folders = CORPUS_LAYOUT[kind]
+        if folders_per_kind:
+            folders = folders[:folders_per_kind]
+
+        used_ssns = set()
+        ever_enrolled = []
+
+        for folder in folders:
+
+            backup_path = os.path.join(root, *dir_parts, folder, "backups")
+            os.makedirs(backup_path, exist_ok=True)
+
+            enrolled = [new_member(rng, used_ssns) for _ in range(members)]
+            ever_enrolled.extend(enrolled)
+
+            for i in range(files):
+
+                day = start + timedelta(
+                    days=i * every_days,
+                    seconds=rng.randint(0, 86399)
+                )
+
+                # churn: some members terminate, the same number join
+                if i:
+                    for _ in range(int(members * churn)):
+                        enrolled.pop(rng.randrange(len(enrolled)))
+                        member = new_member(rng, used_ssns)
+                        enrolled.append(member)
+                        ever_enrolled.append(member)
+
+                name = corpus_file_name(kind, folder, day, rng)
+                file_path = os.path.join(backup_path, name)
+
+                with open(file_path, "w", newline="") as f:
+                    f.write(file_content(enrolled, kind, rng, day, filler))
+
+                # mtime = file date, like files copied in by the daily feed
+                stamp = time.mktime(day.timetuple())
+                os.utime(file_path, (stamp, stamp))
+
+                summary["files"] += 1
+                summary["bytes"] += os.path.getsize(file_path)
+
+        sample = rng.sample(ever_enrolled, min(50, len(ever_enrolled)))
+
+        summary["keys"][kind] = {
+            "ssns": [m["ssn"] for m in sample],
+            "member_ids": [m["member_id"] for m in sample],
+            "member_names": [f"{m['last']} {m['first']} {m['middle']}" for m in sample],
+            "absent_ssn": "999999999",
+            "first_date": start.strftime("%d-%m-%Y"),
+            "last_date": (start + timedelta(days=(files - 1) * every_days)).strftime("%d-%m-%Y"),
+        }
+
+    with open(os.path.join(root, "corpus.json"), "w") as f:
+        json.dump(summary, f, indent=2)
+
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Synthetic 834 corpus generator")
+    parser.add_argument("root", help="directory used as ROOT_PATH")
+    parser.add_argument("--kinds", nargs="+", choices=list(CORPUS_LAYOUT), help="scanner families (default all)")
+    parser.add_argument("--files", type=int, default=30, help="files per folder")
+    parser.add_argument("--members", type=int, default=500, help="enrolled members per file")
+    parser.add_argument("--churn", type=float, default=0.05, help="share of members replaced per file")
+    parser.add_argument("--file-kb", type=int, help="approx size of every file in KB")
+    parser.add_argument("--start-date", default="2023-01-01", help="YYYY-MM-DD of the first file")
+    parser.add_argument("--every-days", type=int, default=7, help="days between two files")
+    parser.add_argument("--folders", type=int, help="only the first N folders per company")
+    parser.add_argument("--seed", type=int, default=834)
+    args = parser.parse_args()
+
+    result = generate_corpus(
+        args.root,
+        kinds=args.kinds,
+        files=args.files,
+        members=args.members,
+        churn=args.churn,
+        file_kb=args.file_kb,
+        start_date=args.start_date,
+        every_days=args.every_days,
+        folders_per_kind=args.folders,
+        seed=args.seed
+    )
+
+    print(f"{result['files']} files, {result['bytes'] / 1024 / 1024:.1f} MB in {result['root']}")
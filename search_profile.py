@@ -0,0 +1,153 @@
+import cProfile
+import os
+import pstats
+import threading
+import time
+from datetime import datetime
+
+from logic import (
+    APP_DATA_DIR,
+    new_search_metrics,
+    scan_all_dates,
+    scan_date_range,
+    search_timings,
+)
+from search_index import (
+    find_all_ssns_in_date_range_indexed,
+    find_member_id_all_dates_indexed,
+    find_member_name_all_dates_indexed,
+    find_ssn_all_dates_indexed,
+)
+
+
+# Profile Output*************************************
+# .prof files (pstats / snakeviz) in the app data directory (not served),
+# never holds the searched key
+PROFILE_DIR = os.environ.get(
+    "PROFILE_DIR",
+    os.path.join(APP_DATA_DIR, "profiles")
+)
+
+PROFILE_TOP = 25    # hot functions returned
+
+PROFILE_SEARCHES = ("ssn", "member_id", "member_name", "date_range")
+
+# index -> same find_*_indexed function as the app (refresh + SQLite lookup)
+# scan  -> per company scanner, every file parsed in this process
+PROFILE_MODES = ("index", "scan")
+
+INDEXED_SEARCHES = {
+    "ssn": find_ssn_all_dates_indexed,
+    "member_id": find_member_id_all_dates_indexed,
+    "member_name": find_member_name_all_dates_indexed,
+}
+
+# cProfile can only follow one profiled search at a time
+_profile_lock = threading.Lock()
+
+
+def run_search(config, search_type, key, mode, metrics):
+    """
+    The search being profiled, straight to the find_* function
+    (no result cache, otherwise a repeat search shows nothing).
+    """
+
+    if search_type == "date_range":
+        start_date, end_date = key
+        if mode == "scan":
+            return scan_date_range(config, start_date, end_date, metrics=metrics)
+        return find_all_ssns_in_date_range_indexed(config, start_date, end_date, metrics=metrics)
+
+    if mode == "scan":
+        return scan_all_dates(config, search_type, key, metrics=metrics)
+
+    return INDEXED_SEARCHES[search_type](config, key, metrics=metrics)
+
+
+def hot_functions(profiler, top=PROFILE_TOP):
+    """
+    Functions with the most own time: regex, listing, sorting, SQLite ...
+    """
+
+    rows = []
+
+    for (filename, line, name), (_, calls, own, total, _) in pstats.Stats(profiler).stats.items():
+        rows.append({
+            "function": f"{os.path.basename(filename)}:{line}({name})",
+            "calls": calls,
+            "own_s": round(own, 4),
+            "total_s": round(total, 4)
+        })
+
+    rows.sort(key=lambda row: row["own_s"], reverse=True)
+
+    return rows[:top]
+
+
+def profile_search(config, search_type, key, mode="index", top=PROFILE_TOP, save=True):
+    """
+    Runs one search under cProfile.
+
+    search_type -> "ssn", "member_id", "member_name" or "date_range"
+                   (key = (start_date, end_date) for date_range)
+    mode        -> "index" or "scan" (see PROFILE_MODES)
+
+    Returns {"result", "profile"}: result holds the same records / SSNs the
+    search gives, profile the hot functions, the search metrics and the
+    saved .prof file (scan pool workers are not followed, a refresh of
+    many files shows up as waiting on the pool).
+    """
+
+    if search_type not in PROFILE_SEARCHES:
+        raise ValueError("Unknown search: " + str(search_type))
+    if mode not in PROFILE_MODES:
+        raise ValueError("Unknown profile mode: " + str(mode))
+
+    # same key clean up as the search endpoints
+    if search_type == "date_range":
+        key = tuple(key)
+    elif search_type == "member_name":
+        key = key.strip()
+    else:
+        key = key.strip().rstrip("~")
+
+    metrics = new_search_metrics()
+    profiler = cProfile.Profile()
+
+    with _profile_lock:
+        started = time.perf_counter()
+        profiler.enable()
+        try:
+            found = run_search(config, search_type, key, mode, metrics)
+        finally:
+            profiler.disable()
+        total = time.perf_counter() - started
+
+    if search_type == "date_range":
+        result = {"total_ssns": len(set(found)), "ssns": sorted(set(found))}
+    else:
+        present, absent = found
+        result = {"present_records": present, "absent_records": absent}
+
+    profile_file = None
+    if save:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        profile_file = os.path.join(
+            PROFILE_DIR,
+            f"{datetime.now():%Y%m%d_%H%M%S_%f}_{config['selected_company']}_{search_type}_{mode}.prof"
+        )
+        profiler.dump_stats(profile_file)
+
+    return {
+        "result": result,
+        "profile": {
+            "company": config["selected_company"],
+            "folders": config["active_folders"],
+            "search": search_type,
+            "mode": mode,
+            "total_s": round(total, 4),
+            "file": profile_file,
+            "timings": search_timings(metrics),
+            "top_functions": hot_functions(profiler, top)
+        }
+    }
@@ -0,0 +1,285 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+# the hosted app imports its own logic / search_index copies
+HOSTED_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "Hosted_Project"
+)
+sys.path.insert(0, HOSTED_DIR)
+
+import app as hosted  # noqa: E402
+
+
+# HELPERS*************************************************************
+
+def fake_request(session_id, path="/search_by_ssn"):
+    return SimpleNamespace(
+        cookies={hosted.SESSION_COOKIE: session_id},
+        url=SimpleNamespace(path=path)
+    )
+
+
+def blocking_search(release):
+    """
+    Search function that runs until release is set or it is cancelled.
+    """
+
+    def search(config, req, cancel):
+        while not release.wait(0.01):
+            hosted.check_cancelled(cancel)
+        return {"success": True, "ssn": req.ssn}
+
+    return search
+
+
+def ssn_request(ssn):
+    return hosted.SSNRequest(ssn=ssn, company_name="SAVRX")
+
+
+@pytest.fixture
+def release():
+    """
+    Lets the blocking searches finish, also when a test fails.
+    """
+
+    event = threading.Event()
+    yield event
+    event.set()
+
+
+@pytest.fixture(autouse=True)
+def sessions():
+    for session_id in ("a", "b"):
+        hosted.sessions[session_id] = {
+            "company": None, "subfolder": None, "config": None,
+            "last_used": time.monotonic()
+        }
+
+    yield hosted.sessions
+
+    hosted.sessions.clear()
+    hosted.inflight_searches.clear()
+
+
+async def settle():
+    await asyncio.sleep(0.05)
+
+
+# WAITER ACCOUNTING****************************************************
+
+def test_resubmitted_search_counts_its_session_once(sessions, release):
+
+    async def scenario():
+        search = blocking_search(release)
+
+        first = asyncio.create_task(hosted.run_search(search, fake_request("a"), ssn_request("123456789")))
+        await settle()
+        again = asyncio.create_task(hosted.run_search(search, fake_request("a"), ssn_request("123456789")))
+        await settle()
+
+        flight = sessions["a"]["search"]["search"]
+        assert flight["waiters"] == 1
+        assert not flight["cancel"].is_set()
+
+        release.set()
+        results = await asyncio.gather(first, again)
+
+        assert flight["waiters"] == 0
+        return results
+
+    first, again = asyncio.run(scenario())
+
+    assert first == again == {"success": True, "ssn": "123456789"}
+
+
+def test_disconnected_caller_releases_its_wait(sessions, release):
+
+    async def scenario():
+        search = blocking_search(release)
+
+        waiting = asyncio.create_task(hosted.run_search(search, fake_request("a"), ssn_request("123456789")))
+        await settle()
+        leaving = asyncio.create_task(hosted.run_search(search, fake_request("b"), ssn_request("123456789")))
+        await settle()
+
+        flight = sessions["a"]["search"]["search"]
+        assert sessions["b"]["search"]["search"] is flight
+        assert flight["waiters"] == 2
+
+        # client of session b disconnects, session a still waits
+        leaving.cancel()
+        await settle()
+
+        assert flight["waiters"] == 1
+        assert not flight["cancel"].is_set()
+
+        release.set()
+        return await waiting
+
+    assert asyncio.run(scenario()) == {"success": True, "ssn": "123456789"}
+
+
+# CANCELLATION*********************************************************
+
+def test_resubmitted_search_is_cancelled_when_superseded(sessions, release):
+
+    async def scenario():
+        search = blocking_search(release)
+
+        first = asyncio.create_task(hosted.run_search(search, fake_request("a"), ssn_request("123456789")))
+        await settle()
+        again = asyncio.create_task(hosted.run_search(search, fake_request("a"), ssn_request("123456789")))
+        await settle()
+
+        flight = sessions["a"]["search"]["search"]
+
+        # the session moves on to another SSN, nobody waits for the first one
+        newer = asyncio.create_task(hosted.run_search(search, fake_request("a"), ssn_request("987654321")))
+        await settle()
+
+        assert flight["cancel"].is_set()
+        cancelled = await asyncio.gather(first, again)
+
+        release.set()
+        return cancelled, await newer
+
+    (first, again), newer = asyncio.run(scenario())
+
+    assert first == again == hosted.cancelled_response()
+    assert newer == {"success": True, "ssn": "987654321"}
+
+
+# STREAMED SEARCHES****************************************************
+
+def test_identical_streamed_searches_share_one_run(sessions, release):
+    started = []
+
+    def make_events(cancel):
+        started.append(cancel)
+        yield hosted.ndjson_event("records", present=[1])
+        while not release.wait(0.01):
+            hosted.check_cancelled(cancel)
+        yield hosted.ndjson_event("done", success=True)
+
+    config = {"selected_company": "SAVRX", "active_folders": ["MEI"]}
+
+    async def read(response):
+        return [event async for event in response.body_iterator]
+
+    async def scenario():
+        first = hosted.stream_response(fake_request("a", "/stream/search_by_ssn"), make_events, config, ssn_request("123456789"))
+        reading = asyncio.create_task(read(first))
+        await settle()
+
+        # joins the running search: gets the events sent so far, then the rest
+        second = hosted.stream_response(fake_request("b", "/stream/search_by_ssn"), make_events, config, ssn_request("123456789"))
+        joined = asyncio.create_task(read(second))
+        await settle()
+
+        flight = sessions["a"]["search"]["search"]
+        assert sessions["b"]["search"]["search"] is flight
+        assert flight["waiters"] == 2
+
+        release.set()
+        return await asyncio.gather(reading, joined)
+
+    first, second = asyncio.run(scenario())
+
+    assert len(started) == 1
+    assert first == second
+    assert [event.startswith('{"event": "records"') for event in first] == [True, False]
+    assert hosted.inflight_searches == {}
+
+
+# JOB QUEUE LIMIT******************************************************
+
+def test_job_submit_answers_503_when_the_queue_is_full(monkeypatch):
+
+    monkeypatch.setattr(hosted, "JOB_WORKERS", 1)
+    monkeypatch.setattr(hosted, "JOB_QUEUE_LIMIT", 1)
+    monkeypatch.setattr(hosted, "jobs", {
+        job_id: {"status": status, "finished": None}
+        for job_id, status in (("running", "running"), ("queued", "queued"))
+    })
+
+    response = asyncio.run(hosted.submit_job(
+        "ssns", lambda *args: None, fake_request("a"),
+        hosted.SSNBatchRequest(ssns=["123456789"], company_name="SAVRX")
+    ))
+
+    assert response.status_code == 503
+    assert len(hosted.jobs) == 2
+
+
+# INDEX METRICS********************************************************
+
+@pytest.fixture
+def index_path(tmp_path, monkeypatch):
+    path = tmp_path / "search_index.db"
+    index_module = sys.modules[hosted.connect_index_readonly.__module__]
+    monkeypatch.setattr(index_module, "INDEX_DB_PATH", str(path))
+    return path
+
+
+def test_index_stats_without_index_is_empty(index_path):
+
+    assert hosted.index_stats() == {}
+    assert not index_path.exists()
+
+
+def test_index_stats_reads_the_index_without_changing_it(index_path):
+    index_module = sys.modules[hosted.connect_index_readonly.__module__]
+
+    conn = index_module.connect_index(str(index_path))
+    with conn:
+        index_module.index_file(conn, "SAVRX", "F1", "a.txt", 10, 2_000_000_000, [])
+        conn.execute("PRAGMA journal_mode=DELETE")
+    conn.close()
+    before = index_path.read_bytes()
+
+    assert hosted.index_stats() == {"SAVRX": (1, 2.0)}
+    assert index_path.read_bytes() == before
+
+
+# SERVED FILES*********************************************************
+
+def test_app_directory_is_not_served():
+    from fastapi.testclient import TestClient
+
+    client = TestClient(hosted.app)
+
+    for path in ("/static/search_index.db", "/static/app.py", "/static/sidecars/00/x.bin"):
+        assert client.get(path).status_code == 404
+
+
+def test_index_is_kept_outside_the_app_directory():
+    index_module = sys.modules[hosted.connect_index_readonly.__module__]
+
+    assert not os.path.abspath(index_module.INDEX_DB_PATH).startswith(HOSTED_DIR + os.sep)
+
+
+def test_profiles_are_kept_outside_the_app_directory():
+    profile_module = sys.modules[hosted.profile_search.__module__]
+
+    assert not os.path.abspath(profile_module.PROFILE_DIR).startswith(HOSTED_DIR + os.sep)
+
+
+def test_sidecars_are_kept_outside_the_app_directory():
+    logic_module = sys.modules[hosted.write_slow_search.__module__]
+
+    assert not os.path.abspath(logic_module.SIDECAR_DIR).startswith(HOSTED_DIR + os.sep)
+
+
+def test_slow_search_log_is_kept_outside_the_app_directory():
+    logic_module = sys.modules[hosted.write_slow_search.__module__]
+
+    assert not os.path.abspath(logic_module.SLOW_SEARCH_LOG).startswith(HOSTED_DIR + os.sep)
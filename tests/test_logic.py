@@ -0,0 +1,278 @@
+import json
+import os
+import re
+import sys
+
+import pytest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import logic  # noqa: E402
+
+
+# OLD SCANNER PATTERNS************************************************
+# the per company regexes extract_members replaced, kept as the reference
+
+OLD_SSN_PATTERN = re.compile(r"NM1\*IL\*1\*.*?\*+34\*(\d{9})~")
+OLD_MEMBER_NAME_PATTERN = re.compile(r"NM1\*IL\*1\*(.+?)\*{3,}")
+
+
+def old_has_member_id(content, target_member_id, kind):
+
+    if kind == "anthem":
+        return (
+            f"REF*OF*{target_member_id}~" in content
+            or f"REF*ABB*{target_member_id}~" in content
+        )
+
+    target = re.escape(target_member_id)
+    pattern = {
+        "ahh_amo": rf"REF\*(0F|ABB)\*{target}(\*|~|\b)",
+        "teladoc": rf"REF\*(0F|OF|ABB)\*{target}~",
+        "savrx":   rf"REF\*(0F|OF|ABB)\*{target}(\*|~|\b)",
+    }[kind]
+
+    return re.search(pattern, content, re.IGNORECASE) is not None
+
+
+def old_ssns(content):
+    return OLD_SSN_PATTERN.findall(content)
+
+
+def old_names(content):
+    names = (name.replace("*", " ").strip().upper() for name in OLD_MEMBER_NAME_PATTERN.findall(content))
+    return [name for name in names if name]
+
+
+SAMPLE_834 = (
+    "ISA*00*          *00*          *ZZ*SENDER         *ZZ*RECEIVER       ~\n"
+    "ST*834*0001*005010X220A1~\n"
+    "INS*Y*18*030*XN*A*E**FT~\n"
+    "REF*0F*ABC123~\n"
+    "REF*1L*GRP0001~\n"
+    "NM1*IL*1*DOE*JOHN*Q***34*123456789~\n"
+    "INS*Y*18*030*XN*A*E**FT~\n"
+    "REF*OF*abc999*X~\n"
+    "NM1*IL*1*ROE*JANE****34*987654321~\n"
+    "INS*Y*18*030*XN*A*E**FT~\n"
+    "ref*abb*XYZ-7~\n"
+    "NM1*IL*1*****34*111223333~\n"
+    "INS*Y*18*030*XN*A*E**FT~\n"
+    "REF*ABB*Q55.1~\n"
+    "NM1*IL*1*SMITH*ANN*B***~\n"
+    "SE*1*0001~\n"
+)
+
+MEMBER_IDS = [
+    "ABC123", "abc123", "ABC12", "ABC", "abc999", "ABC999", "XYZ", "XYZ-7",
+    "xyz-7", "Q55", "Q55.1", "GRP0001", "NOPE"
+]
+
+KINDS = ["anthem", "ahh_amo", "teladoc", "savrx"]
+
+CONTENTS = {
+    "multi_line": SAMPLE_834,
+    "single_line": SAMPLE_834.replace("\n", ""),
+}
+
+
+# EXTRACT MEMBERS*****************************************************
+
+@pytest.mark.parametrize("layout", CONTENTS)
+@pytest.mark.parametrize("kind", KINDS)
+def test_member_id_rules_match_the_old_scanners(kind, layout):
+    content = CONTENTS[layout]
+    members = logic.extract_members(content)
+
+    for member_id in MEMBER_IDS:
+        found = logic.count_member_id_matches(members, member_id, kind) > 0
+        assert found == old_has_member_id(content, member_id, kind), member_id
+
+
+@pytest.mark.parametrize("layout", CONTENTS)
+def test_ssns_and_names_match_the_old_patterns(layout):
+    content = CONTENTS[layout]
+    members = logic.extract_members(content)
+
+    assert logic.member_ssns(members) == old_ssns(content)
+    assert logic.member_names(members) == old_names(content)
+
+
+def test_nm1_without_name_keeps_the_ssn():
+    members = logic.extract_members("INS*Y~\nREF*0F*ID1~\nNM1*IL*1*****34*111223333~\n")
+
+    assert members == [("111223333", (("0F", "ID1"),), "")]
+    assert logic.member_names(members) == []
+
+
+def test_each_member_loop_is_one_tuple():
+    members = logic.extract_members(SAMPLE_834)
+
+    assert members == [
+        ("123456789", (("0F", "ABC123"),), "DOE JOHN Q"),
+        ("987654321", (("OF", "abc999*X"),), "ROE JANE"),
+        ("111223333", (("abb", "XYZ-7"),), ""),
+        (None, (("ABB", "Q55.1"),), "SMITH ANN B"),
+    ]
+
+
+def test_bytes_and_str_give_the_same_members():
+    assert logic.extract_members(SAMPLE_834.encode()) == logic.extract_members(SAMPLE_834)
+
+
+def test_empty_content_has_no_members():
+    assert logic.extract_members(b"") == []
+    assert logic.extract_members("ISA*00~\nSE*1*0001~\n") == []
+
+
+# READ FILE MEMBERS / PREFILTER****************************************
+
+@pytest.fixture
+def sample_file(tmp_path):
+    path = tmp_path / "sample.834"
+    path.write_text(SAMPLE_834)
+    return str(path)
+
+
+def test_empty_file_has_no_members(tmp_path):
+    path = tmp_path / "empty.834"
+    path.write_bytes(b"")
+    metrics = logic.new_search_metrics()
+
+    assert logic.read_file_members(str(path), metrics=metrics) == []
+    assert metrics["files_opened"] == 1
+
+
+def test_prefilter_skips_files_without_the_literal(sample_file):
+
+    assert logic.read_file_members(sample_file, logic.ssn_prefilter("555555555")) == []
+    assert logic.read_file_members(sample_file, logic.ssn_prefilter("123456789")) == logic.extract_members(SAMPLE_834)
+
+
+@pytest.mark.parametrize("kind", KINDS)
+def test_member_id_prefilter_never_drops_a_match(sample_file, kind):
+
+    for member_id in MEMBER_IDS:
+        members = logic.read_file_members(sample_file, logic.member_id_prefilter(member_id, kind))
+        found = logic.count_member_id_matches(members, member_id, kind) > 0
+        assert found == old_has_member_id(SAMPLE_834, member_id, kind), member_id
+
+
+def test_member_name_prefilter_is_case_insensitive(sample_file):
+    prefilter = logic.member_name_prefilter("SMITH ANN B")
+
+    assert "SMITH ANN B" in logic.member_names(logic.read_file_members(sample_file, prefilter))
+    assert logic.read_file_members(sample_file, logic.member_name_prefilter("NOBODY")) == []
+
+
+# MEMBERSHIP SIDECARS**************************************************
+
+@pytest.fixture
+def sidecar_dir(tmp_path, monkeypatch):
+    path = tmp_path / "sidecars"
+    monkeypatch.setattr(logic, "SIDECAR_DIR", str(path))
+    monkeypatch.setattr(logic, "SIDECARS_ENABLED", True)
+    return path
+
+
+def test_sidecar_round_trip():
+    membership = logic.membership_from_members(logic.extract_members(SAMPLE_834))
+    data = logic.encode_sidecar(membership, 100, 200)
+
+    assert logic.decode_sidecar(data, 100, 200) == membership
+    assert logic.decode_sidecar(data, 101, 200) is None
+    assert logic.decode_sidecar(data, 100, 201) is None
+    assert logic.decode_sidecar(data[:-1], 100, 200) is None
+
+
+def test_file_membership_reads_its_sidecar(sample_file, sidecar_dir):
+    first = logic.new_search_metrics()
+    membership = logic.file_membership(sample_file, metrics=first)
+
+    again = logic.new_search_metrics()
+    assert logic.file_membership(sample_file, metrics=again) == membership
+
+    assert first["sidecars_written"] == 1
+    assert again["sidecar_hits"] == 1
+    assert logic.membership_has_ssn(membership, "987654321")
+    assert logic.membership_has_name(membership, "DOE JOHN Q")
+    assert logic.membership_has_member_id(membership, "abc123", "savrx")
+    assert not logic.membership_has_member_id(membership, "abc123", "anthem")
+
+
+def test_changed_file_replaces_its_sidecar(sample_file, sidecar_dir):
+    logic.file_membership(sample_file)
+
+    with open(sample_file, "a") as f:
+        f.write("INS*Y~\nNM1*IL*1*NEW*ONE*A***34*444556666~\n")
+    stat = os.stat(sample_file)
+    os.utime(sample_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    metrics = logic.new_search_metrics()
+    membership = logic.file_membership(sample_file, metrics=metrics)
+
+    assert metrics["sidecars_written"] == 1
+    assert logic.membership_has_ssn(membership, "444556666")
+    assert len(list(sidecar_dir.rglob("*.bin"))) == 1
+
+    logic.remove_sidecar(sample_file)
+    assert list(sidecar_dir.rglob("*.bin")) == []
+
+
+# SLOW SEARCH LOG******************************************************
+
+def test_slow_search_log_creates_its_directory(tmp_path, monkeypatch):
+    log_path = tmp_path / "app_data" / "slow_searches.log"
+    monkeypatch.setattr(logic, "SLOW_SEARCH_LOG", str(log_path))
+
+    config = {"selected_company": "TELADOC", "active_folders": ["MEI"]}
+    logic.write_slow_search("ssn", config, logic.new_search_metrics(), "123456789")
+
+    entry = json.loads(log_path.read_text())
+    assert entry["key"] == "*****6789"
+
+
+# DATE ORDERED MANIFEST************************************************
+
+@pytest.fixture
+def teladoc_backups(tmp_path):
+    backup_path = tmp_path / "TELADOC" / "MEI" / "backups"
+    backup_path.mkdir(parents=True)
+
+    for name in (
+        "MEITD_20230122.834", "MEITD_20230101.834", "README.834",
+        "MEITD_20230115.834", "MEITD_20230108.834", "MEITD_20230129.834",
+    ):
+        (backup_path / name).write_text("ST*834~\n")
+
+    logic.clear_folder_manifests()
+    return tmp_path / "TELADOC"
+
+
+def test_manifest_is_in_date_order(teladoc_backups):
+    entries = logic.get_folder_manifest("teladoc", "MEI", str(teladoc_backups / "MEI" / "backups"))
+
+    assert [file for _, file, _ in entries] == [
+        "README.834",
+        "MEITD_20230101.834", "MEITD_20230108.834", "MEITD_20230115.834",
+        "MEITD_20230122.834", "MEITD_20230129.834",
+    ]
+    assert entries[1][2] == "01-01-2023"
+
+
+@pytest.mark.parametrize("start_date, end_date, expected", [
+    ("08-01-2023", "22-01-2023", ["MEITD_20230108.834", "MEITD_20230115.834", "MEITD_20230122.834"]),
+    ("09-01-2023", "09-01-2023", []),
+    ("01-01-2020", "31-12-2030", [
+        "MEITD_20230101.834", "MEITD_20230108.834", "MEITD_20230115.834",
+        "MEITD_20230122.834", "MEITD_20230129.834",
+    ]),
+    ("bad", "31-12-2030", []),
+])
+def test_date_range_selects_the_manifest_slice(teladoc_backups, start_date, end_date, expected):
+    files = logic.iter_date_range_files(
+        "teladoc", str(teladoc_backups), ["MEI"], start_date, end_date
+    )
+
+    assert [file for _, _, file, _ in files] == expected
@@ -0,0 +1,323 @@
+import os
+import shutil
+import sqlite3
+import sys
+import threading
+
+import pytest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import logic  # noqa: E402
+import search_index  # noqa: E402
+from generate_corpus import generate_corpus  # noqa: E402
+
+
+# FIXTURES************************************************************
+
+@pytest.fixture
+def corpus(tmp_path, monkeypatch):
+    """
+    Small TELADOC tree (4 files, 5 members each) as ROOT_PATH.
+    """
+
+    summary = generate_corpus(str(tmp_path / "root"), kinds=["teladoc"], files=4, members=5)
+
+    monkeypatch.setattr(logic, "ROOT_PATH", str(tmp_path / "root"))
+    monkeypatch.setattr(logic, "SIDECAR_DIR", str(tmp_path / "sidecars"))
+    logic.clear_folder_manifests()
+
+    config = logic.get_company_config("TELADOC")
+    backup_path = os.path.join(config["base_path"], "MEI", "backups")
+
+    return {
+        "config": config,
+        "backup_path": backup_path,
+        "keys": summary["keys"]["teladoc"],
+        "db_path": str(tmp_path / "index.db"),
+    }
+
+
+def refresh(corpus, **kwargs):
+    conn = search_index.connect_index(corpus["db_path"])
+    try:
+        with conn:
+            return search_index.refresh_index(conn, corpus["config"], **kwargs)
+    finally:
+        conn.close()
+
+
+def backup_files(corpus):
+    return sorted(os.listdir(corpus["backup_path"]))
+
+
+def add_file(corpus, source, name):
+    shutil.copy(
+        os.path.join(corpus["backup_path"], source),
+        os.path.join(corpus["backup_path"], name)
+    )
+
+
+# REFRESH LOCKING******************************************************
+
+def test_refresh_parses_before_taking_the_write_lock(corpus, monkeypatch):
+    refresh(corpus)
+
+    first, second = backup_files(corpus)[:2]
+    os.remove(os.path.join(corpus["backup_path"], first))
+    add_file(corpus, second, "MEITD_20300101.834")
+
+    parsing = threading.Event()
+    proceed = threading.Event()
+    iter_scan_chunks = search_index.iter_scan_chunks
+
+    def slow_scan(*args, **kwargs):
+        parsing.set()
+        proceed.wait(10)
+        yield from iter_scan_chunks(*args, **kwargs)
+
+    monkeypatch.setattr(search_index, "iter_scan_chunks", slow_scan)
+
+    worker = threading.Thread(target=refresh, args=(corpus,))
+    worker.start()
+
+    try:
+        assert parsing.wait(10)
+
+        # another writer gets the database while the files are parsed
+        other = sqlite3.connect(corpus["db_path"], timeout=0.2)
+        with other:
+            other.execute("DELETE FROM files WHERE company = ?", ("NOBODY",))
+        other.close()
+    finally:
+        proceed.set()
+        worker.join(10)
+
+    listing = refresh(corpus)
+    assert {file for _, file, _, _ in listing} == set(backup_files(corpus))
+
+
+def test_concurrent_refresh_parses_pending_files_once(corpus, monkeypatch):
+    parsed = []
+    parsing = threading.Event()
+    proceed = threading.Event()
+    iter_scan_chunks = search_index.iter_scan_chunks
+
+    def slow_scan(search_type, key, kind, file_paths, *args, **kwargs):
+        parsed.extend(file_paths)
+        parsing.set()
+        proceed.wait(10)
+        yield from iter_scan_chunks(search_type, key, kind, file_paths, *args, **kwargs)
+
+    monkeypatch.setattr(search_index, "iter_scan_chunks", slow_scan)
+
+    results = []
+    workers = [
+        threading.Thread(target=lambda: results.append(refresh(corpus)))
+        for _ in range(2)
+    ]
+
+    workers[0].start()
+    assert parsing.wait(10)
+    workers[1].start()
+    proceed.set()
+
+    for worker in workers:
+        worker.join(10)
+
+    assert sorted(os.path.basename(path) for path in parsed) == backup_files(corpus)
+    assert results[0] == results[1]
+
+
+# INCREMENTAL REFRESH**************************************************
+
+def indexed_files(corpus):
+    conn = search_index.connect_index(corpus["db_path"])
+    try:
+        return {row[0] for row in conn.execute("SELECT filename FROM files")}
+    finally:
+        conn.close()
+
+
+def test_refresh_indexes_new_files_once(corpus):
+    metrics = logic.new_search_metrics()
+    listing = refresh(corpus, metrics=metrics)
+
+    assert [file for _, file, _, _ in listing] == backup_files(corpus)
+    assert metrics["files_indexed"] == 4
+
+    add_file(corpus, backup_files(corpus)[0], "MEITD_20300101.834")
+
+    metrics = logic.new_search_metrics()
+    listing = refresh(corpus, metrics=metrics)
+
+    assert metrics["files_indexed"] == 1
+    assert metrics["files_from_index"] == 4
+    assert listing[-1][1:3] == ("MEITD_20300101.834", "01-01-2030")
+
+
+def test_refresh_reindexes_changed_files(corpus):
+    refresh(corpus)
+
+    changed = os.path.join(corpus["backup_path"], backup_files(corpus)[0])
+    with open(changed, "a") as f:
+        f.write("INS*Y~\nNM1*IL*1*NEW*ONE*A***34*444556666~\n")
+
+    metrics = logic.new_search_metrics()
+    refresh(corpus, metrics=metrics)
+
+    assert metrics["files_indexed"] == 1
+    present, _ = search_index.find_ssn_all_dates_indexed(
+        corpus["config"], "444556666", db_path=corpus["db_path"]
+    )
+    assert [record["filename"] for record in present] == [os.path.basename(changed)]
+
+
+def test_refresh_drops_deleted_files(corpus):
+    refresh(corpus)
+
+    deleted = backup_files(corpus)[1]
+    os.remove(os.path.join(corpus["backup_path"], deleted))
+
+    listing = refresh(corpus)
+
+    assert deleted not in {file for _, file, _, _ in listing}
+    assert indexed_files(corpus) == set(backup_files(corpus))
+
+
+def test_refresh_listing_time_is_kept_per_folder(corpus):
+    metrics = logic.new_search_metrics()
+
+    conn = search_index.connect_index(corpus["db_path"])
+    try:
+        plan = search_index.plan_refresh(conn, corpus["config"], metrics=metrics)
+    finally:
+        conn.close()
+
+    assert plan["listed"] == 4
+    assert metrics["per_folder"]["MEI"]["list_s"] > 0
+
+
+def test_indexed_search_matches_the_scanner(corpus):
+    for ssn in corpus["keys"]["ssns"][:3] + ["999999999"]:
+        assert search_index.find_ssn_all_dates_indexed(
+            corpus["config"], ssn, db_path=corpus["db_path"]
+        ) == logic.scan_all_dates(corpus["config"], "ssn", ssn)
+
+
+# MEMBERSHIP SIDECARS**************************************************
+
+def sidecar_count(tmp_path):
+    return len(list((tmp_path / "sidecars").rglob("*.bin")))
+
+
+def date_range_scan(corpus, metrics):
+    return logic.find_all_ssns_in_date_range_parallel(
+        corpus["config"], corpus["keys"]["first_date"], corpus["keys"]["last_date"],
+        metrics=metrics
+    )
+
+
+def test_index_build_writes_no_sidecars(corpus, tmp_path, monkeypatch):
+    monkeypatch.setattr(logic, "SIDECARS_ENABLED", True)
+
+    refresh(corpus)
+
+    assert sidecar_count(tmp_path) == 0
+
+
+def test_date_range_scans_reuse_their_sidecars(corpus, tmp_path, monkeypatch):
+    monkeypatch.setattr(logic, "SIDECARS_ENABLED", True)
+
+    first = logic.new_search_metrics()
+    ssns = date_range_scan(corpus, first)
+
+    again = logic.new_search_metrics()
+    assert date_range_scan(corpus, again) == ssns
+
+    assert first["sidecars_written"] == 4
+    assert again["sidecar_hits"] == 4
+
+    # the index build reads them too
+    metrics = logic.new_search_metrics()
+    refresh(corpus, metrics=metrics)
+
+    assert metrics["sidecar_hits"] == 4
+    assert sidecar_count(tmp_path) == 4
+
+
+# STREAMED SEARCH******************************************************
+
+@pytest.fixture
+def parsed(monkeypatch):
+    """
+    Pending files parsed one per chunk, the paths in parse order.
+    """
+
+    paths = []
+    iter_scan_chunks = search_index.iter_scan_chunks
+
+    def one_file_chunks(search_type, key, kind, file_paths, **kwargs):
+        for path in file_paths:
+            paths.append(os.path.basename(path))
+            yield from iter_scan_chunks(search_type, key, kind, [path], **kwargs)
+
+    monkeypatch.setattr(search_index, "iter_scan_chunks", one_file_chunks)
+    return paths
+
+
+def stream_records(corpus, ssn):
+    return search_index.iter_all_dates_indexed(
+        corpus["config"], "ssn", ssn, db_path=corpus["db_path"]
+    )
+
+
+def test_cold_stream_sends_each_chunk_once_parsed(corpus, parsed):
+    stream = stream_records(corpus, corpus["keys"]["ssns"][0])
+
+    present, absent = next(stream)
+    assert parsed == backup_files(corpus)[:1]
+    assert len(present + absent) == 1
+
+    blocks = [(present, absent)] + list(stream)
+    assert len(blocks) == 4
+
+
+def test_warm_stream_sends_indexed_files_before_parsing(corpus, parsed):
+    refresh(corpus)
+    parsed.clear()
+    add_file(corpus, backup_files(corpus)[0], "MEITD_20220101.834")
+
+    ssn = corpus["keys"]["ssns"][0]
+    stream = stream_records(corpus, ssn)
+
+    present, absent = next(stream)
+    assert parsed == []
+    assert len(present + absent) == 4
+
+    blocks = [(present, absent)] + list(stream)
+    assert parsed == ["MEITD_20220101.834"]
+
+    streamed = (
+        search_index.order_records(corpus["config"], "ssn", [r for block, _ in blocks for r in block]),
+        search_index.order_records(corpus["config"], "ssn", [r for _, block in blocks for r in block]),
+    )
+    assert streamed == logic.scan_all_dates(corpus["config"], "ssn", ssn)
+
+
+def test_warm_streams_do_not_wait_for_each_other(corpus):
+    refresh(corpus)
+    ssn = corpus["keys"]["ssns"][0]
+
+    first = stream_records(corpus, ssn)
+    next(first)
+
+    blocks = []
+    second = threading.Thread(target=lambda: blocks.extend(stream_records(corpus, ssn)))
+    second.start()
+    second.join(10)
+
+    assert not second.is_alive()
+    assert blocks == [next(stream_records(corpus, ssn))]
+    first.close()